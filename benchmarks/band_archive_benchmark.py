@@ -0,0 +1,63 @@
+"""Benchmark: opening a catalog of bands and running a few typical analytics queries
+with pickle (unpickling all Band objects) vs. the memory-mapped BandArchive (music.band_archive) -
+time and Python heap memory (tracemalloc) per process.
+"""
+
+
+#%%
+# Setup / Data
+
+import pickle
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from music.band_archive import BandArchive, write_archive
+from testdata.catalog import synthetic_bands
+
+n_bands = 200_000
+day = date(1969, 8, 16)
+
+bands = synthetic_bands(n_bands)
+
+
+#%%
+def measure(label, query):
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = query()
+    elapsed = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{label:<40} {elapsed:>8.3f}s {peak / 2**20:>10.1f} MiB   {result}')
+
+
+#%%
+with tempfile.TemporaryDirectory() as tmp:
+    pickle_file = Path(tmp) / 'band'
+    archive_file = Path(tmp) / 'band.archive'
+    with open(pickle_file, 'wb') as f:
+        pickle.dump(bands, f)
+    write_archive(bands, archive_file)
+    print(f'pickle: {pickle_file.stat().st_size / 2**20:.1f} MiB, '
+          f'archive: {archive_file.stat().st_size / 2**20:.1f} MiB')
+
+    def pickle_query():
+        with open(pickle_file, 'rb') as f:
+            loaded = pickle.load(f)
+        active = [b for b in loaded if (b.start is None or b.start <= day) and (b.end is None or b.end >= day)]
+        return len(active), sum(len(b.members) for b in loaded), str(loaded[n_bands // 2])[:30]
+
+    def archive_query():
+        with BandArchive(archive_file) as archive:
+            active = len(archive.active_on(day))
+            members = int(np.sum(archive.bands['members_count']))
+            band = str(archive[n_bands // 2])[:30]
+        return active, members, band
+
+    measure('pickle.load() + queries', pickle_query)
+    measure('BandArchive + queries', archive_query)
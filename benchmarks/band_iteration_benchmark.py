@@ -0,0 +1,114 @@
+"""Benchmark and stress test: re-entrant Band iteration (the iteration state is kept in a separate iterator)
+vs. the former cursor stored in the band itself (self.__i; LegacyBand below).
+- stress test: many threads (with very frequent thread switches) and nested loops iterating over the same bands,
+  checking that every loop sees exactly the band's members
+- fanning work on shared bands out to a thread pool, vs. deep-copying the bands first (the former workaround)
+- the cost of iterating, and of slicing the members (a tuple copy vs. a MembersView)
+"""
+
+
+#%%
+# Setup / Data
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+from music.band import Band
+from testdata.catalog import synthetic_bands
+
+n_bands = 20_000
+n_workers = 16
+n_rounds = 5
+
+
+class LegacyBand(Band):
+    """Band with the former iterator protocol: the cursor is stored in the band itself."""
+
+    def __iter__(self):
+        self.__i = 0
+        return self
+
+    def __next__(self):
+        if self.__i < len(self.members):
+            self.__i += 1
+            return self.members[self.__i - 1]
+        else:
+            raise StopIteration
+
+
+bands = synthetic_bands(n_bands)
+legacy_bands = [LegacyBand(b.name, *b.members, start=b.start, end=b.end) for b in bands]
+
+
+def members_seen(band):
+    """The names of the members seen by a loop over band, each followed by a nested loop over band."""
+
+    seen = []
+    for m in band:
+        seen.append(m.name)
+        sum(1 for _ in band)
+    return seen
+
+
+def check(band):
+    return members_seen(band) == [m.name for m in band.members]
+
+
+#%%
+# Stress test: all workers iterate over the same (small) set of bands, with a thread switch every microsecond
+switch_interval = sys.getswitchinterval()
+sys.setswitchinterval(1e-6)
+try:
+    for label, shared in (('Band', bands[:64]), ('LegacyBand', legacy_bands[:64])):
+        with ThreadPoolExecutor(n_workers) as pool:
+            results = list(pool.map(check, shared * 500))
+        print(f'{label}: {results.count(False)} of {len(results)} loops saw wrong members')
+finally:
+    sys.setswitchinterval(switch_interval)
+
+view = bands[0][1:]
+with ThreadPoolExecutor(n_workers) as pool:
+    assert all(pool.map(lambda v: list(v) == list(bands[0].members[1:]), [view] * 10_000))
+print('MembersView shared by all workers: OK')
+
+
+#%%
+# Fanning work out to a thread pool: shared bands vs. deep copies
+def count_members(band):
+    return sum(1 for _ in band)
+
+
+t = time.perf_counter()
+for _ in range(n_rounds):
+    with ThreadPoolExecutor(n_workers) as pool:
+        total = sum(pool.map(count_members, bands, chunksize=256))
+print(f'shared bands: {(time.perf_counter() - t) / n_rounds:.3f}s per round ({total} memberships)')
+
+t = time.perf_counter()
+for _ in range(n_rounds):
+    with ThreadPoolExecutor(n_workers) as pool:
+        total = sum(pool.map(count_members, deepcopy(legacy_bands), chunksize=256))
+print(f'deep-copied legacy bands: {(time.perf_counter() - t) / n_rounds:.3f}s per round ({total} memberships)')
+
+
+#%%
+# Iterating and slicing
+for label, iterated in (('Band', bands), ('LegacyBand', legacy_bands)):
+    t = time.perf_counter()
+    for _ in range(n_rounds):
+        for band in iterated:
+            for m in band:
+                pass
+    print(f'{label} iteration: {(time.perf_counter() - t) / n_rounds / n_bands * 1e9:.0f}ns per band')
+
+t = time.perf_counter()
+for _ in range(n_rounds):
+    views = [band[1:] for band in bands]
+print(f'band[1:] (MembersView): {(time.perf_counter() - t) / n_rounds / n_bands * 1e9:.0f}ns per band')
+
+t = time.perf_counter()
+for _ in range(n_rounds):
+    copies = [band.members[1:] for band in bands]
+print(f'band.members[1:] (tuple copy): {(time.perf_counter() - t) / n_rounds / n_bands * 1e9:.0f}ns per band')
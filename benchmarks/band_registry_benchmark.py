@@ -0,0 +1,67 @@
+"""Benchmark: BandRegistry (music.band_registry) vs. scanning all bands,
+over a synthetic catalog of a million bands.
+"""
+
+
+#%%
+# Setup / Data
+
+import random
+import time
+
+from music.band_registry import BandRegistry
+from testdata.catalog import synthetic_bands
+
+n_bands = 1_000_000
+n_queries = 1_000
+
+bands = synthetic_bands(n_bands)
+rnd = random.Random(1)
+query_bands = rnd.sample(bands, n_queries)
+query_musicians = [rnd.choice(b.members) for b in query_bands]
+
+
+#%%
+# Building the registry (incremental adds)
+t = time.perf_counter()
+registry = BandRegistry(bands)
+print(f'BandRegistry: {len(registry):,} bands, {registry.musicians():,} musicians, '
+      f'built in {time.perf_counter() - t:.2f}s')
+
+
+#%%
+# bands_of(): a linear scan over all bands vs. the reverse index (the scan is timed on a few queries only)
+n_scans = 3
+t = time.perf_counter()
+for m in query_musicians[:n_scans]:
+    scanned = [b for b in bands if m in b.members]
+t_scan = (time.perf_counter() - t) / n_scans
+t = time.perf_counter()
+for m in query_musicians:
+    indexed = registry.bands_of(m)
+t_index = (time.perf_counter() - t) / n_queries
+assert {id(b) for b in scanned} == {id(b) for b in registry.bands_of(query_musicians[n_scans - 1])}
+print(f'bands_of(): scan {t_scan * 1e3:.1f} ms/query, registry {t_index * 1e6:.2f} us/query '
+      f'({t_scan / t_index:,.0f}x faster)')
+
+
+#%%
+# is_member() and shares_members()
+t = time.perf_counter()
+for m, b in zip(query_musicians, query_bands):
+    registry.is_member(m, b)
+print(f'is_member(): {(time.perf_counter() - t) / n_queries * 1e6:.2f} us/query')
+t = time.perf_counter()
+for a, b in zip(query_bands, query_bands[1:]):
+    registry.shares_members(a, b)
+print(f'shares_members(): {(time.perf_counter() - t) / (n_queries - 1) * 1e6:.2f} us/query')
+
+
+#%%
+# Incremental updates
+t = time.perf_counter()
+for b in query_bands:
+    registry.remove(b)
+for b in query_bands:
+    registry.add(b)
+print(f'remove() + add(): {(time.perf_counter() - t) / n_queries * 1e6:.2f} us/band')
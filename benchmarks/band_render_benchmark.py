@@ -0,0 +1,79 @@
+"""Benchmark: text export of a million bands - the original rendering (str(m).split(', ')[0] for each member,
+format_date() on every call) with writelines() of a list of strings, vs. the cached Band.__str__()
+(per band, checked against the members' names on every call) with the streaming write_bands() (music.band),
+checking that the output is the same.
+"""
+
+
+#%%
+# Setup / Data
+
+import tempfile
+import time
+from pathlib import Path
+
+from music.band import write_bands
+from testdata.catalog import synthetic_bands
+from util.utility import format_date
+
+n_bands = 1_000_000
+
+bands = synthetic_bands(n_bands)
+
+
+#%%
+def original_str(band):
+    """Band.__str__() before caching."""
+
+    n = band.name
+    m = ', '.join([str(m).split(', ')[0] for m in band.members]) if band.members else ''
+    s = format_date(band.start) if band.start else ''
+    e = format_date(band.end) if band.end else ''
+    if m and s and e:
+        return f'{n} ({m}); formed: {s}; disbanded: {e}'
+    elif m and s:
+        return f'{n} ({m}); formed: {s}'
+    elif m and e:
+        return f'{n} {m}; disbanded: {e}'
+    else:
+        return f'{n}'
+
+
+#%%
+with tempfile.TemporaryDirectory() as tmp:
+    file = Path(tmp) / 'band.txt'
+
+    t = time.perf_counter()
+    with open(file, 'w', encoding='utf-8') as f:
+        f.writelines([original_str(b) + '\n' for b in bands])
+    print(f'original __str__() + writelines(): {time.perf_counter() - t:.2f}s')
+    original = file.read_text(encoding='utf-8')
+
+    t = time.perf_counter()
+    write_bands(bands, file)
+    print(f'write_bands(), first export (cold cache): {time.perf_counter() - t:.2f}s')
+    assert file.read_text(encoding='utf-8') == original
+
+    t = time.perf_counter()
+    write_bands(bands, file)
+    print(f'write_bands(), next exports (cached): {time.perf_counter() - t:.2f}s')
+
+    bands[0].name = 'Renamed Band'                  # invalidates the cached string of one band only
+    t = time.perf_counter()
+    write_bands(bands, file)
+    print(f'write_bands(), after changing one band: {time.perf_counter() - t:.2f}s')
+
+    renamed = bands[1].members[0]
+    renamed.name = 'Renamed Musician'               # re-renders the bands of this musician only
+    t = time.perf_counter()
+    write_bands(bands, file)
+    print(f'write_bands(), after renaming one musician: {time.perf_counter() - t:.2f}s')
+    assert file.read_text(encoding='utf-8') == ''.join(original_str(b) + '\n' for b in bands)
+    assert sum(1 for b in bands if 'Renamed Musician' in str(b)) == sum(1 for b in bands if renamed in b.members)
+
+    band = bands[2]
+    band.members = list(band.members)
+    str(band)
+    band.members.append(renamed)                    # the members changed in place: no attribute of the band is set
+    band.members[0] = renamed
+    assert str(band) == original_str(band)
@@ -0,0 +1,78 @@
+"""Benchmark: point reads and appends with BandStore (music.band_store) vs. pickling the whole list of bands
+(pickle.load() of the list to read one band, load + append + pickle.dump() of the list to add one band).
+"""
+
+
+#%%
+# Setup / Data
+
+import pickle
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from music.band_store import BandStore
+from testdata.catalog import synthetic_bands
+
+n_bands = 100_000
+n_ops = 1_000                   # point reads/appends with BandStore
+n_ops_pickle = 10               # point reads/appends with full-list pickling (each one takes a full load)
+
+bands = synthetic_bands(n_bands + n_ops)
+bands, new_bands = bands[:n_bands], bands[n_bands:]
+names = [b.name for b in random.Random(0).sample(bands, n_ops)]
+
+
+#%%
+with tempfile.TemporaryDirectory() as tmp:
+    pickle_file = Path(tmp) / 'band'
+    store_file = Path(tmp) / 'band.store'
+
+    t = time.perf_counter()
+    with open(pickle_file, 'wb') as f:
+        pickle.dump(bands, f)
+    print(f'full pickle, initial dump: {time.perf_counter() - t:.2f}s')
+
+    t = time.perf_counter()
+    with BandStore(store_file) as store:
+        store.append_all(bands)
+    print(f'BandStore, initial appends: {time.perf_counter() - t:.2f}s')
+
+    # Point reads
+    t = time.perf_counter()
+    for name in names[:n_ops_pickle]:
+        with open(pickle_file, 'rb') as f:
+            band = next(b for b in pickle.load(f) if b.name == name)
+    print(f'full pickle, point read: {(time.perf_counter() - t) / n_ops_pickle * 1e3:.3f}ms')
+
+    t = time.perf_counter()
+    with BandStore(store_file) as store:
+        for name in names:
+            band = store[name]
+    print(f'BandStore, point read: {(time.perf_counter() - t) / n_ops * 1e3:.3f}ms (including opening the store)')
+
+    # Appends
+    t = time.perf_counter()
+    for band in new_bands[:n_ops_pickle]:
+        with open(pickle_file, 'rb') as f:
+            all_bands = pickle.load(f)
+        all_bands.append(band)
+        with open(pickle_file, 'wb') as f:
+            pickle.dump(all_bands, f)
+    print(f'full pickle, append: {(time.perf_counter() - t) / n_ops_pickle * 1e3:.3f}ms')
+
+    t = time.perf_counter()
+    with BandStore(store_file) as store:
+        store.append_all(new_bands)
+    print(f'BandStore, append: {(time.perf_counter() - t) / n_ops * 1e3:.3f}ms (including opening/closing the store)')
+
+    # Compaction after replacing 10% of the bands
+    with BandStore(store_file) as store:
+        store.append_all(bands[:n_bands // 10])
+        size = store.size()
+        t = time.perf_counter()
+        store.compact()
+        print(f'BandStore, compact(): {time.perf_counter() - t:.2f}s, '
+              f'{size / 2**20:.1f} MiB -> {store.size() / 2**20:.1f} MiB '
+              f'(full pickle: {pickle_file.stat().st_size / 2**20:.1f} MiB)')
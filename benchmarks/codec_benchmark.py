@@ -0,0 +1,53 @@
+"""Benchmark: the binary codec (music.codec) vs. json_tricks and pickle (protocols 4 and 5) -
+encoded size and encoding/decoding speed for a synthetic catalog of bands.
+"""
+
+
+#%%
+# Setup / Data
+
+import io
+import pickle
+import time
+
+from json_tricks import dumps, loads
+
+from music.codec import BinaryWriter, BinaryReader
+from testdata.catalog import synthetic_bands
+
+n_bands = 100_000
+
+bands = synthetic_bands(n_bands)
+
+
+#%%
+def codec_dumps(objects):
+    buffer = io.BytesIO()
+    BinaryWriter(buffer).write_all(objects)
+    return buffer.getvalue()
+
+
+def codec_loads(data):
+    return list(BinaryReader(io.BytesIO(data)))
+
+
+formats = {
+    'json_tricks': (lambda b: dumps(b).encode('utf-8'), lambda d: loads(d.decode('utf-8'))),
+    'pickle 4': (lambda b: pickle.dumps(b, protocol=4), pickle.loads),
+    'pickle 5': (lambda b: pickle.dumps(b, protocol=5), pickle.loads),
+    'music.codec': (codec_dumps, codec_loads),
+}
+
+
+#%%
+# Size and speed
+print(f'{"format":<12} {"size (MiB)":>10} {"encode (s)":>10} {"decode (s)":>10}')
+for name, (encode, decode) in formats.items():
+    t = time.perf_counter()
+    data = encode(bands)
+    t_encode = time.perf_counter() - t
+    t = time.perf_counter()
+    decoded = decode(data)
+    t_decode = time.perf_counter() - t
+    assert len(decoded) == n_bands and str(decoded[-1]) == str(bands[-1])
+    print(f'{name:<12} {len(data) / 2**20:>10.2f} {t_encode:>10.2f} {t_decode:>10.2f}')
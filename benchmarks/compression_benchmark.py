@@ -0,0 +1,69 @@
+"""Benchmark matrix: compressed size vs. write/read throughput of each export format
+(text - music.band.write_bands()/read_bands(), JSON Lines - music.jsonl, binary - music.codec,
+pickle of the list - pickle.dump()/load() through util.utility.open_compressed())
+with each compression (gzip, bz2, lzma) at a few levels, for a synthetic catalog of bands.
+Throughput is in MiB/s of uncompressed data.
+"""
+
+
+#%%
+# Setup / Data
+
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+from music import codec, jsonl
+from music.band import write_bands, read_bands
+from testdata.catalog import synthetic_bands
+from util.utility import open_compressed
+
+n_bands = 100_000
+
+bands = synthetic_bands(n_bands)
+
+
+#%%
+def pickle_dump(objects, path, compression=None, level=None):
+    with open_compressed(path, 'wb', compression, level) as f:
+        pickle.dump(objects, f)
+
+
+def pickle_load(path, compression=None):
+    with open_compressed(path, 'rb', compression) as f:
+        return pickle.load(f)
+
+
+formats = {
+    'text': (write_bands, read_bands),
+    'jsonl': (jsonl.dump, jsonl.load),
+    'binary': (codec.dump, codec.load),
+    'pickle': (pickle_dump, pickle_load),
+}
+compressions = [(None, None), ('gzip', 1), ('gzip', 6), ('gzip', 9), ('bz2', 1), ('bz2', 9), ('lzma', 0), ('lzma', 6)]
+
+
+#%%
+print(f'{"format":<8} {"compression":<12} {"size (MiB)":>10} {"ratio":>6} {"write (MiB/s)":>14} {"read (MiB/s)":>13}')
+with tempfile.TemporaryDirectory() as tmp:
+    for format_name, (dump, load) in formats.items():
+        raw_size = None
+        for compression, level in compressions:
+            path = Path(tmp) / f'{format_name}-{compression}-{level}'
+            t = time.perf_counter()
+            if compression is None:
+                dump(bands, path)
+            else:
+                dump(bands, path, compression=compression, level=level)
+            t_write = time.perf_counter() - t
+            t = time.perf_counter()
+            loaded = load(path, compression=compression)
+            n = len(loaded) if isinstance(loaded, list) else sum(1 for _ in loaded)
+            t_read = time.perf_counter() - t
+            assert n == n_bands
+            size = path.stat().st_size
+            raw_size = raw_size or size
+            label = f'{compression} {level}' if compression else 'none'
+            print(f'{format_name:<8} {label:<12} {size / 2**20:>10.2f} {raw_size / size:>6.1f} '
+                  f'{raw_size / 2**20 / t_write:>14.1f} {raw_size / 2**20 / t_read:>13.1f}')
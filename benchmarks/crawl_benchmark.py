@@ -0,0 +1,45 @@
+"""Benchmark: crawling a multi-page article list from a local fixture server (testdata.fixture_server) with
+simulated network latency - crawl() (one page at a time) vs. CrawlEngine (a pool of threads, in page order and
+in completion order, with different per-host limits) and acrawl() (asyncio).
+"""
+
+
+#%%
+# Setup / Data
+
+import asyncio
+import time
+
+from python.crawl import crawl, CrawlEngine, acrawl
+from testdata.fixture_server import FixtureServer
+
+n_pages = 100
+latency = 0.05                  # seconds per response
+
+
+def report(label, t, soups):
+    t = time.perf_counter() - t
+    assert len(soups) == n_pages and all(soup.find('article') for soup in soups)
+    print(f'{label}: {t:.2f}s ({n_pages / t:.1f} pages/s)')
+
+
+async def acollect(url, **kwargs):
+    return [soup async for soup in acrawl(url, n_pages, **kwargs)]
+
+
+#%%
+with FixtureServer(n_pages=n_pages, latency=latency) as server:
+    t = time.perf_counter()
+    report('crawl()', t, list(crawl(server.url, n_pages)))
+
+    for max_workers, per_host in ((16, 4), (16, 16), (32, 32)):
+        with CrawlEngine(max_workers=max_workers, per_host=per_host) as engine:
+            for ordered in (True, False):
+                t = time.perf_counter()
+                soups = list(engine.crawl(server.url, n_pages, ordered=ordered))
+                report(f'CrawlEngine({max_workers} workers, {per_host} per host, '
+                       f'{"page" if ordered else "completion"} order)', t, soups)
+    print(f'max requests at once: {server.max_concurrent}')
+
+    t = time.perf_counter()
+    report('acrawl(16 workers, 16 per host)', t, asyncio.run(acollect(server.url, max_workers=16, per_host=16)))
@@ -0,0 +1,47 @@
+"""Benchmark: Musician.from_lines() (bulk, lazy) vs. Musician.from_str() (one line per call).
+"""
+
+
+#%%
+# Setup / Data
+
+import tempfile
+import time
+from pathlib import Path
+
+from music.musician import Musician
+from testdata.catalog import synthetic_musicians
+
+n = 1_000_000
+
+lines = [str(m) for m in synthetic_musicians(n)]
+
+
+#%%
+def throughput(parse):
+    """Returns the number of lines per second parsed by parse(lines)."""
+
+    t = time.perf_counter()
+    count = sum(1 for _ in parse(lines))
+    return count / (time.perf_counter() - t)
+
+
+#%%
+# In-memory lines (note that from_str() understands only the Musician part of each line)
+base_lines = [line for line in lines if line.endswith(('band member', 'solo artist'))]
+per_line = throughput(lambda ls: (Musician.from_str(line) for line in base_lines))
+bulk_base = throughput(lambda ls: Musician.from_lines(base_lines))
+bulk = throughput(Musician.from_lines)
+print(f'Musician.from_str():   {per_line:,.0f} lines/s (Musician lines)')
+print(f'Musician.from_lines(): {bulk_base:,.0f} lines/s (Musician lines)')
+print(f'Musician.from_lines(): {bulk:,.0f} lines/s (lines of all musician classes)')
+
+
+#%%
+# Streaming from a text file, with constant memory
+with tempfile.TemporaryDirectory() as tmp:
+    file = Path(tmp) / 'musicians.txt'
+    file.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    t = time.perf_counter()
+    count = sum(1 for _ in Musician.from_lines(file))
+    print(f'Musician.from_lines(<file>): {count / (time.perf_counter() - t):,.0f} lines/s')
@@ -0,0 +1,100 @@
+"""Benchmark: regular Musician classes (music.musician) vs. their slotted, hashable counterparts
+(music.frozen_musician) - per-object memory, equality and hashing.
+"""
+
+
+#%%
+# Setup / Data
+
+import timeit
+import tracemalloc
+
+from music.frozen_musician import FrozenMusician
+from music.interning import musician_registry
+from testdata.catalog import synthetic_musicians
+
+n = 200_000
+
+# The objects themselves are measured here, so equal objects must be distinct objects: interning of frozen musicians
+# (measured in interning_benchmark.py) is switched off; identical objects are compared separately below
+musician_registry.enabled = False
+
+musicians = synthetic_musicians(n)
+frozen = [FrozenMusician.from_musician(m) for m in musicians]
+
+
+#%%
+def allocated_per_object(factory, objects):
+    """Returns the average number of bytes allocated per object when re-creating objects with factory()."""
+
+    tracemalloc.start()
+    copies = [factory(o) for o in objects]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (size - copies.__sizeof__()) / len(copies)
+
+
+def ratio(regular, frozen, smaller='faster', bigger='slower'):
+    """Describes the frozen result relative to the regular one (times, or sizes with smaller='smaller')."""
+
+    return f'{regular / frozen:.2f}x {smaller}' if frozen <= regular else f'{frozen / regular:.2f}x {bigger}'
+
+
+#%%
+# Per-object memory (names are shared with the originals, so only the objects themselves are counted)
+regular_size = allocated_per_object(lambda m: m.__class__(**FrozenMusician.from_musician(m)._kwargs()), musicians)
+frozen_size = allocated_per_object(lambda f: f.__class__(**f._kwargs()), frozen)
+print(f'Musician:       {regular_size:.1f} bytes/object')
+print(f'FrozenMusician: {frozen_size:.1f} bytes/object ({ratio(regular_size, frozen_size, "smaller", "bigger")})')
+
+
+#%%
+# Equality of equal, but distinct objects
+regular_pairs = list(zip(musicians, [FrozenMusician.from_musician(m).to_musician() for m in musicians]))
+frozen_pairs = list(zip(frozen, [FrozenMusician.from_musician(m) for m in musicians]))
+for f1, f2 in frozen_pairs:                             # the hashes are cached after the first use
+    hash(f1), hash(f2)
+
+regular_eq = timeit.timeit(lambda: [a == b for a, b in regular_pairs], number=5)
+frozen_eq = timeit.timeit(lambda: [a == b for a, b in frozen_pairs], number=5)
+print(f'__eq__(), equal objects:     Musician {regular_eq:.3f}s, FrozenMusician {frozen_eq:.3f}s '
+      f'({ratio(regular_eq, frozen_eq)})')
+
+# Identical objects (e.g., the same musician in many bands): FrozenMusician.__eq__() returns at the identity check
+regular_pairs = list(zip(musicians, musicians))
+frozen_pairs = list(zip(frozen, frozen))
+regular_is = timeit.timeit(lambda: [a == b for a, b in regular_pairs], number=5)
+frozen_is = timeit.timeit(lambda: [a == b for a, b in frozen_pairs], number=5)
+print(f'__eq__(), identical objects: Musician {regular_is:.3f}s, FrozenMusician {frozen_is:.3f}s '
+      f'({ratio(regular_is, frozen_is)})')
+
+# Lookups such as <musician> in <list> mostly compare unequal objects
+regular_pairs = list(zip(musicians, musicians[1:] + musicians[:1]))
+frozen_pairs = list(zip(frozen, frozen[1:] + frozen[:1]))
+regular_ne = timeit.timeit(lambda: [a == b for a, b in regular_pairs], number=5)
+frozen_ne = timeit.timeit(lambda: [a == b for a, b in frozen_pairs], number=5)
+print(f'__eq__(), different objects: Musician {regular_ne:.3f}s, FrozenMusician {frozen_ne:.3f}s '
+      f'({ratio(regular_ne, frozen_ne)})')
+
+
+#%%
+# Hashing/de-duplication: Musician objects are unhashable, so the best one can do today is to build a key tuple
+# for each object; frozen objects go into a set directly
+musicians_copy = [FrozenMusician.from_musician(m).to_musician() for m in musicians]
+frozen_copy = [FrozenMusician.from_musician(m) for m in musicians]
+
+
+def regular_dedup():
+    return {(m.__class__, m.name, m.is_band_member, getattr(m, 'vocals', None), getattr(m, 'instrument', None)): m
+            for m in musicians + musicians_copy}
+
+
+def frozen_dedup():
+    return set(frozen + frozen_copy)
+
+
+assert len(regular_dedup()) == len(frozen_dedup()) == n
+regular_hash = timeit.timeit(regular_dedup, number=5)
+frozen_hash = timeit.timeit(frozen_dedup, number=5)
+print(f'de-duplication: Musician (key tuples) {regular_hash:.3f}s, FrozenMusician (set) {frozen_hash:.3f}s '
+      f'({ratio(regular_hash, frozen_hash)})')
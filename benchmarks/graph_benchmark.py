@@ -0,0 +1,73 @@
+"""Benchmark: the collaboration graph (music.graph) on a synthetic catalog with millions of nodes -
+building the CSR arrays, shortest paths (bidirectional BFS), connected components and sampled betweenness,
+and incremental updates through a BandRegistry listener.
+"""
+
+
+#%%
+# Setup / Data
+
+import random
+import time
+
+from music.band_registry import BandRegistry
+from music.graph import CollaborationGraph
+from music.interning import musician_key
+from testdata.catalog import synthetic_bands
+
+n_bands = 1_000_000
+n_queries = 20
+
+bands = synthetic_bands(n_bands)
+
+
+#%%
+t = time.perf_counter()
+graph = CollaborationGraph(bands)
+print(f'recording {n_bands} bands: {time.perf_counter() - t:.2f}s')
+t = time.perf_counter()
+degrees = graph.degrees()
+print(f'building the CSR arrays ({len(graph)} musicians, {n_bands} bands, {int(degrees.sum())} memberships): '
+      f'{time.perf_counter() - t:.2f}s')
+
+rng = random.Random(0)
+pairs = [(rng.choice(graph.musicians), rng.choice(graph.musicians)) for _ in range(n_queries)]
+t = time.perf_counter()
+lengths = [graph.degrees_of_separation(a, b) for a, b in pairs]
+print(f'shortest path: {(time.perf_counter() - t) / n_queries * 1e3:.1f}ms per query (degrees: {lengths})')
+
+t = time.perf_counter()
+components = graph.components()
+print(f'connected components: {time.perf_counter() - t:.2f}s ({components.max() + 1} components)')
+
+t = time.perf_counter()
+centrality = graph.betweenness(samples=4)
+print(f'betweenness (4 sampled sources): {time.perf_counter() - t:.2f}s')
+
+
+#%%
+# Incremental updates: a registry with a graph listener, one band added between queries
+registry = BandRegistry(bands[:n_bands // 2])
+graph = CollaborationGraph()
+registry.listen(graph)
+a, b = pairs[0]
+t = time.perf_counter()
+for band in bands[n_bands // 2:n_bands // 2 + n_queries]:
+    registry.add(band)
+    graph.shortest_path(band.members[0], band.members[-1])
+print(f'add a band + shortest path (pending edges, merged when too many): '
+      f'{(time.perf_counter() - t) / n_queries * 1e3:.1f}ms per update')
+
+# Removing bands: their memberships must not come back when more bands are added and the CSR arrays are merged
+t = time.perf_counter()
+for band in bands[n_bands // 2:n_bands // 2 + n_queries]:
+    registry.remove(band)
+graph.degrees()
+print(f'remove {n_queries} bands + rebuild: {time.perf_counter() - t:.2f}s')
+for band in bands[n_bands // 2 + n_queries:n_bands // 2 + 2 * n_queries]:
+    registry.add(band)
+rebuilt = CollaborationGraph(bands[:n_bands // 2] + bands[n_bands // 2 + n_queries:n_bands // 2 + 2 * n_queries])
+expected = dict(zip(map(musician_key, rebuilt.musicians), rebuilt.degrees()))
+assert all(expected.get(musician_key(m), 0) == d for m, d in zip(graph.musicians, graph.degrees()))
+assert graph.components().max() == rebuilt.components().max() + sum(key not in expected for key in
+                                                                      map(musician_key, graph.musicians))
@@ -0,0 +1,66 @@
+"""Benchmark and test harness: get_article_info_list() against a local fixture server (testdata.fixture_server)
+with simulated network latency, without a cache and through a ResponseCache (python.crawl):
+- cold: an empty cache (every page is downloaded, parsed and stored)
+- warm: fresh cached pages (no requests, no parsing)
+- revalidated: stale cached pages that have not changed (conditional requests, 304 Not Modified, no parsing)
+- changed: stale cached pages that have changed (downloaded and parsed again)
+checking that every run returns the same articles, and counting the requests the server gets.
+Then LRU eviction, with a cache smaller than the crawl.
+"""
+
+
+#%%
+# Setup / Data
+
+import tempfile
+import time
+from pathlib import Path
+
+from python.crawl import ResponseCache, CrawlEngine, get_article_info_list, get_specific_page
+from testdata.fixture_server import FixtureServer
+
+n_pages = 100
+latency = 0.02                  # seconds per response
+n_workers = 8
+max_age = 3                     # seconds the cached pages are fresh for in the first runs
+
+
+def run(label, server, engine, cache=None, expected=None):
+    requests_before, not_modified = server.requests, server.not_modified
+    t = time.perf_counter()
+    article_info_list = get_article_info_list(server.url, n_pages, engine=engine, cache=cache)
+    t = time.perf_counter() - t
+    assert len(article_info_list) == n_pages * server.articles_per_page
+    assert expected is None or article_info_list == expected
+    print(f'{label}: {t:.3f}s, {server.requests - requests_before} requests '
+          f'({server.not_modified - not_modified} Not Modified)' + (f', {cache.stats()}' if cache else ''))
+    return article_info_list
+
+
+#%%
+with (tempfile.TemporaryDirectory() as directory, FixtureServer(n_pages, latency=latency) as server,
+      CrawlEngine(max_workers=n_workers, per_host=n_workers) as engine):
+    path = Path(directory) / 'http_cache.db'
+    expected = run('no cache', server, engine)
+    with ResponseCache(path, max_age=max_age) as cache:
+        run('cold cache', server, engine, cache, expected)
+        run('warm cache', server, engine, cache, expected)
+    with ResponseCache(path, max_age=max_age) as cache:
+        run('warm cache (reopened)', server, engine, cache, expected)
+
+    time.sleep(max_age)                                     # the cached pages expire
+    with ResponseCache(path, max_age=0) as cache:           # the pages are revalidated every time
+        run('revalidated', server, engine, cache, expected)
+        run('revalidated again', server, engine, cache, expected)
+        server.version += 1
+        run('changed', server, engine, cache, expected)
+        print(f'{len(cache)} cached responses, {cache.size:,} bytes (compressed)')
+
+    with ResponseCache(path, max_size=cache.size // 4) as cache:      # a loop over 4x as many pages: LRU misses all
+        for _ in range(2):
+            for page in range(1, n_pages + 1):
+                cache.get(get_specific_page(server.url, page))
+        stats = cache.stats()
+        print(f'cache of {cache.max_size:,} bytes: {len(cache)} cached responses, {cache.size:,} bytes, {stats}')
+        assert cache.size <= cache.max_size and stats['evictions'] > 0
+        assert stats['hits'] + stats['revalidated'] + stats['misses'] == 2 * n_pages     # one outcome per request
@@ -0,0 +1,84 @@
+"""Benchmark: memory saved by interning FrozenMusician objects (music.interning, music.frozen_musician)
+when the same musicians appear in many bands, and the cost of interning when many threads create musicians at once.
+"""
+
+
+#%%
+# Setup / Data
+
+import random
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from music.frozen_musician import FrozenMusician
+from music.interning import musician_registry
+from testdata.catalog import synthetic_musician_name
+
+n_people = 10_000
+n_appearances = 500_000
+
+rnd = random.Random(0)
+appearances = [(synthetic_musician_name(rnd.randrange(n_people)), rnd.random() < 0.9) for _ in range(n_appearances)]
+
+
+#%%
+def build(enabled):
+    """Creates a FrozenMusician object for each appearance; returns (objects, bytes allocated, seconds)."""
+
+    musician_registry.clear()
+    musician_registry.enabled = enabled
+    tracemalloc.start()
+    t = time.perf_counter()
+    musicians = [FrozenMusician(name, is_band_member) for name, is_band_member in appearances]
+    t = time.perf_counter() - t
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return musicians, size, t
+
+
+#%%
+# Compare memory with and without interning
+plain, plain_size, plain_time = build(enabled=False)
+del plain
+interned, interned_size, interned_time = build(enabled=True)
+print(f'without interning: {plain_size / 2**20:.1f} MiB, {plain_time:.2f}s')
+print(f'with interning:    {interned_size / 2**20:.1f} MiB, {interned_time:.2f}s '
+      f'({plain_size / interned_size:.1f}x less memory)')
+print(musician_registry.stats())
+del interned
+
+
+#%%
+# Many threads creating the same musicians at once still get one object per person
+musician_registry.clear()
+with ThreadPoolExecutor(8) as pool:
+    t = time.perf_counter()
+    musicians = [m for chunk in pool.map(lambda chunk: [FrozenMusician(name, is_band_member)
+                                                        for name, is_band_member in chunk],
+                                         [appearances[i:i + 10_000] for i in range(0, n_appearances, 10_000)])
+                 for m in chunk]
+    t = time.perf_counter() - t
+distinct = {(m.name, m.is_band_member) for m in musicians}
+assert len({id(m) for m in musicians}) == len(distinct)
+print(f'8 threads: {t:.2f}s, {len(distinct)} distinct musicians, {len({id(m) for m in musicians})} objects')
+print(musician_registry.stats())
+
+
+#%%
+# Parsing: Musician.from_str() creates an object per line, FrozenMusician.from_str() returns the interned ones
+from music.musician import Musician
+
+lines = [f'{name}, {"band member" if is_band_member else "solo artist"}' for name, is_band_member in appearances]
+musician_registry.clear()
+for label, parse in (('Musician.from_str()', Musician.from_str), ('FrozenMusician.from_str()', FrozenMusician.from_str)):
+    tracemalloc.start()
+    t = time.perf_counter()
+    musicians = [parse(line) for line in lines]
+    t = time.perf_counter() - t
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<26} {size / 2**20:.1f} MiB, {t:.2f}s, {len({id(m) for m in musicians})} objects')
+    del musicians
+assert FrozenMusician.from_str(lines[0]) is FrozenMusician(*appearances[0])
+print(musician_registry.stats())
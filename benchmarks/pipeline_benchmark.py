@@ -0,0 +1,83 @@
+"""Benchmark: throughput of an asyncio pipeline (music.pipeline) vs. synchronous iteration over bands -
+re-encoding a compressed text file of bands (read_bands() -> str() -> compressed write), which is CPU-bound
+(the stages share the GIL, so the pipeline only adds the cost of passing chunks between threads),
+and a reader and a sink with simulated I/O latency (e.g., a remote store and an indexing service),
+where the stages overlap their waiting.
+"""
+
+
+#%%
+# Setup / Data
+
+import asyncio
+import gc
+import tempfile
+import time
+from pathlib import Path
+
+from music.band import write_bands, read_bands
+from music.pipeline import achunks, amap
+from testdata.catalog import synthetic_bands
+from util.utility import open_compressed
+
+n_bands = 100_000
+chunk_size = 1024
+latency = 0.05                  # simulated I/O latency per chunk, of the reader and of the sink
+
+bands = synthetic_bands(n_bands)
+
+
+def slow_reader(bands):
+    for i, band in enumerate(bands):
+        if i % chunk_size == 0:
+            time.sleep(latency)
+        yield band
+
+
+def slow_sink(lines):
+    time.sleep(latency)
+
+
+async def run_pipeline(iterable, sink):
+    chunks = amap(str, achunks(iterable, chunk_size))
+    async for lines in chunks:
+        await asyncio.to_thread(sink, lines)
+
+
+def report(label, t):
+    t = time.perf_counter() - t
+    print(f'{label}: {t:.2f}s ({n_bands / t:,.0f} bands/s)')
+
+
+#%%
+with tempfile.TemporaryDirectory() as tmp:
+    source, target = Path(tmp) / 'band.txt.gz', Path(tmp) / 'band_copy.txt.gz'
+    write_bands(bands, source)
+    # Only the file is used from now on; the collector should not keep traversing the catalog (or anything else
+    # created so far) while the stages hold chunks of bands alive
+    del bands
+    gc.collect()
+    gc.freeze()
+
+    t = time.perf_counter()
+    write_bands(read_bands(source), target)
+    report('re-encoding, synchronous', t)
+
+    t = time.perf_counter()
+    with open_compressed(target, 'wt') as f:
+        asyncio.run(run_pipeline(read_bands(source), lambda lines: f.write('\n'.join(lines) + '\n')))
+    report('re-encoding, pipeline', t)
+
+    t = time.perf_counter()
+    lines = []
+    for band in slow_reader(read_bands(source)):
+        lines.append(str(band))
+        if len(lines) == chunk_size:
+            slow_sink(lines)
+            lines = []
+    slow_sink(lines)
+    report(f'simulated I/O ({latency * 1e3:.0f}ms per {chunk_size} bands), synchronous', t)
+
+    t = time.perf_counter()
+    asyncio.run(run_pipeline(slow_reader(read_bands(source)), slow_sink))
+    report(f'simulated I/O ({latency * 1e3:.0f}ms per {chunk_size} bands), pipeline', t)
@@ -0,0 +1,80 @@
+"""Benchmark: loading a synthetic catalog of bands into the SQLite repository (music.repository)
+with different batch sizes, and the common queries (members of a band, bands of a musician, bands active on a date)
+vs. the same queries as scans over the list of Band objects.
+"""
+
+
+#%%
+# Setup / Data
+
+import random
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from music.interning import musician_key
+from music.repository import BandRepository
+from testdata.catalog import synthetic_bands
+
+n_bands = 100_000
+n_queries = 1_000
+day = date(1969, 8, 16)
+
+bands = synthetic_bands(n_bands)
+rng = random.Random(0)
+names = [b.name for b in rng.sample(bands, n_queries)]
+musicians = [rng.choice(b.members) for b in rng.sample(bands, n_queries)]
+
+
+#%%
+# Load
+with tempfile.TemporaryDirectory() as tmp:
+    for batch_size in (1, 1_000, 10_000):
+        n = n_bands if batch_size > 1 else n_bands // 100      # one transaction per band is slow
+        t = time.perf_counter()
+        with BandRepository(Path(tmp) / f'band-{batch_size}.db', batch_size=batch_size) as repository:
+            repository.add_all(bands[:n])
+        print(f'load, batch size {batch_size:>6}: {(time.perf_counter() - t) / n * 1e6:.1f}us per band')
+
+
+#%%
+# Queries
+def scan_members_of(name):
+    return next(b for b in bands if b.name == name).members
+
+
+def scan_bands_of(musician):
+    key = musician_key(musician)
+    return [b for b in bands if any(musician_key(m) == key for m in b.members)]
+
+
+def scan_active_on(d):
+    return [b for b in bands if (b.start is None or b.start <= d) and (b.end is None or b.end >= d)]
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    with BandRepository(Path(tmp) / 'band.db') as repository:
+        repository.add_all(bands)
+        queries = {
+            'members of a band': (repository.members_of, scan_members_of, names),
+            'bands of a musician': (repository.bands_of, scan_bands_of, musicians),
+            'bands active on a date': (repository.active_on, scan_active_on, [day] * 10),
+        }
+        for label, (query, scan, args) in queries.items():
+            t = time.perf_counter()
+            for arg in args:
+                result = query(arg)
+            t_query = (time.perf_counter() - t) / len(args)
+            t = time.perf_counter()
+            for arg in args[:10]:
+                scan(arg)
+            t_scan = (time.perf_counter() - t) / len(args[:10])
+            print(f'{label:<24} repository: {t_query * 1e3:>8.3f}ms, list scan: {t_scan * 1e3:>8.3f}ms '
+                  f'({len(result)} objects materialized by the last query)')
+
+        # Each query materializes its own (mutable) Musician objects
+        members = repository.members_of(names[0])
+        assert members[0] is not repository.members_of(names[0])[0]
+        members[0].name = 'Changed locally'
+        assert repository.members_of(names[0])[0].name == scan_members_of(names[0])[0].name
@@ -0,0 +1,66 @@
+"""Benchmark: requests per second against a local fixture server (testdata.fixture_server), with and without
+pooled keep-alive sessions (python.crawl.SessionPool) - plain requests, and get_soup() pages fetched one by one
+and with CrawlEngine (the no-pooling fetch is requests.get(), as get_soup() used to do it).
+"""
+
+
+#%%
+# Setup / Data
+
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+from python.crawl import SessionPool, CrawlEngine, get_soup, get_specific_page
+from testdata.fixture_server import FixtureServer
+
+n_requests = 1_000
+n_workers = 8
+
+
+def get_soup_unpooled(url):
+    response = requests.get(url, allow_redirects=False)
+    return BeautifulSoup(response.text, features='html.parser')
+
+
+def report(label, t, n, server, connections):
+    t = time.perf_counter() - t
+    print(f'{label}: {n / t:,.0f} requests/s ({server.connections - connections} connections)')
+
+
+#%%
+with FixtureServer(n_pages=20) as server:
+    urls = [get_specific_page(server.url, i % 20 + 1) for i in range(n_requests)]
+
+    connections, t = server.connections, time.perf_counter()
+    for url in urls:
+        requests.get(url, allow_redirects=False)
+    report('requests.get()', t, n_requests, server, connections)
+
+    with SessionPool(size=1) as pool:
+        connections, t = server.connections, time.perf_counter()
+        for url in urls:
+            pool.get(url, allow_redirects=False)
+        report('SessionPool.get()', t, n_requests, server, connections)
+
+    connections, t = server.connections, time.perf_counter()
+    for url in urls[:n_requests // 4]:
+        get_soup_unpooled(url)
+    report('get_soup() without pooling', t, n_requests // 4, server, connections)
+
+    with SessionPool(size=1) as pool:
+        connections, t = server.connections, time.perf_counter()
+        for url in urls[:n_requests // 4]:
+            get_soup(url, pool)
+        report('get_soup() with pooling', t, n_requests // 4, server, connections)
+
+    with CrawlEngine(max_workers=n_workers, per_host=n_workers, fetch=get_soup_unpooled) as engine:
+        connections, t = server.connections, time.perf_counter()
+        n = sum(1 for _ in engine.map(urls, ordered=False))
+        report(f'CrawlEngine({n_workers} workers) without pooling', t, n, server, connections)
+
+    with CrawlEngine(max_workers=n_workers, per_host=n_workers) as engine:
+        connections, t = server.connections, time.perf_counter()
+        n = sum(1 for _ in engine.map(urls, ordered=False))
+        report(f'CrawlEngine({n_workers} workers) with pooling', t, n, server, connections)
@@ -0,0 +1,83 @@
+"""Benchmark: finding bands with similar lineups with LineupIndex (music.similarity, MinHash/LSH) vs. comparing
+set(members) of all pairs of bands, on a synthetic catalog with injected near-duplicate lineups
+(copies of bands with one member replaced or added). Recall is measured against the exact pairwise results.
+"""
+
+
+#%%
+# Setup / Data
+
+import random
+import time
+from datetime import date
+from itertools import combinations
+
+from music.band import Band
+from music.interning import musician_key
+from music.similarity import LineupIndex
+from testdata.catalog import synthetic_bands, synthetic_musicians
+
+n_bands = 200_000
+n_pairwise = 5_000                  # bands compared pairwise (about n_pairwise**2 / 2 comparisons)
+thresholds = [0.3, 0.5, 0.8]
+
+
+def catalog(n_bands, seed=0):
+    """Synthetic bands, plus near-duplicates of 10% of them (one member replaced or added), shuffled."""
+
+    rng = random.Random(seed)
+    bands = synthetic_bands(n_bands, seed=seed)
+    extra = synthetic_musicians(2 * n_bands, seed=seed)[-(n_bands // 10):]            # not in the bands' pool
+    for band, musician in zip(rng.sample(bands, n_bands // 10), extra):
+        members = list(band.members)
+        if rng.random() < 0.5:
+            members[rng.randrange(len(members))] = musician
+        else:
+            members.append(musician)
+        bands.append(Band(f'{band.name} Revisited', *members, start=date(2021, 1, 1), end=None))
+    rng.shuffle(bands)
+    return bands
+
+
+def exact_pairs(bands, threshold):
+    lineups = [frozenset(musician_key(m) for m in b.members) for b in bands]
+    return {frozenset((bands[i].name, bands[j].name)) for i, j in combinations(range(len(bands)), 2)
+            if len(lineups[i] & lineups[j]) / len(lineups[i] | lineups[j]) >= threshold}
+
+
+bands = catalog(n_bands)
+subset = catalog(n_pairwise, seed=1)
+
+
+#%%
+for threshold in thresholds:
+    t = time.perf_counter()
+    index = LineupIndex(bands, threshold=threshold)
+    t_build = time.perf_counter() - t
+    t = time.perf_counter()
+    pairs = index.similar_pairs()
+    print(f'threshold {threshold} ({index.n_bands} LSH bands x {index.n_rows} rows): '
+          f'indexing {len(bands)} bands {t_build:.2f}s, similar_pairs() {time.perf_counter() - t:.2f}s, '
+          f'{len(pairs)} pairs')
+
+    # Recall and time on a subset small enough for pairwise comparison
+    t = time.perf_counter()
+    expected = exact_pairs(subset, threshold)
+    t_exact = time.perf_counter() - t
+    t = time.perf_counter()
+    found = {frozenset((a.name, b.name)) for a, b, _ in LineupIndex(subset, threshold=threshold).similar_pairs()}
+    t_lsh = time.perf_counter() - t
+    print(f'    {len(subset)} bands: pairwise {t_exact:.2f}s, LSH {t_lsh:.2f}s, '
+          f'recall {len(found & expected) / max(1, len(expected)):.3f} ({len(expected)} pairs), '
+          f'false positives {len(found - expected)}')
+
+# Incremental insertion and point queries
+index = LineupIndex(bands[:-1000])
+t = time.perf_counter()
+for band in bands[-1000:]:
+    index.add(band)
+print(f'add(): {(time.perf_counter() - t) * 1e3 / 1000:.3f}ms per band')
+t = time.perf_counter()
+for band in bands[:1000]:
+    index.similar(band)
+print(f'similar(): {(time.perf_counter() - t) * 1e3 / 1000:.3f}ms per query')
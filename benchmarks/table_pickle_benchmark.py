@@ -0,0 +1,62 @@
+"""Benchmark: exporting a large collection of bands - pickle of the list of Band objects (as in music.band)
+vs. pickle of a BandTable (music.table) in band (protocol 4) vs. music.table.dump()/load()
+(protocol 5 with out-of-band buffers, memory-mapped on load) - wall time and peak memory (tracemalloc,
+which also tracks NumPy's array allocations).
+"""
+
+
+#%%
+# Setup / Data
+
+import pickle
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from music.table import BandTable, dump, load
+from testdata.catalog import synthetic_bands
+
+n_bands = 500_000
+
+bands = synthetic_bands(n_bands)
+table = BandTable.from_bands(bands)
+print(table)
+
+
+#%%
+def measure(label, function):
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{label:<44} {elapsed:>8.3f}s {peak / 2**20:>10.1f} MiB')
+    return result
+
+
+def pickle_dump(obj, path, protocol):
+    with open(path, 'wb') as f:
+        pickle.dump(obj, f, protocol=protocol)
+
+
+def pickle_load(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+#%%
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    print(f'{"":<44} {"time":>9} {"peak memory":>14}')
+    measure('list of bands, pickle.dump()', lambda: pickle_dump(bands, tmp / 'bands', pickle.DEFAULT_PROTOCOL))
+    measure('BandTable, pickle.dump() (protocol 4)', lambda: pickle_dump(table, tmp / 'table4', 4))
+    measure('BandTable, dump() (protocol 5, out of band)', lambda: dump(table, tmp / 'table5'))
+
+    measure('list of bands, pickle.load()', lambda: pickle_load(tmp / 'bands'))
+    measure('BandTable, pickle.load() (protocol 4)', lambda: pickle_load(tmp / 'table4'))
+    loaded = measure('BandTable, load() (protocol 5, memory-mapped)', lambda: load(tmp / 'table5'))
+    assert str(loaded[n_bands - 1]) == str(bands[n_bands - 1])
+    measure('  + a query over the loaded start dates', lambda: int((loaded.starts > 719_000).sum()))
+    del loaded
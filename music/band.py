@@ -9,13 +9,21 @@ File I/O and JSON encoding/decoding of Band objects are demonstrated too.
 #%%
 # Setup / Data
 
+import asyncio
 import pickle
+from collections.abc import Sequence
 from datetime import date, datetime, time
+from functools import lru_cache
+from operator import attrgetter
+from itertools import islice
 # import json
 import sys
 
 # from music.musician_module import Musician
-from util.utility import format_date, get_project_dir, get_data_dir
+from settings import PREFERRED_DATE_FORMAT
+from util.utility import format_date, get_project_dir, get_data_dir, open_compressed
+from music.musician import Musician, Singer, Songwriter, SingerSongwriter
+from music.frozen_musician import FrozenMusician, FrozenSinger, FrozenSongwriter, FrozenSingerSongwriter
 
 from testdata.musicians import *
 
@@ -31,6 +39,9 @@ class Band:
     # Insert a class variable (static field), such as genres, date_pattern,...
 
     genres = ['rock', 'Americana', 'acoustic']
+    _rendered_fields = frozenset(('name', 'members', 'start', 'end'))
+    min_name_length = 2
+    earliest_date = date(1954, 7, 5)                # the day Elvis recorded 'That's All Right'
 
     def __init__(self, name, *members, start=date.today(), end=date.today()):
         self.name = name
@@ -39,16 +50,46 @@ class Band:
         self.end = end
 
         # Code to check if the band name is specified correctly (possibly raises BandNameError)
-        if not isinstance(name, str) or len(name) < 2:
+        if not isinstance(name, str) or len(name) < Band.min_name_length:
             raise BandNameError(name)
 
         # self.__i = 0                                  # introduce and initialize iterator counter, self.__i
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in Band._rendered_fields:
+            self.__dict__.pop('_Band__str', None)          # invalidate the cached __str__() result
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_Band__str', None)                       # the cached __str__() result is not worth pickling
+        return state
+
     def __str__(self):
+        # The result is cached in self.__str with the keys of the members it was rendered from (see _NAME_FIRST),
+        # until name, members, start or end are set (see __setattr__()). The members can change without the band
+        # knowing (a member renamed, a list of members changed in place), so their keys are checked on every call;
+        # for the usual members, that is one C-level pass over the members (no Python code per member)
+        members = self.members
+        if _NAME_FIRST.issuperset(map(type, members)):
+            keys = tuple(map(_name, members))
+        else:
+            keys = tuple([m.name if type(m) in _NAME_FIRST else str(m) for m in members])
+        try:
+            cached, cached_keys = self.__str
+            if cached_keys == keys:
+                return cached
+        except AttributeError:
+            pass
+        cached = self.__render(keys)
+        self.__str = cached, keys
+        return cached
+
+    def __render(self, keys):
         n = self.name
-        m = ', '.join([str(m).split(', ')[0] for m in self.members]) if self.members else ''
-        s = format_date(self.start) if self.start else ''
-        e = format_date(self.end) if self.end else ''
+        m = ', '.join([key.partition(', ')[0] for key in keys]) if self.members else ''       # see _NAME_FIRST
+        s = _format_date(self.start) if self.start else ''
+        e = _format_date(self.end) if self.end else ''
         if m and s and e:
             m = f'({m})'
             return f'{n} {m}; formed: {s}; disbanded: {e}'
@@ -75,7 +116,37 @@ class Band:
 
         # members must be compared 'both ways', because the two tuples can be of different length
 
-        return self.__dict__ == other.__dict__ if isinstance(other, Band) else False
+        # return self.__dict__ == other.__dict__ if isinstance(other, Band) else False
+        # ...but __dict__ also holds the cached __str__() result, so compare the fields only
+
+        if not isinstance(other, Band):
+            return False
+        return (self.name == other.name and self.members == other.members
+                and self.start == other.start and self.end == other.end)
+
+    # Alternative constructor
+    @classmethod
+    def from_str(cls, band_string):
+        """Inverted __str__() method.
+        Assumes that band_string is in the format generated by __str__(), i.e.
+            <name> (<member name>, <member name>, ...); formed: <date>; disbanded: <date>
+        where the disbanded part is optional and the dates are in settings.PREFERRED_DATE_FORMAT.
+        Members are created as Musician(<member name>), since only their names are included in the string
+        (their classes and roles, e.g. the vocals of a Singer, are lost), so round trips with __str__() are partial:
+        they keep names and dates exactly for bands with members and a start date. Otherwise, __str__() loses more:
+        a band with no members or no dates is just <name>, and the members of a band with an end date only
+        are not in parentheses (<name> <member name>, ...; disbanded: <date>), so they are read as a part of the name.
+        (The format is also ambiguous for a band with no members whose name ends with ' (...)'; it is read as members.)
+        """
+
+        rest, sep, e = band_string.rpartition('; disbanded: ')
+        rest, end = (rest, _parse_date(e)) if sep else (band_string, None)
+        head, sep, s = rest.rpartition('; formed: ')
+        rest, start = (head, _parse_date(s)) if sep else (rest, None)
+        name, sep, m = rest[:-1].rpartition(' (') if rest.endswith(')') else (rest, '', '')
+        members = [Musician(member) for member in m.split(', ')] if sep else []
+
+        return cls(name if sep else rest, *members, start=start, end=end)
 
     @staticmethod
     def is_date_valid(d):
@@ -83,7 +154,7 @@ class Band:
         So, the valid date to denote the start of a band's career is between Jan 01, 1960, and today.
         """
 
-        return d >= date(1954, 7, 5) and d <= date.today()
+        return d >= Band.earliest_date and d <= date.today()
 
     def __iter__(self):
         """Once __iter__() and __next__() are implemented in a class,
@@ -92,55 +163,158 @@ class Band:
         It is often sufficient to just return self in __iter__(),
         if the iterator counter such as self.__i is introduced and initialized in __init__().
         Alternatively, the iterator counter (self.__i) is introduced and initialized here.
+        However, the counter is then shared by all loops over the same band: two threads (or two nested loops)
+        iterating over it skip each other's members. So the iteration state is kept in a separate iterator object
+        instead - the iterator of the members tuple, which is immutable and can be shared by many threads at once.
         """
 
         # self.__i = 0
         # return self               # sufficient if the iterator counter is introduced and initialized in __init__()
 
-        self.__i = 0
-        return self
+        # def __next__(self):       # ...along with
+        #     if self.__i < len(self.members):
+        #         self.__i += 1
+        #         return self.members[self.__i - 1]
+        #     else:
+        #         raise StopIteration
 
-    def __next__(self):
-        if self.__i < len(self.members):
-            self.__i += 1
-            return self.members[self.__i - 1]
-        else:
-            raise StopIteration
+        return iter(self.members)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __bool__(self):
+        return True                 # a band with no members is still a band (not falsy, as it would be with __len__())
+
+    def __getitem__(self, index):
+        """band[i] is the i-th member; band[i:j] (any slice) is a read-only MembersView of the members (no copying).
+        """
+
+        if isinstance(index, slice):
+            return MembersView(self.members, index)
+        return self.members[index]
+
+    def __aiter__(self):
+        """Async iteration over the members (async for member in band), see async_next_member()."""
+
+        return async_next_member(self)
+
+
+#%%
+class MembersView(Sequence):
+    """A read-only view of a slice of a band's members (e.g., band[1:3]), without copying the members tuple.
+    Slicing a view gives another view of the same tuple; iterating over a view keeps its state in a separate iterator,
+    so views (like bands) can be shared by many threads at once. A view shows the members the band had when
+    the view was taken (band.members is an immutable tuple; assigning a new one does not change existing views).
+    """
+
+    __slots__ = ('__members', '__range')
+
+    def __init__(self, members, index=slice(None)):
+        self.__members = members
+        self.__range = range(len(members))[index]
+
+    def __len__(self):
+        return len(self.__range)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            view = MembersView.__new__(MembersView)
+            view.__members = self.__members
+            view.__range = self.__range[index]
+            return view
+        return self.__members[self.__range[index]]
+
+    def __iter__(self):
+        r = self.__range
+        if r.step == 1:
+            return islice(self.__members, r.start, r.stop)
+        return map(self.__members.__getitem__, r)
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({[m.name for m in self]})'
+
+
+#%%
+# Dates are rendered over and over again (e.g., the same start date for many bands), so cache format_date() results
+_format_date = lru_cache(maxsize=1 << 16)(format_date)
+
+# A band member's part of str(<band>) is str(m).split(', ')[0], which depends on the key of the member only:
+# the name of a musician of one of the _NAME_FIRST classes, whose str() starts with the name (<name>, band member, ...),
+# so that str(m) need not be rendered, or the whole str(m) of any other object
+# (subclasses are not included, since they can override __str__())
+_NAME_FIRST = frozenset((Musician, Singer, Songwriter, SingerSongwriter,
+                         FrozenMusician, FrozenSinger, FrozenSongwriter, FrozenSingerSongwriter))
+_name = attrgetter('name')
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse_date(date_string):
+    """Inverse of format_date()."""
+
+    return datetime.strptime(date_string, PREFERRED_DATE_FORMAT).date()
 
 
 #%%
 # Check class variables
-print(Band.genres)
+if __name__ == '__main__':
+    print(Band.genres)
 
 
 #%%
 # Test the basic methods (__init__(), __str__(),...)
-members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
-buffalo_springfield = Band('Buffalo Springfield', *members,
-                           start=date(1966, 4, 11), end=date(1968, 5, 5))
-print(buffalo_springfield)
-print(buffalo_springfield == Band('Buffalo Springfield', *members,
-                                  start=date(1966, 4, 11), end=date(1968, 5, 5)))
+if __name__ == '__main__':
+    members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
+    buffalo_springfield = Band('Buffalo Springfield', *members,
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    print(buffalo_springfield)
+    print(buffalo_springfield == Band('Buffalo Springfield', *members,
+                                      start=date(1966, 4, 11), end=date(1968, 5, 5)))
+
+#%%
+# The cached str(<band>) follows the changes of the band and of its members (e.g., renaming a member)
+if __name__ == '__main__':
+    buffalo_springfield = Band('Buffalo Springfield', Musician('Neil Young'), Musician('Stephen Stills'),
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    print(buffalo_springfield)
+    buffalo_springfield.members[0].name = 'Neil Percival Young'
+    print(buffalo_springfield)
+    buffalo_springfield.end = None
+    print(buffalo_springfield)
 
 
 #%%
 # Test the date validator (@staticmethod is_date_valid(<date>))
-print(Band.is_date_valid(date(1954, 7, 4)))
+if __name__ == '__main__':
+    print(Band.is_date_valid(date(1954, 7, 4)))
 
 
 #%%
 # Test the iterator (initialize it with iter(<band>) and call next(<iterator) in a loop to return all <band> members)
-members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
-buffalo_springfield = Band('Buffalo Springfield', *members,
-                           start=date(1966, 4, 11), end=date(1968, 5, 5))
-i = iter(buffalo_springfield)
-while True:
-    try:
-        print(next(i))
-    except StopIteration:
-        break
+if __name__ == '__main__':
+    members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
+    buffalo_springfield = Band('Buffalo Springfield', *members,
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    i = iter(buffalo_springfield)
+    while True:
+        try:
+            print(next(i))
+        except StopIteration:
+            break
 
-# print(next(i))
+    # print(next(i))
+
+#%%
+# Test re-entrant iteration (nested loops over the same band), len(<band>), <band>[i] and read-only slice views
+if __name__ == '__main__':
+    pairs = [(a.name, b.name) for a in buffalo_springfield for b in buffalo_springfield if a is not b]
+    print(len(pairs), len(buffalo_springfield))
+    print(buffalo_springfield[0])
+    print(buffalo_springfield[1:3], buffalo_springfield[::-2][1:])
+    print(list(buffalo_springfield[1:3]) == members[1:3])
 
 #%%
 def next_member(band):
@@ -158,30 +332,54 @@ def next_member(band):
 #%%
 # Test next_member(band)
 # (initialize it with next_member(<band>) and call next(<generator>) in a loop to return/generate all <band> members)
-members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
-buffalo_springfield = Band('Buffalo Springfield', *members,
-                           start=date(1966, 4, 11), end=date(1968, 5, 5))
-g = next_member(buffalo_springfield)
-print(g)
-while True:
-    try:
-        print(next(g))
-    except StopIteration:
-        break
+if __name__ == '__main__':
+    members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
+    buffalo_springfield = Band('Buffalo Springfield', *members,
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    g = next_member(buffalo_springfield)
+    print(g)
+    while True:
+        try:
+            print(next(g))
+        except StopIteration:
+            break
 
-# next(g)
+    # next(g)
+
+#%%
+async def async_next_member(band, delay=0):
+    """Async generator variant of next_member(), for asyncio pipeline stages (see music.pipeline).
+    Instead of blocking on input() between members, it awaits asyncio.sleep(delay),
+    which lets the other tasks run in the meantime.
+    """
+
+    for member in band.members:
+        await asyncio.sleep(delay)
+        yield member
+
+
+#%%
+# Test async_next_member(band) (async for <member> in <band> uses it too)
+if __name__ == '__main__':
+    async def show_members(band):
+        async for member in async_next_member(band, delay=0.01):
+            print(member)
+        print([member.name async for member in band])
+
+    asyncio.run(show_members(buffalo_springfield))
 
 #%%
 # Demonstrate generator expressions
-g = (x**2 for x in range(5))
-print(g)
-while True:
-    try:
-        print(next(g))
-    except StopIteration:
-        break
+if __name__ == '__main__':
+    g = (x**2 for x in range(5))
+    print(g)
+    while True:
+        try:
+            print(next(g))
+        except StopIteration:
+            break
 
-print(list(g))
+    print(list(g))
 
 #%%
 class BandError(Exception):
@@ -215,140 +413,245 @@ class BandNameError(BandError):
 # (relevant for exception handling).
 # To write error messages to the exception console, use sys.stderr.write(f'...').
 
-members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
-# print(members[5])
+if __name__ == '__main__':
+    members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
+    # print(members[5])
 
-# try:
-#     print(members[5])
-# except:
-#     print('There is NO 6th element in the members list')
+    # try:
+    #     print(members[5])
+    # except:
+    #     print('There is NO 6th element in the members list')
 
-try:
-    print(members[5])
-except Exception as e:
-    # print(e)
-    # print(e.args)
-    # print(e.args[0])
-    # print(type(e).__name__, e.args[0])
-    # print(f'{type(e).__name__}, {e.args[0]}')
-    sys.stderr.write(f'{type(e).__name__}: {e.args[0]}')
+    try:
+        print(members[5])
+    except Exception as e:
+        # print(e)
+        # print(e.args)
+        # print(e.args[0])
+        # print(type(e).__name__, e.args[0])
+        # print(f'{type(e).__name__}, {e.args[0]}')
+        sys.stderr.write(f'{type(e).__name__}: {e.args[0]}')
 
 
 #%%
 # Catching multiple exceptions and the 'finally' clause
-members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
-try:
-    for i in range(5):
-        print(members[i])
-    print(2 / 0)
-except IndexError as e:
-    sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
-except ZeroDivisionError as e:
-    sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
-finally:
-    print('This is printed no matter whether an exception is raised or not.')
+if __name__ == '__main__':
+    members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
+    try:
+        for i in range(5):
+            print(members[i])
+        print(2 / 0)
+    except IndexError as e:
+        sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
+    except ZeroDivisionError as e:
+        sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
+    finally:
+        print('This is printed no matter whether an exception is raised or not.')
 
 
 #%%
 # Using the 'else' clause (must be after all 'except' clauses)
-members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
-try:
-    for i in range(5):
-        print(members[i])
-    # print(2 / 0)
-except IndexError as e:
-    sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
-except ZeroDivisionError as e:
-    sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
-else:
-    print('This is printed only if no exception was raised.')
-finally:
-    print('This is printed no matter whether an exception is raised or not.')
+if __name__ == '__main__':
+    members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
+    try:
+        for i in range(5):
+            print(members[i])
+        # print(2 / 0)
+    except IndexError as e:
+        sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
+    except ZeroDivisionError as e:
+        sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
+    else:
+        print('This is printed only if no exception was raised.')
+    finally:
+        print('This is printed no matter whether an exception is raised or not.')
 
 
 #%%
 # Catching 'any' exception - empty 'except' clause
-members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
-try:
-    for i in range(5):
-        print(members[i])
-    print(2 / 0)
-except:
-    sys.stderr.write(f'\n\nWell... an exception was raised...')
+if __name__ == '__main__':
+    members = [neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin]
+    try:
+        for i in range(5):
+            print(members[i])
+        print(2 / 0)
+    except:
+        sys.stderr.write(f'\n\nWell... an exception was raised...')
 
 
 #%%
 # Catching user-defined exceptions
-try:
-    # buffaloSpringfield = Band('Buffalo Springfield',
-    #                       *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
-    #                       start=date(1966, 4, 11), end=date(1968, 5, 5))
-    buffaloSpringfield = Band('B',
-                          *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
-                          start=date(1966, 4, 11), end=date(1968, 5, 5))
-    print(buffaloSpringfield)
-except BandNameError as e:
-    sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
+if __name__ == '__main__':
+    try:
+        # buffaloSpringfield = Band('Buffalo Springfield',
+        #                       *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+        #                       start=date(1966, 4, 11), end=date(1968, 5, 5))
+        buffaloSpringfield = Band('B',
+                              *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                              start=date(1966, 4, 11), end=date(1968, 5, 5))
+        print(buffaloSpringfield)
+    except BandNameError as e:
+        sys.stderr.write(f'\n\n{type(e).__name__}: {e.args[0]}')
 
 #%%
 # Demonstrate working with files
 
-theBeatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
-                  start=date(1957, 7, 6), end=date(1970, 4, 10))
-theRollingStones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
-                        start=date(1962, 7, 12))
-buffaloSpringfield = Band('Buffalo Springfield',
-                          *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
-                          start=date(1966, 4, 11), end=date(1968, 5, 5))
+if __name__ == '__main__':
+    theBeatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                      start=date(1957, 7, 6), end=date(1970, 4, 10))
+    theRollingStones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
+                            start=date(1962, 7, 12))
+    buffaloSpringfield = Band('Buffalo Springfield',
+                              *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                              start=date(1966, 4, 11), end=date(1968, 5, 5))
 
-bands = [theBeatles, theRollingStones, buffaloSpringfield]
+    bands = [theBeatles, theRollingStones, buffaloSpringfield]
 
 
 #%%
 # Writing to a text file - <outfile>.write(str(<obj>), <outfile>.writelines([str(<obj>)+'\n' for <obj> in <objs>])
-file = get_data_dir() / 'band.txt'
-with open(file, 'w') as f:
-    # for band in bands:
-    #     f.write(str(band) + '\n')
-    f.writelines([str(b) + '\n' for b in bands])
-print('Done')
+if __name__ == '__main__':
+    file = get_data_dir() / 'band.txt'
+    with open(file, 'w') as f:
+        # for band in bands:
+        #     f.write(str(band) + '\n')
+        f.writelines([str(b) + '\n' for b in bands])
+    print('Done')
+
+#%%
+def write_bands(bands, path, buffer_size=1 << 20, compression=None, level=None):
+    """Writes str(<band>) for each band from an iterable (e.g., a generator) to a text file, one band per line.
+    Unlike <outfile>.writelines([str(b) + '\n' for b in bands]), it does not build a list of all the strings,
+    but renders the bands one by one into a buffered writer.
+    The file is compressed as it is written if compression is given or implied by the suffix of path
+    (e.g., band.txt.gz; see util.utility.open_compressed()).
+    """
+
+    with open_compressed(path, 'wt', compression, level, buffer_size=buffer_size) as f:
+        write = f.write
+        for band in bands:
+            write(str(band))
+            write('\n')
+
+
+#%%
+# Writing to a text file with write_bands()
+if __name__ == '__main__':
+    file = get_data_dir() / 'band.txt'
+    write_bands(bands, file)
+    print('Done')
 
 #%%
 # Demonstrate reading from a text file - <infile>.readline(), <infile>.readlines(), <infile>.read()
-file = get_data_dir() / 'band.txt'
-with open(file, 'r') as f:
-    # lines = f.readlines()
+if __name__ == '__main__':
+    file = get_data_dir() / 'band.txt'
+    with open(file, 'r') as f:
+        # lines = f.readlines()
+
+        # lines = []
+        # for line in f:
+        #     lines.append(line.strip())
+
+        # lines = ''                     # lines += line in the loop below would copy lines over and over again
+        lines = []
+        while True:
+            line = f.readline()
+            if line:
+                lines.append(line)
+            else:
+                break
+        lines = ''.join(lines)
+
+        # lines = f.read()
+    print(lines)
+    print(type(lines))
 
-    # lines = []
-    # for line in f:
-    #     lines.append(line.strip())
+#%%
+def read_bands(path, buffer_size=1 << 20, compression=None, errors=None):
+    """Generator of Band objects from a text file written by write_bands() (one str(<band>) per line),
+    reading the file in large buffered chunks and parsing one line at a time with Band.from_str()
+    (see its docstring for what the text format keeps of a band).
+    A compressed file is decompressed as it is read (see util.utility.open_compressed()).
+    Lines that cannot be parsed (e.g., an invalid date or a too short band name) are skipped, so that one bad line
+    does not end the whole stream; if errors is a list, (line number, line, exception) is appended to it for each.
+    """
+
+    with open_compressed(path, 'rt', compression, buffer_size=buffer_size) as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            try:
+                band = Band.from_str(line)
+            except (ValueError, BandError) as e:
+                if errors is not None:
+                    errors.append((number, line, e))
+                continue
+            yield band
 
-    lines = ''
-    while True:
-        line = f.readline()
-        if line:
-            lines += line
-        else:
-            break
 
-    # lines = f.read()
-print(lines)
-print(type(lines))
+#%%
+# Demonstrate reading from a text file with read_bands() (round trip with write_bands())
+if __name__ == '__main__':
+    file = get_data_dir() / 'band.txt'
+    for b, b_loaded in zip(bands, read_bands(file)):
+        print(b_loaded, b_loaded == b)
+
+    # Bad lines are skipped (and collected in errors), the rest of the file is still read
+    with open(file, 'a') as f:
+        f.write('X (Nobody); formed: Jan 01, 1970\nThe Byrds (Roger McGuinn); formed: someday\n')
+        f.write(str(bands[0]) + '\n')
+    errors = []
+    print(len(list(read_bands(file, errors=errors))), [(number, type(e).__name__) for number, _, e in errors])
+
+#%%
+# Demonstrate writing to and reading from a compressed text file (the compression is implied by the suffix)
+if __name__ == '__main__':
+    file = get_data_dir() / 'band.txt.gz'
+    write_bands(bands, file, level=6)
+    for b in read_bands(file):
+        print(b)
 
 #%%
 # Demonstrate writing to a binary file - pickle.dump(<obj>, <outfile>)
-file = get_data_dir() / 'band'
-with open(file, 'wb') as f:
-    pickle.dump(bands, f, )
-print('Done')
+if __name__ == '__main__':
+    file = get_data_dir() / 'band'
+    with open(file, 'wb') as f:
+        pickle.dump(bands, f, )
+    print('Done')
 
 #%%
 # Demonstrate reading from a binary file - pickle.load(<infile>)
-file = get_data_dir() / 'band'
-with open(file, 'rb') as f:
-    bands_loaded = pickle.load(f)
-for b in bands_loaded:
-    print(b)
+if __name__ == '__main__':
+    file = get_data_dir() / 'band'
+    with open(file, 'rb') as f:
+        bands_loaded = pickle.load(f)
+    for b in bands_loaded:
+        print(b)
+
+#%%
+# Pickles written before Vocals and Instrument became flags store the old Instrument values (BASS = 3, DRUMS = 4),
+# which pickle.load() reads as other instruments; music.enums.load()/loads() read both old and current pickles
+if __name__ == '__main__':
+    import music.enums
+
+    old_bass = b'cmusic.enums\nInstrument\n(I3\ntR.'             # an old pickle of Instrument.BASS (protocol 0)
+    print(pickle.loads(old_bass), music.enums.loads(old_bass))
+    file = get_data_dir() / 'band'
+    with open(file, 'rb') as f:
+        print(music.enums.load(f) == bands_loaded)
+
+#%%
+# Demonstrate pickle.dump(<obj>, <outfile>) and pickle.load(<infile>) with a compressed file
+# (pickle writes/reads the file in frames, which are compressed/decompressed as they are written/read)
+if __name__ == '__main__':
+    file = get_data_dir() / 'band.xz'
+    with open_compressed(file, 'wb') as f:
+        pickle.dump(bands, f)
+    with open_compressed(file, 'rb') as f:
+        bands_loaded = pickle.load(f)
+    for b in bands_loaded:
+        print(b)
 
 #%%
 # Demonstrate JSON encoding/decoding of Band objects
@@ -369,29 +672,30 @@ for b in bands_loaded:
 # so you might have to provide cls_lookup_map when decoding.
 
 # Single object
-from json_tricks import loads, dumps
-buffaloSpringfield = Band('Buffalo Springfield',
-                          *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
-                          start=date(1966, 4, 11), end=date(1968, 5, 5))
-
-bs = dumps(buffaloSpringfield)
-print(bs)
-bs_loaded = loads(bs)
-print(bs_loaded)
-
-# List of objects
-
-theBeatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
-                  start=date(1957, 7, 6), end=date(1970, 4, 10))
-theRollingStones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
-                        start=date(1962, 7, 12))
-buffaloSpringfield = Band('Buffalo Springfield',
-                          *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
-                          start=date(1966, 4, 11), end=date(1968, 5, 5))
-
-bands = [theBeatles, theRollingStones, buffaloSpringfield]
-
-bands_dumped = dumps(bands)
-for b in loads(bands_dumped):
-    print(b)
+if __name__ == '__main__':
+    from json_tricks import loads, dumps
+    buffaloSpringfield = Band('Buffalo Springfield',
+                              *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                              start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    bs = dumps(buffaloSpringfield)
+    print(bs)
+    bs_loaded = loads(bs)
+    print(bs_loaded)
+
+    # List of objects
+
+    theBeatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                      start=date(1957, 7, 6), end=date(1970, 4, 10))
+    theRollingStones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
+                            start=date(1962, 7, 12))
+    buffaloSpringfield = Band('Buffalo Springfield',
+                              *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                              start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    bands = [theBeatles, theRollingStones, buffaloSpringfield]
+
+    bands_dumped = dumps(bands)
+    for b in loads(bands_dumped):
+        print(b)
 
@@ -0,0 +1,239 @@
+"""A read-only, memory-mapped archive of Band and Musician data, for read-heavy analytics in many processes.
+
+Unpickling a catalog of bands gives every process its own copy of all the objects. An archive file is instead
+made of fixed-width record arrays that are mapped into memory (mmap) and viewed as NumPy structured arrays
+without copying, so that the processes opening the same archive share the pages of the OS page cache,
+and only the pages that are actually read are loaded from disk. The file consists of:
+- a header: magic bytes, format version, and the number of records in each of the following sections
+- musician records: name (offset and length in the string heap), kind, is_band_member, vocals and instrument codes
+- band records: name, start and end date (ordinals, 0 for None), members (offset and count in the member references)
+- member references: the musician record index of each member of each band, band by band
+- the string heap: all names, UTF-8 encoded, one after another (each distinct musician's name is stored once)
+Column accessors (names, dates, members) read the arrays directly; Band and Musician objects are materialized
+lazily, only when asked for (archive[i], archive.musician(j)).
+"""
+
+
+#%%
+# Setup / Data
+
+import mmap
+from datetime import date
+
+import numpy as np
+
+from music.enums import Vocals, Instrument
+from music.interning import musician_key
+from music.musician import MUSICIAN_KINDS
+from music.frozen_musician import FROZEN_KINDS
+from music.band import Band
+
+MAGIC = b'MUSA'
+VERSION = 1
+
+NONE_CODE = 0                           # vocals/instrument code of a missing role, and the ordinal of a missing date
+
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u4'), ('musicians', '<u8'), ('bands', '<u8'),
+                         ('member_refs', '<u8'), ('heap', '<u8')])
+MUSICIAN_DTYPE = np.dtype([('name_offset', '<u8'), ('name_length', '<u4'), ('kind', 'u1'),
+                           ('is_band_member', '?'), ('vocals', 'u1'), ('instrument', 'u1')])
+BAND_DTYPE = np.dtype([('name_offset', '<u8'), ('name_length', '<u4'), ('start', '<i4'), ('end', '<i4'),
+                       ('members_offset', '<u8'), ('members_count', '<u4')])
+MEMBER_REF_DTYPE = np.dtype('<u4')
+
+_KIND_CODES = {kind: code for kinds in (MUSICIAN_KINDS, FROZEN_KINDS) for code, kind in enumerate(kinds)}
+
+
+#%%
+def write_archive(bands, path):
+    """Writes an iterable of Band objects (and their members) to an archive file at path.
+    Returns the number of bands written.
+    """
+
+    heap = bytearray()
+    musicians, musician_index = [], {}          # musician records; musician_key(m) -> record index
+    band_records, member_refs = [], []
+
+    def add_name(name):
+        offset = len(heap)
+        heap.extend(name.encode('utf-8'))
+        return offset, len(heap) - offset
+
+    for band in bands:
+        refs_offset = len(member_refs)
+        for m in band.members:
+            key = musician_key(m)
+            j = musician_index.get(key)
+            if j is None:
+                j = musician_index[key] = len(musicians)
+                v = getattr(m, 'vocals', None)
+                i = getattr(m, 'instrument', None)
+                musicians.append((*add_name(m.name), _KIND_CODES[m.__class__], m.is_band_member,
+                                  v.value if v is not None else NONE_CODE, i.value if i is not None else NONE_CODE))
+            member_refs.append(j)
+        band_records.append((*add_name(band.name), _ordinal(band.start), _ordinal(band.end),
+                             refs_offset, len(band.members)))
+
+    header = np.array([(MAGIC, VERSION, len(musicians), len(band_records), len(member_refs), len(heap))],
+                      dtype=HEADER_DTYPE)
+    with open(path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(np.array(musicians, dtype=MUSICIAN_DTYPE).tobytes())
+        f.write(np.array(band_records, dtype=BAND_DTYPE).tobytes())
+        f.write(np.array(member_refs, dtype=MEMBER_REF_DTYPE).tobytes())
+        f.write(heap)
+    return len(band_records)
+
+
+#%%
+class BandArchive:
+    """A read-only view of an archive file (see the module docstring).
+    archive[i] materializes the Band object from band record i, and iterating materializes them one at a time;
+    the record arrays (musicians, bands, member_refs) and the column accessors do not create any objects.
+    Use as a context manager, or call close() when done. Arrays taken from the archive (the record arrays,
+    members_of() slices) stay readable after close(): while any of them is alive, the file stays mapped,
+    and it is unmapped when the last of them is garbage collected.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = np.frombuffer(self.__mmap, dtype=HEADER_DTYPE, count=1)[0].item()
+        magic, version, n_musicians, n_bands, n_member_refs, heap_size = header
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a band archive')
+        if version > VERSION:
+            raise ValueError(f'Unsupported band archive version {version} (max {VERSION})')
+        offset = HEADER_DTYPE.itemsize
+        self.musicians, offset = self.__section(MUSICIAN_DTYPE, n_musicians, offset)
+        self.bands, offset = self.__section(BAND_DTYPE, n_bands, offset)
+        self.member_refs, offset = self.__section(MEMBER_REF_DTYPE, n_member_refs, offset)
+        self.__heap_start = offset
+        self.heap, offset = self.__section(np.uint8, heap_size, offset)
+
+    def __section(self, dtype, count, offset):
+        """Returns a (zero-copy, read-only) array of count records of dtype at offset, and the offset after it."""
+
+        array = np.frombuffer(self.__mmap, dtype=dtype, count=count, offset=offset)
+        return array, offset + array.nbytes
+
+    def close(self):
+        self.musicians = self.bands = self.member_refs = self.heap = None
+        mapping, self.__mmap = self.__mmap, None
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                pass                    # arrays still export the mapping: it is unmapped when they are released
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.bands)
+
+    def __str__(self):
+        return (f'{self.__class__.__name__} ({len(self)} bands, {len(self.musicians)} musicians, '
+                f'{len(self.__mmap)} bytes)')
+
+    def __string(self, offset, length):
+        start = self.__heap_start + int(offset)
+        return self.__mmap[start:start + int(length)].decode('utf-8')
+
+    # Column accessors
+
+    def name(self, i):
+        """The name of band i."""
+
+        record = self.bands[i]
+        return self.__string(record['name_offset'], record['name_length'])
+
+    def musician_name(self, j):
+        """The name of musician j."""
+
+        record = self.musicians[j]
+        return self.__string(record['name_offset'], record['name_length'])
+
+    def members_of(self, i):
+        """The musician record indices of the members of band i (a zero-copy array)."""
+
+        record = self.bands[i]
+        offset = int(record['members_offset'])
+        return self.member_refs[offset:offset + int(record['members_count'])]
+
+    def active_on(self, day):
+        """Returns the indices of the bands active on day (bands with no start/end date are treated
+        as active since ever/still active).
+        """
+
+        d = day.toordinal()
+        starts, ends = self.bands['start'], self.bands['end']
+        return np.flatnonzero(((starts == NONE_CODE) | (starts <= d)) & ((ends == NONE_CODE) | (ends >= d)))
+
+    # Lazy materialization
+
+    def musician(self, j):
+        """Materializes the Musician (Singer, Songwriter, SingerSongwriter) object from musician record j.
+        """
+
+        record = self.musicians[j]
+        kwargs = {'name': self.musician_name(j), 'is_band_member': bool(record['is_band_member'])}
+        if record['vocals'] != NONE_CODE:
+            kwargs['vocals'] = Vocals(int(record['vocals']))
+        if record['instrument'] != NONE_CODE:
+            kwargs['instrument'] = Instrument(int(record['instrument']))
+        return MUSICIAN_KINDS[record['kind']](**kwargs)
+
+    def __getitem__(self, i):
+        """Materializes the Band object from band record i.
+        """
+
+        record = self.bands[i]
+        return Band(self.name(i), *[self.musician(j) for j in self.members_of(i)],
+                    start=_date(record['start']), end=_date(record['end']))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+#%%
+# Helpers
+
+def _ordinal(d):
+    return d.toordinal() if isinstance(d, date) else NONE_CODE
+
+
+def _date(ordinal):
+    return date.fromordinal(int(ordinal)) if ordinal != NONE_CODE else None
+
+
+#%%
+# Demonstrate writing and reading a band archive
+if __name__ == '__main__':
+    from music.frozen_musician import FrozenMusician
+    from testdata.musicians import *
+    from util.utility import get_data_dir
+
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+    the_rolling_stones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
+                              start=date(1962, 7, 12), end=None)
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    crosby_nash = Band('Crosby & Nash', *map(FrozenMusician, ['David Crosby', 'Graham Nash']),
+                       start=date(1970, 1, 1))          # frozen members are stored as the mutable classes
+
+    file = get_data_dir() / 'band.archive'
+    write_archive([the_beatles, the_rolling_stones, buffalo_springfield, crosby_nash], file)
+    with BandArchive(file) as archive:
+        print(archive)
+        print([archive.name(i) for i in archive.active_on(date(1969, 8, 16))])
+        print([archive.musician_name(j) for j in archive.members_of(2)])
+        print(archive[0])
+        print(archive[3])
+        kept = archive.members_of(0)
+    print(kept)                             # a view taken from the archive is still readable after close()
@@ -0,0 +1,135 @@
+"""A registry of Band objects with a reverse index from musicians to the bands they play in.
+
+Band.members is a plain tuple, so finding all bands of a musician means scanning all bands.
+BandRegistry keeps, for each registered band, the set of its members' keys (music.interning.musician_key()),
+and, for each musician key, the set of bands the musician plays in;
+both are updated incrementally as bands are added or removed.
+Other indices (e.g., music.graph.CollaborationGraph) can follow the registry as listeners (see listen()).
+"""
+
+
+#%%
+# Setup / Data
+
+from music.interning import musician_key
+from music.band import Band
+
+
+#%%
+class BandRegistry:
+    """Registered bands, with constant-time membership queries:
+    - bands_of(musician) - all registered bands that the musician plays in
+    - is_member(musician, band) - does the musician play in the band
+    - shares_members(band_a, band_b) - do the two bands have at least one member in common
+    Bands are identified by object identity (Band objects are not hashable), so a band must be registered
+    (and removed) as the same object; a band registered more than once is indexed only once.
+    """
+
+    def __init__(self, bands=()):
+        self.__bands = {}                   # id(band) -> band
+        self.__members = {}                 # id(band) -> frozenset of member keys
+        self.__bands_of = {}                # member key -> {id(band): band}
+        self.__listeners = []
+        for band in bands:
+            self.add(band)
+
+    def add(self, band):
+        """Registers a band and indexes its members.
+        """
+
+        if not isinstance(band, Band):
+            raise TypeError(f'Only Band objects can be registered, not {type(band).__name__}')
+        band_id = id(band)
+        if band_id in self.__bands:
+            return
+        members = frozenset(musician_key(m) for m in band.members)
+        self.__bands[band_id] = band
+        self.__members[band_id] = members
+        for key in members:
+            self.__bands_of.setdefault(key, {})[band_id] = band
+        for listener in self.__listeners:
+            listener.add(band)
+
+    def remove(self, band):
+        """Removes a registered band (KeyError if it is not registered).
+        """
+
+        band_id = id(band)
+        del self.__bands[band_id]
+        for key in self.__members.pop(band_id):
+            bands = self.__bands_of[key]
+            del bands[band_id]
+            if not bands:
+                del self.__bands_of[key]
+        for listener in self.__listeners:
+            listener.remove(band)
+
+    def listen(self, listener):
+        """Registers a listener: an object with add(band) and remove(band) methods, which are called
+        whenever a band is added to or removed from the registry.
+        The bands registered so far are passed to listener.add() right away.
+        """
+
+        for band in self.__bands.values():
+            listener.add(band)
+        self.__listeners.append(listener)
+
+    def unlisten(self, listener):
+        """Unregisters a listener (ValueError if it is not registered)."""
+
+        self.__listeners.remove(listener)
+
+    def __contains__(self, band):
+        return id(band) in self.__bands
+
+    def __len__(self):
+        return len(self.__bands)
+
+    def __iter__(self):
+        return iter(list(self.__bands.values()))
+
+    def bands_of(self, musician):
+        """Returns the list of registered bands that the musician plays in.
+        """
+
+        return list(self.__bands_of.get(musician_key(musician), {}).values())
+
+    def is_member(self, musician, band):
+        """Returns True if the musician is a member of the (registered) band.
+        """
+
+        members = self.__members.get(id(band))
+        return members is not None and musician_key(musician) in members
+
+    def shares_members(self, band_a, band_b):
+        """Returns True if the two (registered) bands have at least one member in common.
+        """
+
+        return not self.__members[id(band_a)].isdisjoint(self.__members[id(band_b)])
+
+    def musicians(self):
+        """Returns the number of distinct musicians playing in the registered bands.
+        """
+
+        return len(self.__bands_of)
+
+
+#%%
+# Demonstrate BandRegistry
+if __name__ == '__main__':
+    from datetime import date
+
+    from testdata.musicians import *
+
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    csny = Band('Crosby, Stills, Nash & Young', *[Musician('David Crosby'), stephenStills, Musician('Graham Nash'), neilYoung],
+                start=date(1969, 1, 1))
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+
+    registry = BandRegistry([buffalo_springfield, csny, the_beatles])
+    print([b.name for b in registry.bands_of(neilYoung)])
+    print(registry.is_member(neilYoung, the_beatles), registry.shares_members(buffalo_springfield, csny))
+    registry.remove(csny)
+    print([b.name for b in registry.bands_of(Musician('Neil Young'))])
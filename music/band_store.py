@@ -0,0 +1,271 @@
+"""An append-only store of Band objects, with a sidecar index from band names to record offsets.
+
+pickle.dump(<list of bands>, f) (as in music.band) means that reading one band requires unpickling all of them,
+and adding one band requires rewriting the whole file. Here, each band is pickled separately and appended
+to a record log, as a record of the form
+    <kind: 1 byte> <payload length: 4 bytes> <payload>
+where kind is BAND (the payload is the pickled band) or DELETED (a tombstone; the payload is the band name in UTF-8).
+A band is read with a single seek() and read() at the offset found in the index; appending a band with the name
+of an existing one replaces it (the old record becomes garbage), and compact() rewrites the log without garbage.
+The index is saved to <log path>.idx on close(), with the size and modification time of the log it indexes;
+on opening, an index that does not match the log exactly (e.g., if records were appended after it was saved
+because the store was not closed properly, or if the log was replaced) is discarded, and the index is rebuilt
+from the log, as is a missing one.
+Band payloads can be compressed record by record (the high 4 bits of kind identify the compressor, see COMPRESSORS),
+so that a record is still read with a single seek() and read(). Records are small, so zlib is the best fit;
+bz2 and lzma add headers of tens of bytes to every record and pay off only for bands with very many members.
+"""
+
+
+#%%
+# Setup / Data
+
+import bz2
+import lzma
+import os
+import pickle
+import struct
+import zlib
+from pathlib import Path
+
+from music.band import Band
+
+BAND = 1
+DELETED = 0
+
+COMPRESSORS = {None: 0, 'zlib': 1, 'bz2': 2, 'lzma': 3}         # compression -> code in the high bits of kind
+_modules = {1: zlib, 2: bz2, 3: lzma}
+_level_keywords = {1: 'level', 2: 'compresslevel', 3: 'preset'}
+
+_header = struct.Struct('<BI')              # record kind, payload length
+
+
+#%%
+class BandStore:
+    """A record log of bands (see the module docstring), indexed by band name.
+    Use as a context manager, or call close() when done (to save the index).
+    """
+
+    def __init__(self, path, compression=None, level=None):
+        """compression ('zlib', 'bz2', 'lzma' or None) and level (the compressor's level or preset)
+        apply to the bands appended from now on; existing records are read whatever their compression.
+        """
+
+        if compression not in COMPRESSORS:
+            raise ValueError(f'Unknown compression {compression!r} (expected one of {", ".join(COMPRESSORS)})')
+        self.compression = compression
+        self.level = level
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + '.idx')
+        self.__file = open(self.path, 'a+b')
+        self.__index = {}                   # band name -> offset of its record
+        self.garbage = 0                    # bytes in replaced and deleted records (including tombstones)
+        self.__load_index()
+
+    def __load_index(self):
+        if self.index_path.exists():
+            with open(self.index_path, 'rb') as f:
+                stamp, index, garbage = pickle.load(f)
+            if stamp == self.__stamp():
+                self.__index, self.garbage = index, garbage
+                return
+        self.__scan(0, self.__file.seek(0, os.SEEK_END))
+
+    def __stamp(self):
+        """(size, modification time) of the log file, saved with the index to check that it still matches the log."""
+
+        stat = os.fstat(self.__file.fileno())
+        return stat.st_size, stat.st_mtime_ns
+
+    def __scan(self, offset, size):
+        """Indexes the records from offset to size."""
+
+        self.__file.seek(offset)
+        while offset < size:
+            header = self.__file.read(_header.size)
+            if len(header) < _header.size:
+                break                       # a record truncated by a crash; overwritten by the next append
+            kind, length = _header.unpack(header)
+            payload = self.__file.read(length)
+            if len(payload) < length:
+                break
+            name = _decode(kind, payload).name if kind & 0xF == BAND else payload.decode('utf-8')
+            self.__drop(name)
+            if kind & 0xF == BAND:
+                self.__index[name] = offset
+            else:
+                self.garbage += _header.size + length
+            offset += _header.size + length
+            self.__file.seek(offset)                # __drop() may have moved the file position
+        if offset < size:
+            self.__file.truncate(offset)
+
+    def __drop(self, name):
+        """Removes the name from the index, counting its record as garbage."""
+
+        offset = self.__index.pop(name, None)
+        if offset is not None:
+            self.__file.seek(offset)
+            self.garbage += _header.size + _header.unpack(self.__file.read(_header.size))[1]
+
+    def __len__(self):
+        return len(self.__index)
+
+    def __contains__(self, name):
+        return name in self.__index
+
+    def __iter__(self):
+        """Iterates over the names of the stored bands."""
+
+        return iter(list(self.__index))
+
+    def __getitem__(self, name):
+        offset = self.__index[name]
+        self.__file.seek(offset)
+        kind, length = _header.unpack(self.__file.read(_header.size))
+        return _decode(kind, self.__file.read(length))
+
+    def get(self, name, default=None):
+        """Returns the band with the given name (default if there is no such band).
+        """
+
+        return self[name] if name in self.__index else default
+
+    def append(self, band):
+        """Appends a band to the log, replacing the stored band with the same name (if any).
+        """
+
+        if not isinstance(band, Band):
+            raise TypeError(f'Only Band objects can be stored, not {type(band).__name__}')
+        self.__drop(band.name)
+        code = COMPRESSORS[self.compression]
+        self.__index[band.name] = self.__write(BAND | code << 4, _encode(band, code, self.level))
+
+    def append_all(self, bands):
+        for band in bands:
+            self.append(band)
+
+    def delete(self, name):
+        """Deletes the band with the given name (KeyError if there is no such band), by appending a tombstone.
+        """
+
+        if name not in self.__index:
+            raise KeyError(name)
+        self.__drop(name)
+        payload = name.encode('utf-8')
+        self.__write(DELETED, payload)
+        self.garbage += _header.size + len(payload)
+
+    def __write(self, kind, payload):
+        offset = self.__file.seek(0, os.SEEK_END)
+        self.__file.write(_header.pack(kind, len(payload)))
+        self.__file.write(payload)
+        return offset
+
+    def bands(self):
+        """Generator of the stored bands, in the order of their records in the log.
+        """
+
+        for name, offset in sorted(self.__index.items(), key=lambda item: item[1]):
+            yield self[name]
+
+    def size(self):
+        """The size of the log file in bytes."""
+
+        return self.__file.seek(0, os.SEEK_END)
+
+    def compact(self):
+        """Rewrites the log with the live records only (in their current order) and saves the index.
+        The new log is written to a temporary file first, which then atomically replaces the old one.
+        """
+
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        index = {}
+        with open(tmp_path, 'wb') as tmp:
+            for name, offset in sorted(self.__index.items(), key=lambda item: item[1]):
+                self.__file.seek(offset)
+                header = self.__file.read(_header.size)
+                index[name] = tmp.tell()
+                tmp.write(header)
+                tmp.write(self.__file.read(_header.unpack(header)[1]))
+        self.__file.close()
+        os.replace(tmp_path, self.path)
+        self.__file = open(self.path, 'a+b')
+        self.__index = index
+        self.garbage = 0
+        self.save_index()
+
+    def save_index(self):
+        """Flushes the log and saves the index (atomically, like compact())."""
+
+        self.__file.flush()
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((self.__stamp(), self.__index, self.garbage), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
+
+    def close(self):
+        if not self.__file.closed:
+            self.save_index()
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+#%%
+# Helpers
+
+def _encode(band, code, level):
+    """Pickles a band, compressing the result with the compressor with the given code (if any)."""
+
+    payload = pickle.dumps(band, protocol=pickle.HIGHEST_PROTOCOL)
+    if not code:
+        return payload
+    kwargs = {} if level is None else {_level_keywords[code]: level}
+    return _modules[code].compress(payload, **kwargs)
+
+
+def _decode(kind, payload):
+    """Unpickles a band record's payload, decompressing it first if the kind says so."""
+
+    code = kind >> 4
+    return pickle.loads(_modules[code].decompress(payload) if code else payload)
+
+
+#%%
+# Demonstrate BandStore
+if __name__ == '__main__':
+    from datetime import date
+
+    from testdata.musicians import *
+    from util.utility import get_data_dir
+
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+    the_rolling_stones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
+                              start=date(1962, 7, 12), end=None)
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    file = get_data_dir() / 'band.store'
+    with BandStore(file) as store:
+        store.append_all([the_beatles, the_rolling_stones, buffalo_springfield])
+        the_rolling_stones.members = the_rolling_stones.members[:2]
+        store.append(the_rolling_stones)                    # replaces the stored band
+        store.delete('The Beatles')
+        print(len(store), store.size(), store.garbage)
+        store.compact()
+        print(len(store), store.size(), store.garbage)
+
+    with BandStore(file) as store:                          # reopened with the saved index
+        print(store['The Rolling Stones'])
+        print(store.get('The Beatles'))
+
+    with open(file, 'ab') as log:                           # the log changes behind the store's back
+        log.write(file.read_bytes())                        # (the same records again: replaced bands)
+    with BandStore(file) as store:                          # the stale index is rebuilt
+        print(len(store), store.size(), store.garbage, store['Buffalo Springfield'].name)
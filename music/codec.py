@@ -0,0 +1,236 @@
+"""Compact, versioned binary format for Musician (Singer, Songwriter, SingerSongwriter) and Band objects.
+
+Unlike json_tricks (which stores the module and class names, and all field names, with every object)
+and pickle, the format stores:
+- a header: magic bytes, format version and the enum code table (name and code of each Vocals/Instrument member)
+- each distinct musician only once (a musician definition record); bands refer to their members by index
+- names as length-prefixed UTF-8 strings, dates as ordinals (date.toordinal(), 0 for None)
+- vocals and instruments as codes (<flag>.value); since version 2, a code can be a combination (bit mask) of codes
+Encoding and decoding are streaming: objects are written one at a time, and read back lazily by a generator.
+"""
+
+
+#%%
+# Setup / Data
+
+import struct
+from datetime import date
+from functools import reduce
+from operator import or_
+
+from music.enums import Vocals, Instrument
+from music.interning import musician_key
+from music.musician import Musician, SingerSongwriter, MUSICIAN_KINDS
+from music.frozen_musician import FrozenMusician, FROZEN_KINDS
+from music.band import Band
+from util.utility import open_compressed
+
+MAGIC = b'MUSB'
+VERSION = 2
+
+# Record tags
+MUSICIAN_DEF = 1                    # defines the next musician index (not a top-level object by itself)
+MUSICIAN = 2                        # a top-level musician, referring to a musician definition
+BAND = 3
+
+_u8 = struct.Struct('<B')
+_u16 = struct.Struct('<H')
+_u32 = struct.Struct('<I')
+_musician_def = struct.Struct('<BBBB')          # kind, is_band_member, vocals code, instrument code
+_band = struct.Struct('<iiI')                   # start ordinal, end ordinal, number of members
+
+_KIND_CODES = {kind: code for kinds in (MUSICIAN_KINDS, FROZEN_KINDS) for code, kind in enumerate(kinds)}
+
+
+#%%
+class CodecError(Exception):
+    """Exception raised when a binary stream is not in the expected format (or version).
+    """
+
+    pass
+
+
+#%%
+class BinaryWriter:
+    """Writes Musician and Band objects to a binary file object (opened with 'wb'), one object at a time.
+    The header is written when the writer is created.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.__index = {}                           # musician_key(m) -> index of m's definition record
+        file.write(MAGIC + _u8.pack(VERSION))
+        for enum in (Vocals, Instrument):
+            file.write(_u8.pack(len(enum)))
+            for member in enum:
+                file.write(_u16.pack(member.value))
+                _write_str(file, member.name)
+
+    def write(self, obj):
+        """Writes a Musician (or FrozenMusician; it is read back as a Musician) or a Band object.
+        """
+
+        if isinstance(obj, Band):
+            members = [self.__define(m) for m in obj.members]
+            name = obj.name.encode('utf-8')
+            self.file.write(b''.join((_u8.pack(BAND), _u16.pack(len(name)), name,
+                                      _band.pack(_ordinal(obj.start), _ordinal(obj.end), len(members)),
+                                      struct.pack(f'<{len(members)}I', *members))))
+        elif isinstance(obj, (Musician, FrozenMusician)):
+            index = self.__define(obj)
+            self.file.write(_u8.pack(MUSICIAN) + _u32.pack(index))
+        else:
+            raise TypeError(f'Cannot encode objects of type {type(obj).__name__}')
+
+    def write_all(self, objects):
+        for obj in objects:
+            self.write(obj)
+
+    def __define(self, musician):
+        key = musician_key(musician)
+        index = self.__index.get(key)
+        if index is None:
+            index = self.__index[key] = len(self.__index)
+            vocals = getattr(musician, 'vocals', None)
+            instrument = getattr(musician, 'instrument', None)
+            name = musician.name.encode('utf-8')
+            self.file.write(b''.join((_u8.pack(MUSICIAN_DEF),
+                                      _musician_def.pack(_KIND_CODES[musician.__class__], musician.is_band_member,
+                                                         vocals.value if vocals else 0,
+                                                         instrument.value if instrument else 0),
+                                      _u16.pack(len(name)), name)))
+        return index
+
+
+#%%
+class BinaryReader:
+    """Iterates over the Musician and Band objects in a binary file object (opened with 'rb'),
+    decoding them lazily, one at a time.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        if _read(file, len(MAGIC)) != MAGIC:
+            raise CodecError('Not a music binary stream (wrong magic bytes)')
+        version = _u8.unpack(_read(file, 1))[0]
+        if version > VERSION:
+            raise CodecError(f'Unsupported format version {version} (max {VERSION})')
+        self.version = version
+        self.vocals = self.__read_code_table(Vocals)
+        self.instruments = self.__read_code_table(Instrument)
+        self.__musicians = []
+
+    def __read_code_table(self, enum):
+        """Maps the codes stored in the file to the current enum members, by name."""
+
+        table = {0: None}
+        for _ in range(_u8.unpack(_read(self.file, 1))[0]):
+            code = _u16.unpack(_read(self.file, 2))[0]
+            name = _read_str(self.file)
+            if name not in enum.__members__:
+                raise CodecError(f'Unknown {enum.__name__} member {name}')
+            table[code] = enum[name]
+        return table
+
+    @staticmethod
+    def __decode_flag(table, code):
+        """Returns the member for a code from the code table, or the combination of members for a bit mask of codes.
+        """
+
+        flag = table.get(code)
+        if flag is None:
+            bits = [1 << i for i in range(code.bit_length()) if code & (1 << i)]
+            if not all(bit in table for bit in bits):
+                raise CodecError(f'Unknown code {code}')
+            flag = table[code] = reduce(or_, (table[bit] for bit in bits))
+        return flag
+
+    def __iter__(self):
+        file = self.file
+        while True:
+            tag = file.read(1)
+            if not tag:
+                return
+            tag = tag[0]
+            if tag == MUSICIAN_DEF:
+                kind, is_band_member, vocals, instrument = _musician_def.unpack(_read(file, _musician_def.size))
+                kwargs = {'name': _read_str(file), 'is_band_member': bool(is_band_member)}
+                if vocals:
+                    kwargs['vocals'] = self.__decode_flag(self.vocals, vocals)
+                if instrument:
+                    kwargs['instrument'] = self.__decode_flag(self.instruments, instrument)
+                self.__musicians.append(MUSICIAN_KINDS[kind](**kwargs))
+            elif tag == MUSICIAN:
+                yield self.__musicians[_u32.unpack(_read(file, 4))[0]]
+            elif tag == BAND:
+                name = _read_str(file)
+                start, end, n = _band.unpack(_read(file, _band.size))
+                members = [self.__musicians[i] for i in struct.unpack(f'<{n}I', _read(file, 4 * n))]
+                yield Band(name, *members, start=_date(start), end=_date(end))
+            else:
+                raise CodecError(f'Unknown record tag {tag}')
+
+
+#%%
+def dump(objects, path, compression=None, level=None):
+    """Writes an iterable of Musician and Band objects to the binary file at path
+    (compressed if compression is given or implied by the suffix of path; see util.utility.open_compressed()).
+    """
+
+    with open_compressed(path, 'wb', compression, level) as f:
+        BinaryWriter(f).write_all(objects)
+
+
+def load(path, compression=None):
+    """Generator of the Musician and Band objects from the (possibly compressed) binary file at path.
+    """
+
+    with open_compressed(path, 'rb', compression) as f:
+        yield from BinaryReader(f)
+
+
+#%%
+# Helpers
+
+def _write_str(file, s):
+    b = s.encode('utf-8')
+    file.write(_u16.pack(len(b)) + b)
+
+
+def _read(file, n):
+    b = file.read(n)
+    if len(b) != n:
+        raise CodecError('Unexpected end of binary stream')
+    return b
+
+
+def _read_str(file):
+    return _read(file, _u16.unpack(_read(file, 2))[0]).decode('utf-8')
+
+
+def _ordinal(d):
+    return d.toordinal() if isinstance(d, date) else 0
+
+
+def _date(ordinal):
+    return date.fromordinal(ordinal) if ordinal else None
+
+
+#%%
+# Demonstrate binary encoding/decoding of Musician and Band objects
+if __name__ == '__main__':
+    import io
+
+    from testdata.musicians import *
+
+    bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                           instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    buffer = io.BytesIO()
+    BinaryWriter(buffer).write_all([bob, buffalo_springfield, FrozenMusician('Neil Young')])
+    print(len(buffer.getvalue()), 'bytes')
+    buffer.seek(0)
+    for obj in BinaryReader(buffer):
+        print(obj)
@@ -2,23 +2,84 @@
 """
 
 
-from enum import Enum
+import io
+import pickle
+from enum import Flag
+from functools import reduce
+from operator import or_
 
 
-class Vocals(Enum):
+class Vocals(Flag):
     """Types of vocals in rock 'n' roll.
+    A Flag, so that the types can be combined, e.g. Vocals.LEAD_VOCALS | Vocals.BACKGROUND_VOCALS.
     """
 
     LEAD_VOCALS = 1
     BACKGROUND_VOCALS = 2
 
+    def __reduce_ex__(self, protocol):
+        return _unpickle_flag, ('Vocals', self.name)
 
-class Instrument(Enum):
+
+class Instrument(Flag):
     """Typical instruments in rock 'n' roll.
+    A Flag, so that multi-instrumentalists play a combination of instruments, e.g. Instrument.BASS | Instrument.PIANO;
+    <instrument>.value is then a small integer (bit mask), with one bit per instrument.
+    The values were 1..5 (BASS = 3, DRUMS = 4, PIANO = 5) before Instrument became a Flag, so Vocals and Instrument
+    are pickled by name, and pickles written before that are read with load()/loads() (see Unpickler).
     """
 
     LEAD_GUITAR = 1
     RHYTHM_GUITAR = 2
-    BASS = 3
-    DRUMS = 4
-    PIANO = 5
+    BASS = 4
+    DRUMS = 8
+    PIANO = 16
+
+    def __reduce_ex__(self, protocol):
+        return _unpickle_flag, ('Instrument', self.name)
+
+
+# The names of the Instrument values before Instrument became a Flag
+LEGACY_INSTRUMENTS = {1: 'LEAD_GUITAR', 2: 'RHYTHM_GUITAR', 3: 'BASS', 4: 'DRUMS', 5: 'PIANO'}
+
+
+def flag_from_name(enum, name):
+    """Inverse of <flag>.name (case-insensitive): returns the member of enum (Vocals or Instrument)
+    corresponding to a name such as 'BASS' or a combined name such as 'bass|piano'.
+    """
+
+    return reduce(or_, (enum[n.upper()] for n in name.split('|')))
+
+
+class Unpickler(pickle.Unpickler):
+    """A pickle.Unpickler that reads both current pickles and pickles written before Vocals and Instrument became
+    flags, which store Instrument(<value>) with the old values (see LEGACY_INSTRUMENTS):
+    pickle.load() would silently read the old BASS (3) as LEAD_GUITAR|RHYTHM_GUITAR, and the old DRUMS (4) as BASS.
+    Current pickles never call Instrument(<value>) (the flags are pickled by name), so every such call is an old one.
+    """
+
+    def find_class(self, module, name):
+        if module == __name__ and name == 'Instrument':
+            return _legacy_instrument
+        return super().find_class(module, name)
+
+
+def load(file):
+    """pickle.load() with Unpickler (for files that may have been written before Instrument became a Flag)."""
+
+    return Unpickler(file).load()
+
+
+def loads(data):
+    """pickle.loads() with Unpickler."""
+
+    return Unpickler(io.BytesIO(data)).load()
+
+
+def _unpickle_flag(enum_name, name):
+    enum = Vocals if enum_name == 'Vocals' else Instrument
+    return enum(0) if name is None else flag_from_name(enum, name)
+
+
+def _legacy_instrument(value):
+    return Instrument[LEGACY_INSTRUMENTS[value]]
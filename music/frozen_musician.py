@@ -0,0 +1,245 @@
+"""Compact, immutable and hashable counterparts of the classes from music.musician
+(value-object mode for large in-memory catalogs).
+
+The classes from music.musician keep their fields in a per-instance __dict__ and compare whole __dict__s in __eq__(),
+so they are relatively big and cannot be used as set members or dict keys.
+The classes here use __slots__ instead of __dict__ and cache their structural hash.
+Since they are immutable, they are also interned (music.interning): creating a musician equal to a live one
+returns the existing object, so the same person appearing in many bands is kept in memory once.
+"""
+
+
+#%%
+# Setup / Data
+
+from music.enums import Vocals, Instrument, flag_from_name
+from music.interning import Interned, musician_registry
+from music.musician import Musician, Singer, Songwriter, SingerSongwriter, ROLES_BY_NAME
+
+
+#%%
+class FrozenMusician(metaclass=Interned):
+    """The value-object version of music.musician.Musician.
+    Same fields, same __str__() format and the same cooperative __init__(**kwargs) chain as Musician,
+    but no __dict__: the fields are stored in __slots__ and cannot be changed once the object is created.
+
+    Notes:
+    - all role fields (vocals, instrument) are declared here, in the base class, because two base classes with
+      non-empty __slots__ cannot be combined in multiple inheritance (FrozenSingerSongwriter);
+      the fields not used by a class are simply None
+    - equality and hashing are structural (class + fields); the hash is computed once and cached in _hash
+    - objects are interned (see music.interning), which needs the __weakref__ slot
+    """
+
+    __slots__ = ('name', 'is_band_member', 'vocals', 'instrument', '_hash', '__weakref__')
+
+    def __init__(self, name, is_band_member=True, **kwargs):
+        super().__init__(**kwargs)
+        _set(self, 'name', name if isinstance(name, str) else 'unknown')
+        _set(self, 'is_band_member', bool(is_band_member))
+        _set(self, 'vocals', None)
+        _set(self, 'instrument', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} objects are immutable (cannot set \'{name}\')')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} objects are immutable (cannot delete \'{name}\')')
+
+    def __str__(self):
+        return f'{self.name}, band member' if self.is_band_member else f'{self.name}, solo artist'
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.__str__()!r})'
+
+    def _key(self):
+        return self.name, self.is_band_member, self.vocals, self.instrument
+
+    def __eq__(self, other):
+        # Fast path first: identical objects (e.g., interned ones) are equal without comparing any fields;
+        # the fields are then compared in one short-circuit expression (enum members and bools by identity),
+        # which is cheaper than building and comparing two key tuples in Python code
+        return self is other or (other.__class__ is self.__class__ and self.name == other.name
+                                 and self.is_band_member is other.is_band_member
+                                 and self.vocals is other.vocals and self.instrument is other.instrument)
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            h = hash((self.__class__, *self._key()))
+            _set(self, '_hash', h)
+            return h
+
+    def __reduce__(self):
+        # No __dict__ and no setattr, so pickle/copy must go through __init__()
+        return _rebuild, (self.__class__, self._kwargs())
+
+    def _kwargs(self):
+        kwargs = {'name': self.name, 'is_band_member': self.is_band_member}
+        if self.vocals is not None:
+            kwargs['vocals'] = self.vocals
+        if self.instrument is not None:
+            kwargs['instrument'] = self.instrument
+        return kwargs
+
+    @classmethod
+    def from_musician(cls, musician):
+        """Alternative constructor: converts a Musician (Singer, Songwriter, SingerSongwriter) object
+        into the corresponding frozen object.
+        """
+
+        frozen_cls = _FROZEN[type(musician)]
+        return frozen_cls(**_fields(musician))
+
+    @classmethod
+    def from_str(cls, musician_string):
+        """Inverted __str__() method, which goes through interning like the other constructors
+        (parsing the same musician over and over again returns one object).
+        The class is determined from the vocals/instrument suffixes of the string, as in Musician.from_lines(), e.g.
+        'Bob Dylan, solo artist, rhythm_guitar, lead_vocals' gives a FrozenSingerSongwriter.
+        """
+
+        parts = musician_string.rstrip('\n').split(', ')
+        if len(parts) < 2:
+            raise ValueError(f'Not a musician string: {musician_string!r}')
+        kwargs = {}
+        while len(parts) > 2:
+            role = _role(parts[-1])
+            if role is None:
+                break
+            parts.pop()
+            kwargs['vocals' if isinstance(role, Vocals) else 'instrument'] = role
+        kind = FROZEN_KINDS[('vocals' in kwargs) + 2 * ('instrument' in kwargs)]
+        is_band_member = parts.pop().startswith('b')
+        return kind(name=', '.join(parts), is_band_member=is_band_member, **kwargs)
+
+    def to_musician(self):
+        """Inverse of from_musician(): returns a regular (mutable) Musician object of the corresponding class.
+        """
+
+        return _REGULAR[type(self)](**self._kwargs())
+
+
+#%%
+class FrozenSinger(FrozenMusician):
+    """The value-object version of music.musician.Singer.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, vocals=Vocals.LEAD_VOCALS, **kwargs):
+        super().__init__(**kwargs)
+        _set(self, 'vocals', vocals)
+
+    def __str__(self):
+        return super().__str__() + f', {self.vocals.name.lower()}'
+
+
+#%%
+class FrozenSongwriter(FrozenMusician):
+    """The value-object version of music.musician.Songwriter.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, instrument: Instrument = Instrument.RHYTHM_GUITAR, **kwargs):
+        super().__init__(**kwargs)
+        _set(self, 'instrument', instrument)
+
+    def __str__(self):
+        return super().__str__() + f', {self.instrument.name.lower()}'
+
+
+#%%
+class FrozenSingerSongwriter(FrozenSinger, FrozenSongwriter):
+    """The value-object version of music.musician.SingerSongwriter.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+
+#%%
+# All frozen musician classes, in the order of music.musician.MUSICIAN_KINDS (so that a frozen musician
+# has the same compact class code as its mutable counterpart in tables, files, etc.)
+FROZEN_KINDS = (FrozenMusician, FrozenSinger, FrozenSongwriter, FrozenSingerSongwriter)
+
+
+#%%
+# Helpers
+
+_set = object.__setattr__              # the only way to initialize the fields, since __setattr__() always raises
+
+_FROZEN = {
+    Musician: FrozenMusician,
+    Singer: FrozenSinger,
+    Songwriter: FrozenSongwriter,
+    SingerSongwriter: FrozenSingerSongwriter,
+}
+_REGULAR = {v: k for k, v in _FROZEN.items()}
+
+
+def _role(token):
+    """Returns the Vocals/Instrument flag for a token such as 'bass' or 'bass|piano' (None if it is not one)."""
+
+    role = ROLES_BY_NAME.get(token)
+    if role is not None or '|' not in token:
+        return role
+    first = ROLES_BY_NAME.get(token.partition('|')[0])
+    try:
+        return None if first is None else flag_from_name(first.__class__, token)
+    except KeyError:
+        return None
+
+
+def _fields(musician):
+    """Returns the constructor kwargs of a Musician object (name, is_band_member and the role fields it has)."""
+
+    fields = {'name': musician.name, 'is_band_member': musician.is_band_member}
+    if hasattr(musician, 'vocals'):
+        fields['vocals'] = musician.vocals
+    if hasattr(musician, 'instrument'):
+        fields['instrument'] = musician.instrument
+    return fields
+
+
+def _rebuild(cls, kwargs):
+    return cls(**kwargs)
+
+
+#%%
+# Demonstrate value-object behavior
+if __name__ == '__main__':
+    neil = FrozenMusician('Neil Young')
+    print(neil)
+    print(neil == FrozenMusician('Neil Young'), hash(neil) == hash(FrozenMusician('Neil Young')))
+    print({neil, FrozenMusician('Neil Young'), FrozenMusician('Stephen Stills')})
+    try:
+        neil.name = 'Neil'
+    except AttributeError as e:
+        print(f'{type(e).__name__}: {e.args[0]}')
+
+#%%
+# Demonstrate the cooperative __init__(**kwargs) chain and conversions
+if __name__ == '__main__':
+    bob = FrozenSingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                                 instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
+    print(bob)
+    print(FrozenSingerSongwriter.__mro__)
+    print(bob.to_musician() == SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                                                instrument=Instrument.RHYTHM_GUITAR, is_band_member=False))
+    print(FrozenMusician.from_musician(bob.to_musician()) is bob)                  # interned (see below)
+
+
+#%%
+# Demonstrate interning (music.interning) - equal frozen musicians are the same object
+if __name__ == '__main__':
+    print(FrozenMusician('Neil Young') is FrozenMusician.from_musician(Musician('Neil Young')))
+    print(FrozenMusician('Neil Young') is FrozenMusician('Neil Young', is_band_member=False))
+    print(FrozenMusician.from_str('Neil Young, band member') is FrozenMusician('Neil Young'))
+    print(FrozenMusician.from_str(str(bob)) is bob)
+    print(Musician('Neil Young') is Musician('Neil Young'))            # mutable objects are never shared
+    print(musician_registry.stats())
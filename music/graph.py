@@ -0,0 +1,341 @@
+"""The collaboration graph of musicians and bands, for queries such as
+'how is Taylor Swift connected to Neil Young' (the shortest chain of bands and shared members between two musicians)
+and for collaboration centrality.
+
+The graph is bipartite (musicians are connected to the bands they play in, and vice versa) and is stored
+in CSR (compressed sparse row) form, as NumPy arrays: node i's neighbors are targets[offsets[i]:offsets[i + 1]].
+Musicians and bands share one space of node numbers, assigned in the order of their first appearance.
+Searches are level-synchronous: a whole BFS frontier is expanded at once with array gathers,
+so that no Python code runs per node or per edge.
+Bands can be added one at a time (e.g., by following a BandRegistry, see BandRegistry.listen()). As in
+music.interval_index, the edges of newly added bands are kept in a buffer (scanned with vectorized comparisons)
+and merged into the CSR arrays when the buffer grows too big, which makes adding a band amortized O(members).
+Removing a band triggers a full rebuild (in O(edges) NumPy time) before the next query, which also drops
+the band's edges from the recorded ones.
+"""
+
+
+#%%
+# Setup / Data
+
+from array import array
+
+import numpy as np
+
+from music.interning import musician_key
+from music.band import Band
+
+
+#%%
+class CollaborationGraph:
+    """The bipartite musician/band graph (see the module docstring).
+    Musicians are identified by music.interning.musician_key() (equal musicians are the same node),
+    and bands by object identity (like in BandRegistry).
+    Arrays returned by degrees(), components() and betweenness() are aligned with self.musicians.
+    """
+
+    def __init__(self, bands=()):
+        self.musicians = []                         # Musician objects, in the order of their first appearance
+        self.__objects = []                         # Musician and Band objects (None for removed bands), by node
+        self.__musician_nodes = array('q')          # the node of each musician from self.musicians
+        self.__nodes = {}                           # musician key or id(band) -> node
+        self.__edge_musicians = array('q')          # one entry per membership: musician node...
+        self.__edge_bands = array('q')              # ...and band node
+        self.__removed = False                      # a band was removed since the CSR arrays were built
+        self.__csr = None                           # (offsets, targets, the number of edges included)
+        for band in bands:
+            self.add(band)
+
+    # Updates
+
+    def add(self, band):
+        """Adds a band and its memberships (a band added before is ignored).
+        """
+
+        if not isinstance(band, Band):
+            raise TypeError(f'Only Band objects can be added, not {type(band).__name__}')
+        if id(band) in self.__nodes:
+            return
+        b = self.__nodes[id(band)] = len(self.__objects)
+        self.__objects.append(band)
+        for m in band.members:
+            key = musician_key(m)
+            node = self.__nodes.get(key)
+            if node is None:
+                node = self.__nodes[key] = len(self.__objects)
+                self.__objects.append(m)
+                self.musicians.append(m)
+                self.__musician_nodes.append(node)
+            self.__edge_musicians.append(node)
+            self.__edge_bands.append(b)
+
+    def remove(self, band):
+        """Removes a band and its memberships (KeyError if the band is not in the graph).
+        Its members stay in the graph (possibly with no bands).
+        """
+
+        self.__objects[self.__nodes.pop(id(band))] = None
+        self.__removed = True
+
+    # CSR arrays
+
+    def __csr_arrays(self, merge=False):
+        """Returns (offsets, targets, n_edges): the CSR arrays built from the first n_edges recorded edges.
+        They are rebuilt from all edges if merge is True, if a band was removed, or if too many edges are pending.
+        Rebuilding after a removal compacts the recorded edges (the edges of removed bands are dropped for good).
+        """
+
+        n_edges = len(self.__edge_musicians)
+        if (self.__csr is None or self.__removed or
+                n_edges - self.__csr[2] > (0 if merge else max(4096, self.__csr[2] // 8))):
+            musicians, bands = self.__edges()
+            if self.__removed:
+                alive = np.fromiter((obj is not None for obj in self.__objects), dtype=np.bool_,
+                                    count=len(self.__objects))
+                keep = alive[bands]
+                musicians, bands = musicians[keep], bands[keep]
+                self.__edge_musicians = array('q', musicians.tobytes())
+                self.__edge_bands = array('q', bands.tobytes())
+                n_edges = len(musicians)
+            sources = np.concatenate((musicians, bands))
+            order = np.argsort(sources, kind='stable')
+            offsets = np.zeros(len(self.__objects) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=len(self.__objects)), out=offsets[1:])
+            self.__csr = offsets, np.concatenate((bands, musicians))[order], n_edges
+            self.__removed = False
+        return self.__csr
+
+    def __edges(self, first=0):
+        """The recorded edges from the given one on, as (musician nodes, band nodes)."""
+
+        return (np.frombuffer(self.__edge_musicians, dtype=np.int64)[first:],
+                np.frombuffer(self.__edge_bands, dtype=np.int64)[first:])
+
+    def __neighbors(self, nodes):
+        """Returns the neighbors of nodes (concatenated), and the node each neighbor comes from:
+        those from the CSR arrays, followed by those from the pending edges.
+        """
+
+        offsets, targets, n_edges = self.__csr_arrays()
+        built = nodes[nodes < len(offsets) - 1]             # nodes added after the build have no CSR entries
+        neighbors, sources = _gather(offsets, targets, built)
+        if n_edges < len(self.__edge_musicians):
+            musicians, bands = self.__edges(n_edges)
+            pending_sources = np.concatenate((musicians, bands))
+            pending_targets = np.concatenate((bands, musicians))
+            found = np.isin(pending_sources, nodes)
+            neighbors = np.concatenate((neighbors, pending_targets[found]))
+            sources = np.concatenate((sources, pending_sources[found]))
+        return neighbors, sources
+
+    # Queries
+
+    def __len__(self):
+        return len(self.musicians)
+
+    def __node(self, musician):
+        """The node of a musician (KeyError if the musician is not in the graph)."""
+
+        return self.__nodes[musician_key(musician)]
+
+    def degrees(self):
+        """Returns an array with the number of bands of each musician."""
+
+        offsets, _, _ = self.__csr_arrays(merge=True)
+        nodes = np.frombuffer(self.__musician_nodes, dtype=np.int64)
+        return offsets[nodes + 1] - offsets[nodes]
+
+    def degree(self, musician):
+        """The number of bands the musician plays in."""
+
+        return len(self.__neighbors(np.array([self.__node(musician)]))[0])
+
+    def collaborators(self, musician):
+        """Returns the list of musicians who play in at least one band with the musician.
+        """
+
+        node = self.__node(musician)
+        members, _ = self.__neighbors(self.__neighbors(np.array([node]))[0])
+        return [self.__objects[i] for i in np.unique(members) if i != node]
+
+    def shortest_path(self, musician_a, musician_b):
+        """Returns the shortest chain connecting two musicians, as a list [musician_a, band, musician, band, ...,
+        musician_b] (each band has the musicians before and after it as members), or None if they are not connected.
+        Bidirectional BFS: the two searches (from a and from b) take turns, always expanding the smaller frontier.
+        """
+
+        a, b = self.__node(musician_a), self.__node(musician_b)
+        if a == b:
+            return [self.__objects[a]]
+        n = len(self.__objects)
+        dist = [np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)]     # from a, from b
+        parent = [np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)]
+        scratch = np.empty(n, dtype=np.int64)
+        frontier = [np.array([a]), np.array([b])]
+        dist[0][a] = dist[1][b] = 0
+        while len(frontier[0]) and len(frontier[1]):
+            side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+            neighbors, sources = self.__neighbors(frontier[side])
+            new = dist[side][neighbors] == -1
+            first = _first(neighbors[new], scratch)
+            neighbors = neighbors[new][first]
+            dist[side][neighbors] = dist[side][frontier[side][0]] + 1
+            parent[side][neighbors] = sources[new][first]
+            frontier[side] = neighbors
+            met = neighbors[dist[1 - side][neighbors] != -1]
+            if len(met):
+                meeting = met[np.argmin(dist[0][met] + dist[1][met])]
+                path = _trace(parent[0], meeting) + _trace(parent[1], meeting)[::-1][1:]
+                return [self.__objects[node] for node in path]
+        return None
+
+    def degrees_of_separation(self, musician_a, musician_b):
+        """The number of bands on the shortest chain connecting two musicians (None if they are not connected)."""
+
+        path = self.shortest_path(musician_a, musician_b)
+        return None if path is None else len(path) // 2
+
+    def components(self):
+        """Returns an array with the connected component number (0, 1, ...) of each musician;
+        musicians in the same component are connected by a chain of bands.
+        Computed by min-label propagation over the CSR arrays, with pointer jumping.
+        """
+
+        offsets, targets, _ = self.__csr_arrays(merge=True)
+        labels = np.arange(len(offsets) - 1)
+        connected = np.diff(offsets) > 0
+        starts = offsets[:-1][connected]
+        while True:
+            new_labels = labels.copy()
+            new_labels[connected] = np.minimum(labels[connected], np.minimum.reduceat(labels[targets], starts))
+            while True:                                                     # pointer jumping
+                jumped = new_labels[new_labels]
+                if np.array_equal(jumped, new_labels):
+                    break
+                new_labels = jumped
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+        return np.unique(labels[np.frombuffer(self.__musician_nodes, dtype=np.int64)], return_inverse=True)[1]
+
+    def betweenness(self, samples=16, seed=0):
+        """Estimates the betweenness centrality of each musician: the number of shortest paths between pairs
+        of musicians that go through the musician. Brandes' algorithm is run from `samples` randomly chosen
+        source musicians (all of them if there are not more), and the result is scaled up to all sources
+        (so the estimate is exact when all musicians are sources).
+        """
+
+        offsets, targets, _ = self.__csr_arrays(merge=True)
+        musician_nodes = np.frombuffer(self.__musician_nodes, dtype=np.int64)
+        n = len(offsets) - 1
+        if len(musician_nodes) == 0:
+            return np.zeros(0)
+        is_musician = np.zeros(n)
+        is_musician[musician_nodes] = 1
+        sources = np.random.default_rng(seed).permutation(musician_nodes)[:samples]
+        centrality = np.zeros(n)
+        scratch = np.empty(n, dtype=np.int64)
+        for s in sources:
+            dist = np.full(n, -1, dtype=np.int64)
+            sigma = np.zeros(n)                         # the number of shortest paths from s
+            dist[s], sigma[s] = 0, 1
+            frontier, levels = np.array([s]), []
+            while len(frontier):
+                neighbors, parents = _gather(offsets, targets, frontier)
+                d = dist[frontier[0]] + 1
+                candidates = neighbors[dist[neighbors] == -1]
+                new = candidates[_first(candidates, scratch)]
+                dist[new] = d
+                on_path = dist[neighbors] == d          # edges on shortest paths (parent -> neighbor)
+                neighbors, parents = neighbors[on_path], parents[on_path]
+                _add_at(sigma, new, neighbors, sigma[parents], scratch)
+                levels.append((frontier, parents, neighbors))
+                frontier = new
+            delta = np.zeros(n)                         # the dependency of s on each node (only musicians count)
+            for frontier, parents, neighbors in reversed(levels):
+                _add_at(delta, frontier, parents,
+                        sigma[parents] / sigma[neighbors] * (is_musician[neighbors] + delta[neighbors]), scratch)
+            delta[s] = 0
+            centrality += delta
+        return centrality[musician_nodes] * (len(musician_nodes) / len(sources)) / 2
+
+
+#%%
+# Helpers
+
+def _gather(offsets, targets, nodes):
+    """Returns the neighbors of all nodes (concatenated), and the node each neighbor comes from."""
+
+    starts, ends = offsets[nodes], offsets[nodes + 1]
+    counts = ends - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    # Position of each neighbor in targets: starts[k] + (0, 1, ..., counts[k] - 1) for each node k
+    run_starts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return targets[np.arange(total) + run_starts], np.repeat(nodes, counts)
+
+
+def _first(values, scratch):
+    """Returns the positions of one occurrence of each distinct value (node) in values, in O(len(values)) time
+    (without sorting, unlike np.unique()). scratch is an array with room for all node numbers.
+    """
+
+    positions = np.arange(len(values))
+    scratch[values] = positions                 # with repeated values, only one of the positions is kept
+    return positions[scratch[values] == positions]
+
+
+def _add_at(a, unique, indices, values, scratch):
+    """Unbuffered a[indices] += values (like np.add.at(), which is much slower for large arrays),
+    where unique are the distinct values of indices. scratch is as in _first().
+    """
+
+    scratch[unique] = np.arange(len(unique))
+    a[unique] += np.bincount(scratch[indices], weights=values, minlength=len(unique))
+
+
+def _trace(parent, node):
+    """The path from the search's start to node, following parent links (start first)."""
+
+    path = [int(node)]
+    while parent[path[-1]] != -1:
+        path.append(int(parent[path[-1]]))
+    return path[::-1]
+
+
+#%%
+# Demonstrate CollaborationGraph
+if __name__ == '__main__':
+    from datetime import date
+
+    from music.band_registry import BandRegistry
+    from testdata.musicians import *
+
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    csny = Band('Crosby, Stills, Nash & Young', *[Musician('David Crosby'), stephenStills, Musician('Graham Nash'), neilYoung],
+                start=date(1968, 3, 1), end=date(1970, 7, 9))
+    the_hollies = Band('The Hollies', *[Musician('Graham Nash'), Musician('Allan Clarke'), Musician('Tony Hicks')],
+                       start=date(1962, 12, 1))
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+
+    registry = BandRegistry([buffalo_springfield, csny])
+    graph = CollaborationGraph()
+    registry.listen(graph)                                  # follows the registry from now on
+    registry.add(the_hollies)
+    registry.add(the_beatles)
+    print([getattr(x, 'name', x) for x in graph.shortest_path(deweyMartin, Musician('Tony Hicks'))])
+    print(graph.degrees_of_separation(neilYoung, johnLennon), graph.degree(stephenStills))
+    print(graph.components())
+    print([(m.name, round(float(c), 1)) for m, c in zip(graph.musicians, graph.betweenness()) if c > 0])
+
+    # Removing a band drops its memberships, also after more bands are added
+    graph.remove(the_hollies)
+    print(graph.degree(Musician('Tony Hicks')))
+    graph.add(Band('Blind Faith', *[Musician('Eric Clapton'), Musician('Steve Winwood')], start=date(1968, 1, 1)))
+    degrees = dict(zip([m.name for m in graph.musicians], graph.degrees()))
+    assert degrees['Tony Hicks'] == 0 and degrees['Graham Nash'] == 1 and degrees['Eric Clapton'] == 1
+    assert graph.degrees_of_separation(deweyMartin, Musician('Tony Hicks')) is None
+    print(graph.components())
@@ -0,0 +1,101 @@
+"""Process-wide interning (flyweight) registry for immutable musician objects (music.frozen_musician).
+
+The same person appears in many bands of a large catalog, and every appearance used to create a new object.
+With interning, creating a FrozenMusician whose identity fields (class, name, band-member flag, vocals, instrument)
+match an already existing (live) one returns that existing, canonical object instead.
+Only immutable objects are interned: a shared mutable Musician would make a change to one appearance
+(e.g., renaming a musician) a change to all of them.
+The registry holds weak references only, so musicians that are no longer used anywhere are evicted automatically.
+"""
+
+
+#%%
+# Setup / Data
+
+import threading
+from weakref import WeakValueDictionary
+
+
+#%%
+def musician_key(musician):
+    """Returns the tuple of identity fields of a musician: (class, name, is_band_member, vocals, instrument).
+    The fields that a musician does not have (e.g., instrument of a Singer) are None.
+    Two musicians with the same key are equal (__eq__()), so the key can be used wherever a hashable stand-in
+    for a (possibly unhashable) Musician object is needed.
+    """
+
+    return (musician.__class__, musician.name, musician.is_band_member,
+            getattr(musician, 'vocals', None), getattr(musician, 'instrument', None))
+
+
+#%%
+class MusicianRegistry:
+    """Maps musician keys (see musician_key()) to canonical immutable musician objects, using weak references.
+    Counts hits (a canonical object was returned instead of a new one) and misses (a new canonical object was stored);
+    hits is also the number of duplicate objects that were not kept in memory.
+    Thread-safe: the lookup and the insertion of a new canonical object are done under a lock,
+    so threads creating equal musicians at the same time get the same object.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.__canonical = WeakValueDictionary()
+        self.__lock = threading.Lock()
+
+    def intern(self, musician):
+        """Returns the canonical object for musician (musician itself, if there is no canonical object yet).
+        musician must be immutable and weak-referenceable (e.g., a FrozenMusician).
+        """
+
+        if not self.enabled:
+            return musician
+        key = musician_key(musician)
+        with self.__lock:
+            canonical = self.__canonical.get(key)
+            if canonical is not None:
+                self.hits += 1
+                return canonical
+            self.misses += 1
+            self.__canonical[key] = musician
+        return musician
+
+    def __len__(self):
+        return len(self.__canonical)
+
+    def __contains__(self, musician):
+        return self.__canonical.get(musician_key(musician)) is musician
+
+    def clear(self):
+        """Forgets all canonical objects and resets the counters.
+        """
+
+        with self.__lock:
+            self.__canonical.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns the counters and the number of live canonical objects as a dictionary.
+        """
+
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'live': len(self),
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+#%%
+musician_registry = MusicianRegistry()
+
+
+#%%
+class Interned(type):
+    """Metaclass of immutable musician classes (music.frozen_musician) that routes object creation
+    (<class>(...), including alternative constructors such as FrozenMusician.from_musician()) through musician_registry.
+    The object is created and initialized as usual, and then replaced by its canonical counterpart, if there is one.
+    Mutable classes (music.musician) must not use it, since their objects would be shared.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        return musician_registry.intern(super().__call__(*args, **kwargs))
@@ -0,0 +1,185 @@
+"""An interval index over the start/end dates of bands, for queries such as
+'which bands were active on Aug 16, 1969' or 'which bands were active between 1966 and 1970'.
+
+The index is a centered interval tree (https://en.wikipedia.org/wiki/Interval_tree#Centered_interval_tree)
+built with NumPy over date ordinals (date.toordinal()):
+each node keeps the intervals containing its center point sorted by start and by end,
+so a node contributes its results with a binary search (np.searchsorted) and a slice.
+Stabbing queries take O(log n + k) time (k = the number of results).
+Inserted intervals are added with the logarithmic method (Bentley-Saxe): the last (at most PENDING_SIZE) of them
+are kept unindexed at the end of the (preallocated, growing) arrays of starts and ends, and scanned with vectorized
+comparisons; when they fill up, they are merged with the most recent trees of at most their size into a new tree.
+The sizes of the trees at least double from the newest one to the oldest one, so there are O(log n) trees:
+queries take O(log^2 n + k) time with inserts, and every interval is rebuilt into a new tree O(log n) times
+(amortized O(log^2 n) time per insert).
+"""
+
+
+#%%
+# Setup / Data
+
+from datetime import date
+
+import numpy as np
+
+from music.band import Band
+
+MIN_ORDINAL = date.min.toordinal()          # a band with unknown start date is treated as active since ever
+MAX_ORDINAL = date.max.toordinal()          # a band with no end date is treated as still active
+PENDING_SIZE = 64                           # the max number of inserted intervals not in a tree yet
+
+
+#%%
+class IntervalIndex:
+    """Interval index (see the module docstring) over bands, or over plain intervals of date ordinals.
+    Queries return the matching bands (as a list), or the matching interval indices (as a NumPy array)
+    if the index was built with from_ordinals() without bands.
+    """
+
+    def __init__(self, bands=()):
+        bands = list(bands)
+        starts = np.fromiter((_ordinal(b.start, MIN_ORDINAL) for b in bands), dtype=np.int64, count=len(bands))
+        ends = np.fromiter((_ordinal(b.end, MAX_ORDINAL) for b in bands), dtype=np.int64, count=len(bands))
+        self.__setup(starts, ends, bands)
+
+    @classmethod
+    def from_ordinals(cls, starts, ends, bands=None):
+        """Alternative constructor: vectorized bulk build from arrays of start and end date ordinals
+        (e.g., loaded from a catalog file), optionally with the corresponding list of bands.
+        """
+
+        index = cls.__new__(cls)
+        index.__setup(np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64),
+                      list(bands) if bands is not None else None)
+        return index
+
+    def __setup(self, starts, ends, bands):
+        if len(starts) != len(ends) or (bands is not None and len(bands) != len(starts)):
+            raise ValueError('starts, ends and bands must be of the same length')
+        if np.any(starts > ends):
+            raise ValueError('An interval cannot end before it starts')
+        self.__starts = starts                  # preallocated: only the first __n items are used
+        self.__ends = ends
+        self.__n = len(starts)
+        self.__bands = bands
+        self.__trees = []                       # (root, lo, hi) of the trees of intervals lo..hi-1, oldest first
+        if self.__n:
+            self.__trees.append((_build(starts, ends, np.arange(self.__n)), 0, self.__n))
+
+    def __len__(self):
+        return self.__n
+
+    def insert(self, band, start=None, end=None):
+        """Adds a band (if the index has bands) or an interval of ordinals start..end (if it does not).
+        """
+
+        if self.__bands is not None:
+            if not isinstance(band, Band):
+                raise TypeError(f'Only Band objects can be inserted, not {type(band).__name__}')
+            start, end = _ordinal(band.start, MIN_ORDINAL), _ordinal(band.end, MAX_ORDINAL)
+        if start > end:
+            raise ValueError('An interval cannot end before it starts')
+        if self.__bands is not None:
+            self.__bands.append(band)
+        if self.__n == len(self.__starts):
+            capacity = max(2 * self.__n, PENDING_SIZE)
+            self.__starts = np.resize(self.__starts, capacity)
+            self.__ends = np.resize(self.__ends, capacity)
+        self.__starts[self.__n] = start
+        self.__ends[self.__n] = end
+        self.__n += 1
+        if self.__n - self.__indexed() >= PENDING_SIZE:
+            self.__merge()
+
+    def __indexed(self):
+        """The number of intervals in the trees (the others are pending)."""
+
+        return self.__trees[-1][2] if self.__trees else 0
+
+    def __merge(self):
+        """Builds a tree of the pending intervals and of the most recent trees that are not bigger than them."""
+
+        lo = self.__indexed()
+        while self.__trees and self.__trees[-1][2] - self.__trees[-1][1] <= self.__n - lo:
+            lo = self.__trees.pop()[1]
+        self.__trees.append((_build(self.__starts, self.__ends, np.arange(lo, self.__n)), lo, self.__n))
+
+    def at(self, day):
+        """Returns the bands (or interval indices) active on day (a date or an ordinal).
+        """
+
+        return self.between(day, day)
+
+    def between(self, first_day, last_day):
+        """Returns the bands (or interval indices) active on at least one day between first_day and last_day
+        (dates or ordinals, both inclusive).
+        """
+
+        a, b = _ordinal(first_day), _ordinal(last_day)
+        found = []
+        stack = [root for root, _, _ in self.__trees]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_start, starts, by_end, ends, left, right = node
+            if b < center:                  # only the intervals here starting before b, and those to the left
+                found.append(by_start[:np.searchsorted(starts, b, side='right')])
+                stack.append(left)
+            elif a > center:                # only the intervals here ending after a, and those to the right
+                found.append(by_end[np.searchsorted(ends, a, side='left'):])
+                stack.append(right)
+            else:                           # all intervals here contain center, which is in a..b
+                found.append(by_start)
+                stack.append(left)
+                stack.append(right)
+        lo = self.__indexed()
+        if lo < self.__n:                   # at most PENDING_SIZE intervals
+            pending = (self.__starts[lo:self.__n] <= b) & (self.__ends[lo:self.__n] >= a)
+            found.append(np.flatnonzero(pending) + lo)
+        indices = np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+        return indices if self.__bands is None else [self.__bands[i] for i in indices]
+
+
+#%%
+# Helpers
+
+def _ordinal(d, default=None):
+    if d is None:
+        return default
+    return d.toordinal() if isinstance(d, date) else int(d)
+
+
+def _build(starts, ends, indices):
+    """Builds the (sub)tree for the intervals with the given indices; returns its root node, a tuple of:
+    (center, indices sorted by start, sorted starts, indices sorted by end, sorted ends, left child, right child).
+    """
+
+    if len(indices) == 0:
+        return None
+    s, e = starts[indices], ends[indices]
+    center = int(np.median(np.concatenate((s, e))))
+    here = (s <= center) & (e >= center)
+    h = indices[here]
+    by_start = h[np.argsort(starts[h], kind='stable')]
+    by_end = h[np.argsort(ends[h], kind='stable')]
+    return (center, by_start, starts[by_start], by_end, ends[by_end],
+            _build(starts, ends, indices[e < center]), _build(starts, ends, indices[s > center]))
+
+
+#%%
+# Demonstrate IntervalIndex
+if __name__ == '__main__':
+    from testdata.musicians import *
+
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+    the_rolling_stones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
+                              start=date(1962, 7, 12), end=None)
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    index = IntervalIndex([the_beatles, the_rolling_stones])
+    index.insert(buffalo_springfield)
+    print([b.name for b in index.at(date(1969, 8, 16))])
+    print([b.name for b in index.between(date(1966, 1, 1), date(1970, 12, 31))])
@@ -0,0 +1,175 @@
+"""JSON Lines (https://jsonlines.org) encoding/decoding of Musician and Band objects, for very large exports.
+
+Unlike dumps(<list of bands>) from json_tricks, which builds one JSON string for the whole list,
+every object is written as a separate JSON record on its own line:
+    {"type": "musician", "id": 0, "class": "Musician", "name": "Neil Young", "is_band_member": true}
+    {"type": "band", "name": "Buffalo Springfield", "members": [0, 1, 2, 3, 4], "start": "1966-04-11", ...}
+Each distinct musician is written once (a "musician" record, with an id), and bands refer to their members by id;
+a top-level musician is written as a "musician_ref" record. The reader is a generator, so the objects are available
+as soon as their lines are read, and memory use does not depend on the size of the file.
+"""
+
+
+#%%
+# Setup / Data
+
+import json
+from datetime import date
+
+from music.enums import Vocals, Instrument, flag_from_name
+from music.interning import musician_key
+from music.musician import Musician, SingerSongwriter, MUSICIAN_KINDS
+from music.frozen_musician import FrozenMusician, FROZEN_KINDS
+from music.band import Band
+from util.utility import open_compressed
+
+_KINDS_BY_NAME = {kind.__name__: kind for kind in MUSICIAN_KINDS}
+# The class name written for a musician: a frozen musician is written (and read back) as its mutable counterpart
+_KIND_NAMES = {kind: regular.__name__ for kinds in (MUSICIAN_KINDS, FROZEN_KINDS)
+               for kind, regular in zip(kinds, MUSICIAN_KINDS)}
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+#%%
+class JsonLinesWriter:
+    """Writes Musician and Band objects to a text file object as JSON Lines.
+    Lines are collected in a buffer of buffer_size lines and written to the file with a single write() call.
+    Use as a context manager, or call flush() when done.
+    """
+
+    def __init__(self, file, buffer_size=10_000):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.__buffer = []
+        self.__ids = {}                             # musician_key(m) -> id
+
+    def write(self, obj):
+        """Writes a Musician (or FrozenMusician) or a Band object
+        (and the records of the musicians it refers to, if not written yet).
+        """
+
+        if isinstance(obj, Band):
+            members = [self.__define(m) for m in obj.members]
+            self.__append({'type': 'band', 'name': obj.name, 'members': members,
+                           'start': _iso(obj.start), 'end': _iso(obj.end)})
+        elif isinstance(obj, (Musician, FrozenMusician)):
+            self.__append({'type': 'musician_ref', 'id': self.__define(obj)})
+        else:
+            raise TypeError(f'Cannot encode objects of type {type(obj).__name__}')
+
+    def write_all(self, objects):
+        for obj in objects:
+            self.write(obj)
+
+    def flush(self):
+        if self.__buffer:
+            self.file.write(''.join(self.__buffer))
+            self.__buffer.clear()
+        self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def __define(self, musician):
+        key = musician_key(musician)
+        musician_id = self.__ids.get(key)
+        if musician_id is None:
+            musician_id = self.__ids[key] = len(self.__ids)
+            record = {'type': 'musician', 'id': musician_id, 'class': _KIND_NAMES[musician.__class__],
+                      'name': musician.name, 'is_band_member': musician.is_band_member}
+            vocals = getattr(musician, 'vocals', None)            # frozen musicians have all role fields
+            if vocals is not None:
+                record['vocals'] = vocals.name
+            instrument = getattr(musician, 'instrument', None)
+            if instrument is not None:
+                record['instrument'] = instrument.name
+            self.__append(record)
+        return musician_id
+
+    def __append(self, record):
+        self.__buffer.append(_encode(record) + '\n')
+        if len(self.__buffer) >= self.buffer_size:
+            self.flush()
+
+
+#%%
+def read_jsonl(lines):
+    """Generator of the Musician and Band objects from an iterable of JSON Lines (e.g., an open text file).
+    Only the musicians (not the bands) are kept in memory, so that bands can refer to them by id.
+    """
+
+    musicians = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        record_type = record['type']
+        if record_type == 'musician':
+            kwargs = {'name': record['name'], 'is_band_member': record['is_band_member']}
+            if 'vocals' in record:
+                kwargs['vocals'] = flag_from_name(Vocals, record['vocals'])
+            if 'instrument' in record:
+                kwargs['instrument'] = flag_from_name(Instrument, record['instrument'])
+            musicians[record['id']] = _KINDS_BY_NAME[record['class']](**kwargs)
+        elif record_type == 'musician_ref':
+            yield musicians[record['id']]
+        elif record_type == 'band':
+            yield Band(record['name'], *[musicians[i] for i in record['members']],
+                       start=_date(record['start']), end=_date(record['end']))
+        else:
+            raise ValueError(f'Unknown record type {record_type!r}')
+
+
+#%%
+def dump(objects, path, buffer_size=10_000, compression=None, level=None):
+    """Writes an iterable of Musician and Band objects to the JSON Lines file at path
+    (compressed if compression is given or implied by the suffix of path, e.g. band.jsonl.gz;
+    see util.utility.open_compressed()).
+    """
+
+    with open_compressed(path, 'wt', compression, level) as f, JsonLinesWriter(f, buffer_size) as writer:
+        writer.write_all(objects)
+
+
+def load(path, compression=None):
+    """Generator of the Musician and Band objects from the (possibly compressed) JSON Lines file at path.
+    """
+
+    with open_compressed(path, 'rt', compression) as f:
+        yield from read_jsonl(f)
+
+
+#%%
+# Helpers
+
+def _iso(d):
+    return d.isoformat() if isinstance(d, date) else None
+
+
+def _date(s):
+    return date.fromisoformat(s) if s else None
+
+
+#%%
+# Demonstrate JSON Lines encoding/decoding of Musician and Band objects
+if __name__ == '__main__':
+    import io
+
+    from music.frozen_musician import FrozenSinger
+    from testdata.musicians import *
+
+    bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                           instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    buffer = io.StringIO()
+    with JsonLinesWriter(buffer) as writer:
+        writer.write_all([bob, buffalo_springfield,
+                          FrozenSinger(name='Graham Nash', vocals=Vocals.BACKGROUND_VOCALS)])
+    print(buffer.getvalue())
+    for obj in read_jsonl(buffer.getvalue().splitlines()):
+        print(obj)
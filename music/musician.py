@@ -5,8 +5,10 @@
 #%%
 # Setup / Data
 
+from pathlib import Path
+
 from util import utility
-from music.enums import Vocals, Instrument
+from music.enums import Vocals, Instrument, flag_from_name
 # import json
 
 # from testdata.musicians import *                # no, it makes a circular definition of Musician
@@ -110,26 +112,64 @@ class Musician:
         Assumes that musician_string is in the format generated by __str__().
         """
 
-        name = musician_string.split(', ')[0]
-        is_band_member = True if musician_string.split(', ')[1].startswith('b') else False
+        name, _, rest = musician_string.partition(', ')
+        is_band_member = True if rest.startswith('b') else False
 
         return cls(name, is_band_member)
 
+    @staticmethod
+    def from_lines(lines):
+        """Bulk, lazy version of from_str() for all musician classes - a generator of Musician, Singer, Songwriter
+        and SingerSongwriter objects, one per (non-empty) line in the format generated by __str__(), e.g.:
+            Bob Dylan, solo artist, rhythm_guitar, lead_vocals
+        The class of each object is determined from the vocals/instrument suffixes of the line.
+        lines is an iterable of strings (e.g., an open text file), or the path of a text file (str or Path);
+        each line is split only once, and only one line is held in memory at a time.
+        """
+
+        if isinstance(lines, (str, Path)):
+            with open(lines, 'r', encoding='utf-8', buffering=1 << 20) as f:
+                yield from Musician.from_lines(f)
+            return
+
+        kinds = MUSICIAN_KINDS
+        roles = ROLES_BY_NAME
+        for line in lines:
+            parts = line.rstrip('\n').split(', ')
+            if len(parts) == 2:
+                yield Musician(parts[0], parts[1].startswith('b'))
+                continue
+            if len(parts) < 2:
+                continue
+            kwargs = {}
+            while len(parts) > 2:
+                role = roles.get(parts[-1]) or _combined_role(parts[-1])
+                if role is None:
+                    break
+                parts.pop()
+                kwargs['vocals' if isinstance(role, Vocals) else 'instrument'] = role
+            kind = kinds[('vocals' in kwargs) + 2 * ('instrument' in kwargs)]
+            is_band_member = parts.pop().startswith('b')
+            yield kind(name=', '.join(parts), is_band_member=is_band_member, **kwargs)
+
 
 #%%
 # Print objects
-neil = Musician('Neil Young', is_band_member=True)
-print(neil)
+if __name__ == '__main__':
+    neil = Musician('Neil Young', is_band_member=True)
+    print(neil)
 
 #%%
 # Compare objects
-print(neil == Musician('Neil Young', is_band_member=True))
+if __name__ == '__main__':
+    print(neil == Musician('Neil Young', is_band_member=True))
 
 #%%
 # Run setters and getters in the debugger
-neil = Musician('Neil Young', is_band_member=True)
-neil.name = 'Neil Young'
-print(neil.name)
+if __name__ == '__main__':
+    neil = Musician('Neil Young', is_band_member=True)
+    neil.name = 'Neil Young'
+    print(neil.name)
 
 #%%
 # Access data fields/attributes (instance variables),
@@ -146,17 +186,19 @@ print(neil.name)
 #   1. <object>.<new_attr> = <value>
 #   2. <object>.__setattr__('<new_attr>', <value>)      # counterpart: <object>.__getattribute__('<attr>')
 #   3. setattr(<object>, '<new_attr>', <value>))        # counterpart: getattr(<object>, '<attr>')
-neil = Musician('Neil Young', is_band_member=True)
-neil.birth_year = 1946
-print(neil.birth_year)
+if __name__ == '__main__':
+    neil = Musician('Neil Young', is_band_member=True)
+    neil.birth_year = 1946
+    print(neil.birth_year)
 
 #%%
 # Calling methods
-neil = Musician('Neil Young', is_band_member=True)
-print(neil.play('Old Man', *['Thank you!', 'You\'re wonderful!'],
-                rhythm_count='One, two, three, four!', love='We love you!'))
-print(neil.play_song('Old Man', *['Thank you!', 'You\'re wonderful!'],
-                     rhythm_count='One, two, three, four!', love='We love you!'))
+if __name__ == '__main__':
+    neil = Musician('Neil Young', is_band_member=True)
+    print(neil.play('Old Man', *['Thank you!', 'You\'re wonderful!'],
+                    rhythm_count='One, two, three, four!', love='We love you!'))
+    print(neil.play_song('Old Man', *['Thank you!', 'You\'re wonderful!'],
+                         rhythm_count='One, two, three, four!', love='We love you!'))
 
 #%%
 # Demonstrate object data fields and methods (possibly in Python console)
@@ -169,26 +211,29 @@ print(neil.play_song('Old Man', *['Thank you!', 'You\'re wonderful!'],
 # - o.__dir__
 # - o.__dict__
 
-print(True + 1)
-print(True.__int__())
-print((1).__class__)
-print((1).__class__.__name__)
-print((1).__dir__())
-print(object.__dict__)
+if __name__ == '__main__':
+    print(True + 1)
+    print(True.__int__())
+    print((1).__class__)
+    print((1).__class__.__name__)
+    print((1).__dir__())
+    print(object.__dict__)
 
 
 #%%
 # Demonstrate object data fields and methods for Musician objects
-neil = Musician('Neil Young', is_band_member=True)
-print(neil.__dict__)
+if __name__ == '__main__':
+    neil = Musician('Neil Young', is_band_member=True)
+    print(neil.__dict__)
 
 
 #%%
 # Demonstrate @classmethod (from_str())
-neil = Musician('Neil Young', is_band_member=True)
-neil_string = str(neil)
-# print(neil_string)
-print(neil == Musician.from_str(neil_string))
+if __name__ == '__main__':
+    neil = Musician('Neil Young', is_band_member=True)
+    neil_string = str(neil)
+    # print(neil_string)
+    print(neil == Musician.from_str(neil_string))
 
 
 #%%
@@ -289,7 +334,8 @@ class Songwriter(Musician):
 #   object class defines object.__eq__(self, other) etc.
 #   object.__ne__(self, other), the inverse of object.__eq__(self, other),
 #   is provided by Python automatically once object.__eq__(self, other) is implemented
-list.__mro__
+if __name__ == '__main__':
+    list.__mro__
 
 #%%
 # # Demonstrate inheritance
@@ -351,6 +397,40 @@ class SingerSongwriter(Singer, Songwriter):
         Songwriter.what_do_you_do(self)
 
 
+#%%
+# All musician classes, in the order used for compact (numeric) class codes in tables, files, etc.
+# The index of a class is 1 if it has vocals, + 2 if it has an instrument.
+MUSICIAN_KINDS = (Musician, Singer, Songwriter, SingerSongwriter)
+
+# Vocals and Instrument members by the names used in __str__() (e.g., 'lead_vocals', 'rhythm_guitar')
+ROLES_BY_NAME = {role.name.lower(): role for role in (*Vocals, *Instrument)}
+
+
+def _combined_role(token):
+    """Returns the combined Vocals/Instrument flag for a token such as 'bass|piano' (None if it is not one)."""
+
+    first = ROLES_BY_NAME.get(token.partition('|')[0])
+    if first is None or '|' not in token:
+        return None
+    try:
+        return flag_from_name(first.__class__, token)
+    except KeyError:
+        return None
+
+
+#%%
+# Demonstrate Musician.from_lines()
+if __name__ == '__main__':
+    lines = [str(Musician('Neil Young')),
+             str(Singer(name='Graham Nash', vocals=Vocals.BACKGROUND_VOCALS)),
+             str(Songwriter(name='Stephen Stills', instrument=Instrument.LEAD_GUITAR)),
+             str(Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR | Instrument.PIANO)),
+             str(SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                                  instrument=Instrument.RHYTHM_GUITAR, is_band_member=False))]
+    for m in Musician.from_lines(lines):
+        print(f'{m.__class__.__name__}: {m}')
+
+
 #%%
 # Demonstrate multiple inheritance and MRO.
 # Make sure to read this first: https://stackoverflow.com/a/50465583/1899061 (especially Scenario 3).
@@ -359,42 +439,44 @@ class SingerSongwriter(Singer, Songwriter):
 #%%
 # Demonstrate inheritance
 # Version 2 - with multiple inheritance
-neil = Singer(name='Neil', vocals=Vocals.LEAD_VOCALS)
-print(neil)
-print(Singer.__mro__)
-print(neil == Singer(name='Neil Young', vocals=Vocals.LEAD_VOCALS))
-print()
-neil = Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR)
-print(neil)
-print(Songwriter.__mro__)
-print(neil == Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR))
-print(neil)
-print(neil == Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR))
-neil.what_do_you_do()
+if __name__ == '__main__':
+    neil = Singer(name='Neil', vocals=Vocals.LEAD_VOCALS)
+    print(neil)
+    print(Singer.__mro__)
+    print(neil == Singer(name='Neil Young', vocals=Vocals.LEAD_VOCALS))
+    print()
+    neil = Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR)
+    print(neil)
+    print(Songwriter.__mro__)
+    print(neil == Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR))
+    print(neil)
+    print(neil == Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR))
+    neil.what_do_you_do()
 
 #%%
-print(SingerSongwriter.__mro__)
-print()
-
-#       A
-#      / \
-#     /   \
-#    /     \
-#   B       C
-#    \     /
-#     \   /
-#      \ /
-#       D
-
-bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
-                       instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
-print(bob)
-print()
-print(bob == SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
-                              instrument=Instrument.RHYTHM_GUITAR, is_band_member=False))
-print()
-#
-bob.tell()
+if __name__ == '__main__':
+    print(SingerSongwriter.__mro__)
+    print()
+
+    #       A
+    #      / \
+    #     /   \
+    #    /     \
+    #   B       C
+    #    \     /
+    #     \   /
+    #      \ /
+    #       D
+
+    bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                           instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
+    print(bob)
+    print()
+    print(bob == SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                                  instrument=Instrument.RHYTHM_GUITAR, is_band_member=False))
+    print()
+    #
+    bob.tell()
 
 #%%
 # Demonstrate JSON encoding/decoding of simple data types.
@@ -420,17 +502,19 @@ bob.tell()
 
 #%%
 # Single object
-from json_tricks import loads, dumps
-bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
-                       instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
-print(loads(dumps(bob)))
+if __name__ == '__main__':
+    from json_tricks import loads, dumps
+    bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                           instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
+    print(loads(dumps(bob)))
 
 #%%
 # List of objects
-from json_tricks import loads, dumps
-bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
-                       instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
-neil = Singer(name='Neil', vocals=Vocals.LEAD_VOCALS)
+if __name__ == '__main__':
+    from json_tricks import loads, dumps
+    bob = SingerSongwriter(name='Bob Dylan', vocals=Vocals.LEAD_VOCALS,
+                           instrument=Instrument.RHYTHM_GUITAR, is_band_member=False)
+    neil = Singer(name='Neil', vocals=Vocals.LEAD_VOCALS)
 
-print([str(m) for m in loads(dumps([bob, neil]))])
+    print([str(m) for m in loads(dumps([bob, neil]))])
 
@@ -0,0 +1,200 @@
+"""Asynchronous (asyncio) pipelines over collections of bands (or any other objects), with bounded queues.
+
+A pipeline is a chain of async iterables of chunks (lists of items):
+- achunks() is the source: it runs a blocking iterable (e.g., read_bands(), BandStore.bands()) in a producer thread
+  and passes its items, in chunks, through a bounded asyncio.Queue
+- amap() is a stage: it applies a function to each item (in a worker thread, or awaited if it is a coroutine function),
+  reading ahead from the previous stage through another bounded queue
+- aitems() flattens the chunks into items again (async for band in aitems(...))
+Each queue holds at most maxsize chunks, so a fast producer waits for slow consumers (backpressure) instead of
+filling the memory, while producers and consumers overlap their I/O (reading, decompressing, writing) and CPU work.
+Items are passed in chunks because every hop between a thread and the event loop costs tens of microseconds,
+much more than rendering or parsing a single band.
+The stages share the GIL, so a pipeline pays off when they wait (on files, compression, databases, the network);
+purely CPU-bound stages do not run in parallel, and are somewhat slower than a synchronous loop.
+"""
+
+
+#%%
+# Setup / Data
+
+import asyncio
+import inspect
+import threading
+from contextlib import aclosing
+from itertools import islice
+
+
+#%%
+async def achunks(iterable, chunk_size=1024, maxsize=8):
+    """Async generator of chunks (lists of up to chunk_size items) from a blocking iterable,
+    which is iterated in a producer thread; at most maxsize chunks wait in the queue.
+    An exception raised by the iterable is re-raised here. If the generator is closed early,
+    the producer thread stops after its current chunk.
+    """
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        # Blocks the producer thread while the queue is full
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def produce():
+        try:
+            iterator = iter(iterable)
+            while not stopped.is_set():
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                put(chunk)
+        except BaseException as e:
+            put(e)
+        else:
+            put(None)
+
+    thread = threading.Thread(target=produce, name='achunks producer', daemon=True)
+    thread.start()
+    try:
+        while (chunk := await queue.get()) is not None:
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield chunk
+    finally:
+        stopped.set()
+        while thread.is_alive():                # unblock the producer if it is waiting for a free slot
+            _drain(queue)
+            await asyncio.sleep(0.001)
+
+
+async def aitems(chunks):
+    """Async generator of the items of the chunks from an async iterable (e.g., achunks(), amap()),
+    which is closed when the generator is (e.g., when the consumer stops early).
+    """
+
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            for item in chunk:
+                yield item
+
+
+async def amap(func, chunks, maxsize=8, in_thread=True):
+    """Async generator of chunks of func(item) for the items of the chunks from an async iterable, in order.
+    The chunks are read ahead by a separate task into a bounded queue (at most maxsize chunks), so the previous
+    stages keep working while func is applied. func is called in a worker thread for each chunk
+    (or in the event loop, if in_thread is False), or awaited, concurrently for all items of a chunk,
+    if it is a coroutine function.
+    """
+
+    is_async = inspect.iscoroutinefunction(func)
+    async with aclosing(_read_ahead(chunks, maxsize)) as chunks:
+        async for chunk in chunks:
+            if is_async:
+                yield await asyncio.gather(*[func(item) for item in chunk])
+            elif in_thread:
+                yield await asyncio.to_thread(_apply, func, chunk)
+            else:
+                yield _apply(func, chunk)
+
+
+async def pipeline(iterable, *funcs, chunk_size=1024, maxsize=8):
+    """Async generator of the items of a blocking iterable, passed through funcs (stages, see amap()) in order,
+    e.g. async for line in pipeline(read_bands(path), str): ...
+    """
+
+    chunks = achunks(iterable, chunk_size, maxsize)
+    for func in funcs:
+        chunks = amap(func, chunks, maxsize)
+    async with aclosing(aitems(chunks)) as items:
+        async for item in items:
+            yield item
+
+
+#%%
+# Helpers
+
+async def _read_ahead(chunks, maxsize):
+    """Async generator of the chunks from an async iterable, read ahead by a separate task into a bounded queue."""
+
+    queue = asyncio.Queue(maxsize)
+
+    async def feed():
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    task = asyncio.create_task(feed())
+    try:
+        while (chunk := await queue.get()) is not None:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        if hasattr(chunks, 'aclose'):
+            await chunks.aclose()
+
+
+def _apply(func, chunk):
+    return [func(item) for item in chunk]
+
+
+def _drain(queue):
+    while not queue.empty():
+        queue.get_nowait()
+
+
+#%%
+# Demonstrate a pipeline: reading bands from a compressed text file and indexing their names by decade
+if __name__ == '__main__':
+    from datetime import date
+
+    from music.band import Band, write_bands, read_bands
+    from testdata.musicians import *
+    from util.utility import get_data_dir
+
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+    the_rolling_stones = Band('The Rolling Stones', *[mickJagger, keithRichards, ronWood, charlieWatts],
+                              start=date(1962, 7, 12), end=None)
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    file = get_data_dir() / 'band.txt.gz'
+    write_bands([the_beatles, the_rolling_stones, buffalo_springfield], file)
+
+    async def index_by_decade(path):
+        decades = {}
+        async for decade, name in pipeline(read_bands(path), lambda b: (b.start.year // 10 * 10, b.name), chunk_size=2):
+            decades.setdefault(decade, []).append(name)
+        return decades
+
+    print(asyncio.run(index_by_decade(file)))
+
+
+#%%
+# Demonstrate backpressure: a fast producer is never more than maxsize chunks ahead of a slow consumer
+if __name__ == '__main__':
+    async def slow_consumer(n):
+        produced = []
+
+        def numbers():
+            for i in range(n):
+                produced.append(i)
+                yield i
+
+        async for i in aitems(achunks(numbers(), chunk_size=10, maxsize=2)):
+            await asyncio.sleep(0.001)
+            if i % 100 == 0:
+                print(f'consumed: {i + 1}, produced: {len(produced)}')
+
+    asyncio.run(slow_consumer(500))
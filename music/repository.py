@@ -0,0 +1,344 @@
+"""A repository of Band and Musician objects backed by an SQLite database (the standard sqlite3 module),
+for querying a large catalog without loading all of it.
+
+The schema is normalized:
+- vocals, instruments - one row per Vocals/Instrument member (code = <flag>.value, name)
+- musicians - one row per distinct musician (music.interning.musician_key()): kind (class name), name, is_band_member
+  (a frozen musician, from music.frozen_musician, is stored as, and is the same row as, its mutable counterpart)
+- musician_vocals, musician_instruments - the roles of each musician (a combined flag is stored as one row per role)
+- bands - name (unique; adding a band with the name of a stored one replaces it), start and end (ISO dates or NULL)
+- membership - the members of each band, in order
+Bands are added in batches, each batch in a single transaction with executemany() inserts
+(the stored musicians of a batch are looked up by name with a few IN (...) queries, not one query per musician).
+The queries are module-level SQL constants, always passed as the same strings,
+so that sqlite3 prepares each of them once per connection and then reuses the prepared statement (from its cache).
+The database runs in WAL mode, so that other connections can read while a batch is being written.
+Each query materializes its own Musician objects (mutable, so they are never shared between query results):
+a musician who plays in several bands of one result is one object, as in the bands the catalog was built from.
+"""
+
+
+#%%
+# Setup / Data
+
+import sqlite3
+from datetime import date
+from itertools import groupby, islice
+from operator import itemgetter
+
+from music.enums import Vocals, Instrument
+from music.interning import musician_key
+from music.musician import MUSICIAN_KINDS
+from music.frozen_musician import FROZEN_KINDS
+from music.band import Band
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vocals (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS instruments (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS musicians (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_band_member INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS musicians_name ON musicians (name);
+CREATE TABLE IF NOT EXISTS musician_vocals (
+    musician_id INTEGER NOT NULL REFERENCES musicians (id),
+    code INTEGER NOT NULL REFERENCES vocals (code),
+    PRIMARY KEY (musician_id, code)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS musician_instruments (
+    musician_id INTEGER NOT NULL REFERENCES musicians (id),
+    code INTEGER NOT NULL REFERENCES instruments (code),
+    PRIMARY KEY (musician_id, code)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bands (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    start TEXT,
+    end TEXT
+);
+CREATE INDEX IF NOT EXISTS bands_start ON bands (start);
+CREATE TABLE IF NOT EXISTS membership (
+    band_id INTEGER NOT NULL REFERENCES bands (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    musician_id INTEGER NOT NULL REFERENCES musicians (id),
+    PRIMARY KEY (band_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS membership_musician ON membership (musician_id);
+"""
+
+# Common queries (see the module docstring); each band query returns one row per member, in order
+_ROLES = ('(SELECT total(code) FROM musician_vocals WHERE musician_id = m.id), '
+          '(SELECT total(code) FROM musician_instruments WHERE musician_id = m.id)')
+_BANDS = (f'SELECT b.id, b.name, b.start, b.end, m.id, m.kind, m.name, m.is_band_member, {_ROLES} FROM bands b '
+          f'LEFT JOIN membership ms ON ms.band_id = b.id LEFT JOIN musicians m ON m.id = ms.musician_id '
+          f'WHERE {{}} ORDER BY b.id, ms.position')
+# FIND_MUSICIANS[n] looks up n names (a few fixed sizes, so that there are a few prepared statements;
+# unused parameters are NULL, which matches no name)
+FIND_MUSICIANS = {n: (f'SELECT m.id, m.kind, m.name, m.is_band_member, {_ROLES} FROM musicians m '
+                      f'WHERE m.name IN ({", ".join("?" * n)})') for n in (1, 16, 500)}
+HAS_BAND = 'SELECT 1 FROM bands WHERE name = ?'
+BAND_BY_NAME = _BANDS.format('b.name = ?')
+BANDS_OF_MUSICIAN = _BANDS.format('b.id IN (SELECT band_id FROM membership WHERE musician_id = ?)')
+BANDS_ACTIVE_ON = _BANDS.format('(b.start IS NULL OR b.start <= ?) AND (b.end IS NULL OR b.end >= ?)')
+ALL_BANDS = _BANDS.format('1')
+
+_KINDS_BY_NAME = {kind.__name__: kind for kind in MUSICIAN_KINDS}
+_MUTABLE_KINDS = {kind: regular for kinds in (MUSICIAN_KINDS, FROZEN_KINDS)
+                  for kind, regular in zip(kinds, MUSICIAN_KINDS)}
+
+
+#%%
+class BandRepository:
+    """Stores bands and their members in an SQLite database at path (see the module docstring) and
+    materializes the Band and Musician objects returned by the queries.
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path, batch_size=10_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.__connection = sqlite3.connect(path, isolation_level=None)     # transactions are explicit
+        self.__connection.execute('PRAGMA journal_mode = WAL')
+        self.__connection.execute('PRAGMA synchronous = NORMAL')
+        self.__connection.execute('PRAGMA foreign_keys = ON')
+        self.__connection.executescript(SCHEMA)
+        with self.__transaction():
+            for table, enum in (('vocals', Vocals), ('instruments', Instrument)):
+                self.__connection.executemany(f'INSERT OR IGNORE INTO {table} (code, name) VALUES (?, ?)',
+                                              [(member.value, member.name) for member in enum])
+        self.__ids = {}                     # _key(m) -> musicians.id, for the musicians seen so far
+
+    def close(self):
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __transaction(self):
+        return _Transaction(self.__connection)
+
+    def __len__(self):
+        return self.__connection.execute('SELECT count(*) FROM bands').fetchone()[0]
+
+    def __contains__(self, name):
+        return self.__connection.execute(HAS_BAND, (name,)).fetchone() is not None
+
+    # Writing
+
+    def add(self, band):
+        """Adds a band (and its members), replacing the stored band with the same name (if any).
+        """
+
+        self.add_all([band])
+
+    def add_all(self, bands):
+        """Adds bands from an iterable in batches of batch_size bands, each batch in one transaction.
+        """
+
+        bands = iter(bands)
+        while batch := list(islice(bands, self.batch_size)):
+            for band in batch:
+                if not isinstance(band, Band):
+                    raise TypeError(f'Only Band objects can be added, not {type(band).__name__}')
+            try:
+                with self.__transaction():
+                    self.__add_batch(batch)
+            except Exception:
+                self.__ids.clear()          # it may refer to musicians whose inserts were rolled back
+                raise
+
+    def __add_batch(self, batch):
+        c = self.__connection
+        batch = list({band.name: band for band in batch}.values())          # the last band with a name wins
+        c.executemany('DELETE FROM bands WHERE name = ?', [(band.name,) for band in batch])
+
+        # New musicians get the next free ids (the batch is written in one transaction, so nobody else writes)
+        next_id = c.execute('SELECT coalesce(max(id), 0) + 1 FROM musicians').fetchone()[0]
+        new = {}                            # _key(m) -> m, for the musicians not seen so far
+        for band in batch:
+            for m in band.members:
+                key = _key(m)
+                if key not in self.__ids:
+                    new.setdefault(key, m)
+        self.__ids.update(self.__find(new))
+        musicians, vocals, instruments = [], [], []
+        for key, m in new.items():
+            if key not in self.__ids:
+                self.__ids[key] = next_id
+                musicians.append((next_id, key[0].__name__, m.name, m.is_band_member))
+                vocals.extend((next_id, code) for code in _codes(getattr(m, 'vocals', None)))
+                instruments.extend((next_id, code) for code in _codes(getattr(m, 'instrument', None)))
+                next_id += 1
+        c.executemany('INSERT INTO musicians (id, kind, name, is_band_member) VALUES (?, ?, ?, ?)', musicians)
+        c.executemany('INSERT INTO musician_vocals (musician_id, code) VALUES (?, ?)', vocals)
+        c.executemany('INSERT INTO musician_instruments (musician_id, code) VALUES (?, ?)', instruments)
+
+        next_id = c.execute('SELECT coalesce(max(id), 0) + 1 FROM bands').fetchone()[0]
+        c.executemany('INSERT INTO bands (id, name, start, end) VALUES (?, ?, ?, ?)',
+                      [(next_id + i, band.name, _iso(band.start), _iso(band.end)) for i, band in enumerate(batch)])
+        c.executemany('INSERT INTO membership (band_id, position, musician_id) VALUES (?, ?, ?)',
+                      [(next_id + i, position, self.__ids[_key(m)])
+                       for i, band in enumerate(batch) for position, m in enumerate(band.members)])
+
+    def __find(self, musicians):
+        """Returns {_key(m): id} for the stored musicians equal to the ones in musicians
+        (a dict {_key(m): m}), looking them up by name, up to 500 names per query.
+        """
+
+        found = {}
+        names = list({m.name for m in musicians.values()})
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            n = next(n for n in FIND_MUSICIANS if n >= len(chunk))
+            for row in self.__connection.execute(FIND_MUSICIANS[n], chunk + [None] * (n - len(chunk))):
+                key = _key(_musician(*row))
+                if key in musicians:
+                    found[key] = row[0]
+        return found
+
+    def delete(self, name):
+        """Deletes the band with the given name (KeyError if there is no such band); its members stay stored.
+        """
+
+        with self.__transaction():
+            if self.__connection.execute('DELETE FROM bands WHERE name = ?', (name,)).rowcount == 0:
+                raise KeyError(name)
+
+    # Queries
+
+    def band(self, name):
+        """Returns the band with the given name (None if there is no such band).
+        """
+
+        return next(self.__bands(self.__connection.execute(BAND_BY_NAME, (name,))), None)
+
+    def members_of(self, name):
+        """Returns the list of members of the band with the given name (KeyError if there is no such band).
+        """
+
+        band = self.band(name)
+        if band is None:
+            raise KeyError(name)
+        return list(band.members)
+
+    def bands_of(self, musician):
+        """Returns the list of bands that the musician plays in.
+        """
+
+        key = _key(musician)
+        musician_id = self.__ids.get(key) or self.__find({key: musician}).get(key)
+        if musician_id is None:
+            return []
+        return list(self.__bands(self.__connection.execute(BANDS_OF_MUSICIAN, (musician_id,))))
+
+    def active_on(self, day):
+        """Returns the list of bands active on day (bands with no start/end date are treated
+        as active since ever/still active).
+        """
+
+        d = day.isoformat()
+        return list(self.__bands(self.__connection.execute(BANDS_ACTIVE_ON, (d, d))))
+
+    def __iter__(self):
+        """Generator of all stored bands, materialized one at a time."""
+
+        return self.__bands(self.__connection.execute(ALL_BANDS))
+
+    def __bands(self, rows):
+        """Generator of the Band objects from the rows of a band query (consecutive rows of each band).
+        The Musician objects are created for this query only (one per musician, see the module docstring).
+        """
+
+        musicians = {}                      # musicians.id -> Musician
+        for (band_id, name, start, end), band_rows in groupby(rows, key=itemgetter(0, 1, 2, 3)):
+            members = []
+            for row in band_rows:
+                musician_id = row[4]
+                if musician_id is None:     # a band with no members (the LEFT JOIN's NULLs)
+                    continue
+                m = musicians.get(musician_id)
+                if m is None:
+                    m = musicians[musician_id] = _musician(*row[4:])
+                members.append(m)
+            yield Band(name, *members, start=_date(start), end=_date(end))
+
+
+#%%
+class _Transaction:
+    """Context manager of a write transaction (BEGIN IMMEDIATE ... COMMIT, or ROLLBACK on an exception)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, *exc_info):
+        self.connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+
+
+#%%
+# Helpers
+
+def _codes(flag):
+    """The codes of the individual roles of a (possibly combined) Vocals/Instrument flag."""
+
+    return [] if flag is None else [member.value for member in type(flag) if member.value & flag.value]
+
+
+def _key(musician):
+    """musician_key() of a musician, with the class of a frozen musician replaced by its mutable counterpart."""
+
+    kind, *fields = musician_key(musician)
+    return _MUTABLE_KINDS[kind], *fields
+
+
+def _musician(musician_id, kind, name, is_band_member, vocals, instrument):
+    kwargs = {'name': name, 'is_band_member': bool(is_band_member)}
+    if vocals:
+        kwargs['vocals'] = Vocals(int(vocals))
+    if instrument:
+        kwargs['instrument'] = Instrument(int(instrument))
+    return _KINDS_BY_NAME[kind](**kwargs)
+
+
+def _iso(d):
+    return d.isoformat() if isinstance(d, date) else None
+
+
+def _date(s):
+    return date.fromisoformat(s) if s else None
+
+
+#%%
+# Demonstrate BandRepository
+if __name__ == '__main__':
+    from music.frozen_musician import FrozenMusician
+    from testdata.musicians import *
+    from util.utility import get_data_dir
+
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    csny = Band('Crosby, Stills, Nash & Young', *[Musician('David Crosby'), stephenStills, Musician('Graham Nash'), neilYoung],
+                start=date(1968, 3, 1), end=date(1970, 7, 9))
+
+    with BandRepository(get_data_dir() / 'band.db') as repository:
+        repository.add_all([the_beatles, buffalo_springfield, csny])
+        print(len(repository))
+        print([str(m) for m in repository.members_of('Buffalo Springfield')])
+        print([b.name for b in repository.bands_of(stephenStills)])
+        print([b.name for b in repository.bands_of(FrozenMusician('Stephen Stills'))])    # stored as a Musician
+        print([b.name for b in repository.active_on(date(1969, 8, 16))])
+
+    # The objects returned by a query are its own: changing them changes neither the database nor other results
+    with BandRepository(get_data_dir() / 'band.db') as repository:
+        members = repository.members_of('Buffalo Springfield')
+        members[0].name = 'Changed locally'
+        print([m.name for m in repository.members_of('Buffalo Springfield')][:2])
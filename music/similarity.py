@@ -0,0 +1,247 @@
+"""Similarity search over band lineups: finding bands with heavily overlapping members
+(e.g., Buffalo Springfield and Crosby, Stills, Nash & Young) in a catalog too big for pairwise comparison
+of set(members).
+
+The similarity of two lineups is their Jaccard index, |A & B| / |A | B| (musicians are compared by
+music.interning.musician_key()). Each lineup is summarized by a MinHash signature (num_perm minimums of random
+hash functions over its members; two signatures agree in each position with probability equal to the Jaccard index),
+computed with NumPy for many bands at once. Locality-sensitive hashing (LSH) then splits each signature into
+n_bands groups of n_rows positions and puts the band into one bucket per group; bands sharing at least one bucket
+become candidates, which happens with high probability for pairs above the threshold and rarely for the others.
+The candidates are re-ranked with the exact Jaccard index, so the results contain no false positives.
+"""
+
+
+#%%
+# Setup / Data
+
+import numpy as np
+
+from music.interning import musician_key
+from music.band import Band
+
+PRIME = (1 << 31) - 1                   # hash functions are (a * x + b) % PRIME; products fit in 64 bits
+
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz                 # np.trapz was renamed in NumPy 2.0
+
+
+#%%
+def lsh_parameters(threshold, num_perm, false_negative_weight=0.8):
+    """Returns (n_bands, n_rows), n_bands * n_rows == num_perm, that minimize the weighted sum of
+    the false positive probability (pairs below threshold becoming candidates) and
+    the false negative probability (pairs above threshold not becoming candidates), integrated over similarities;
+    a pair with similarity s becomes a candidate with probability 1 - (1 - s ** n_rows) ** n_bands.
+    False positives only cost time (they are removed by the exact re-ranking), so false negatives weigh more.
+    """
+
+    def error(n_rows):
+        n_bands = num_perm // n_rows
+        s = np.linspace(0, 1, 1001)
+        p = 1 - (1 - s ** n_rows) ** n_bands
+        false_positives = _trapezoid(np.where(s < threshold, p, 0), s)
+        false_negatives = _trapezoid(np.where(s >= threshold, 1 - p, 0), s)
+        return (1 - false_negative_weight) * false_positives + false_negative_weight * false_negatives
+
+    n_rows = min((r for r in range(1, num_perm + 1) if num_perm % r == 0), key=error)
+    return num_perm // n_rows, n_rows
+
+
+#%%
+class LineupIndex:
+    """MinHash/LSH index of band lineups (see the module docstring).
+    Bands are added one at a time (add()) or in bulk (add_all(), with signatures computed in vectorized chunks);
+    bands with no members are kept but never returned as similar.
+    The bucket keys of each LSH band are kept in a sorted array (searched with np.searchsorted); the keys of
+    newly added bands are appended to a pending array first, and merged into the sorted arrays when it grows.
+    """
+
+    def __init__(self, bands=(), threshold=0.5, num_perm=128, seed=0):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.n_bands, self.n_rows = lsh_parameters(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self.__a = rng.integers(1, PRIME, size=num_perm, dtype=np.int64)
+        self.__b = rng.integers(0, PRIME, size=num_perm, dtype=np.int64)
+        self.__mix = rng.integers(1, 1 << 63, size=self.n_rows, dtype=np.uint64) | np.uint64(1)
+        self.bands = []                             # Band objects, by band index
+        self.__lineups = []                         # frozensets of member codes, by band index
+        self.__codes = {}                           # musician key -> member code
+        self.__sorted_keys = np.empty((self.n_bands, 0), dtype=np.uint64)  # bucket keys, sorted per LSH band
+        self.__sorted_indices = np.empty((self.n_bands, 0), dtype=np.int64)    # band indices, in the same order
+        self.__pending_keys = []                    # arrays of shape (n, n_bands), not merged yet
+        self.__pending_indices = []                 # arrays of n band indices, not merged yet
+        self.__n_pending = 0
+        self.add_all(bands)
+
+    def __len__(self):
+        return len(self.bands)
+
+    def __lineup(self, band, unknown=None):
+        """The frozenset of member codes of band. Musicians seen for the first time get new codes in self.__codes
+        when adding bands (unknown is None); in queries, they get negative codes from the dict unknown instead,
+        so that queries do not grow the index.
+        """
+
+        if not isinstance(band, Band):
+            raise TypeError(f'Only Band objects can be indexed, not {type(band).__name__}')
+        codes = self.__codes
+        if unknown is None:
+            return frozenset(codes.setdefault(musician_key(m), len(codes)) for m in band.members)
+        keys = [musician_key(m) for m in band.members]
+        return frozenset(codes[key] if key in codes else unknown.setdefault(key, -1 - len(unknown)) for key in keys)
+
+    def __signatures(self, lineups):
+        """MinHash signatures (an array of shape (len(lineups), num_perm)) of non-empty lineups."""
+
+        counts = np.fromiter((len(lineup) for lineup in lineups), dtype=np.int64, count=len(lineups))
+        codes = np.fromiter((code for lineup in lineups for code in lineup), dtype=np.int64, count=int(counts.sum()))
+        hashes = (self.__a[:, None] * codes[None, :] + self.__b[:, None]) % PRIME
+        return np.minimum.reduceat(hashes, np.cumsum(counts) - counts, axis=1).T
+
+    def __keys(self, signatures):
+        """LSH bucket keys (an array of shape (len(signatures), n_bands)): a 64-bit hash of each group of rows."""
+
+        groups = signatures.reshape(len(signatures), self.n_bands, self.n_rows).astype(np.uint64)
+        return (groups * self.__mix).sum(axis=2)            # wraps around modulo 2**64
+
+    def add(self, band):
+        """Adds a band to the index."""
+
+        self.add_all([band])
+
+    def add_all(self, bands, chunk_size=10_000):
+        """Adds bands from an iterable, computing the signatures of chunk_size bands at a time
+        (and merging their bucket keys into the sorted arrays once, at the end, if there are many).
+        """
+
+        chunk = []
+        for band in bands:
+            chunk.append(band)
+            if len(chunk) == chunk_size:
+                self.__add_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.__add_chunk(chunk)
+        if self.__n_pending > max(4096, self.__sorted_keys.shape[1] // 8):
+            self.__merge()
+
+    def __add_chunk(self, bands):
+        first = len(self.bands)
+        lineups = [self.__lineup(band) for band in bands]
+        self.bands.extend(bands)
+        self.__lineups.extend(lineups)
+        indices = np.array([first + i for i, lineup in enumerate(lineups) if lineup], dtype=np.int64)
+        if not len(indices):
+            return
+        self.__pending_keys.append(self.__keys(self.__signatures([self.__lineups[i] for i in indices])))
+        self.__pending_indices.append(indices)
+        self.__n_pending += len(indices)
+
+    def __merge(self):
+        """Merges the pending bucket keys into the sorted arrays."""
+
+        if not self.__n_pending:
+            return
+        keys = np.concatenate([self.__sorted_keys, np.concatenate(self.__pending_keys).T], axis=1)
+        indices = np.concatenate([self.__sorted_indices,
+                                  np.broadcast_to(np.concatenate(self.__pending_indices),
+                                                  (self.n_bands, self.__n_pending))], axis=1)
+        order = np.argsort(keys, axis=1, kind='stable')
+        self.__sorted_keys = np.take_along_axis(keys, order, axis=1)
+        self.__sorted_indices = np.take_along_axis(indices, order, axis=1)
+        self.__pending_keys, self.__pending_indices, self.__n_pending = [], [], 0
+
+    def __candidates(self, keys):
+        """The indices of the bands sharing at least one bucket with the bucket keys (of one lineup)."""
+
+        if len(self.__pending_keys) > 1:
+            self.__pending_keys = [np.concatenate(self.__pending_keys)]
+            self.__pending_indices = [np.concatenate(self.__pending_indices)]
+        candidates = set()
+        for sorted_keys, sorted_indices, key in zip(self.__sorted_keys, self.__sorted_indices, keys):
+            lo, hi = np.searchsorted(sorted_keys, key, 'left'), np.searchsorted(sorted_keys, key, 'right')
+            candidates.update(sorted_indices[lo:hi].tolist())
+        for pending_keys, pending_indices in zip(self.__pending_keys, self.__pending_indices):
+            candidates.update(pending_indices[(pending_keys == keys).any(axis=1)].tolist())
+        return candidates
+
+    def jaccard(self, band_a, band_b):
+        """The exact Jaccard index of the lineups of two bands (0 if both have no members)."""
+
+        unknown = {}
+        a, b = self.__lineup(band_a, unknown), self.__lineup(band_b, unknown)
+        return len(a & b) / len(a | b) if a or b else 0
+
+    def similar(self, band, threshold=None):
+        """Returns a list of (indexed band, Jaccard index) for the bands whose lineups are similar to the lineup
+        of band (at least threshold, by default self.threshold), most similar first.
+        band itself is not included if it is indexed.
+        """
+
+        threshold = self.threshold if threshold is None else threshold
+        lineup = self.__lineup(band, {})
+        if not lineup:
+            return []
+        results = []
+        for i in self.__candidates(self.__keys(self.__signatures([lineup]))[0]):
+            if self.bands[i] is band:
+                continue
+            other = self.__lineups[i]
+            similarity = len(lineup & other) / len(lineup | other)
+            if similarity >= threshold:
+                results.append((self.bands[i], similarity))
+        return sorted(results, key=lambda result: -result[1])
+
+    def similar_pairs(self, threshold=None):
+        """Returns a list of (band, band, Jaccard index) for all pairs of indexed bands with similar lineups
+        (at least threshold, by default self.threshold), most similar first.
+        Only the pairs sharing an LSH bucket are compared, so the time is near-linear in the number of bands
+        (plus the number of candidate pairs).
+        """
+
+        threshold = self.threshold if threshold is None else threshold
+        self.__merge()
+        candidates = set()
+        for sorted_keys, sorted_indices in zip(self.__sorted_keys, self.__sorted_indices):
+            # Runs of equal keys (buckets; the sentinels differ from the first and the last key) with more than one band
+            starts = np.flatnonzero(np.diff(sorted_keys, prepend=~sorted_keys[:1], append=~sorted_keys[-1:]) != 0)
+            shared = np.flatnonzero(np.diff(starts) > 1)
+            for start, end in zip(starts[shared].tolist(), starts[shared + 1].tolist()):
+                bucket = sorted(sorted_indices[start:end].tolist())
+                candidates.update((bucket[x], bucket[y]) for x in range(len(bucket))
+                                  for y in range(x + 1, len(bucket)))
+        results = []
+        for i, j in candidates:
+            a, b = self.__lineups[i], self.__lineups[j]
+            similarity = len(a & b) / len(a | b)
+            if similarity >= threshold:
+                results.append((self.bands[i], self.bands[j], similarity))
+        return sorted(results, key=lambda result: -result[2])
+
+
+#%%
+# Demonstrate LineupIndex
+if __name__ == '__main__':
+    from datetime import date
+
+    from testdata.musicians import *
+
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    david_crosby, graham_nash = Musician('David Crosby'), Musician('Graham Nash')
+    csny = Band('Crosby, Stills, Nash & Young', *[david_crosby, stephenStills, graham_nash, neilYoung],
+                start=date(1968, 3, 1), end=date(1970, 7, 9))
+    csn = Band('Crosby, Stills & Nash', *[david_crosby, stephenStills, graham_nash],
+               start=date(1968, 7, 1))
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+
+    index = LineupIndex([buffalo_springfield, csny, the_beatles], threshold=0.25)
+    index.add(csn)
+    print(index.n_bands, index.n_rows)
+    for a, b, similarity in index.similar_pairs():
+        print(f'{a.name} ~ {b.name}: {similarity:.2f}')
+    print([(b.name, round(s, 2)) for b, s in index.similar(buffalo_springfield)])
+
+    the_hollies = Band('The Hollies', *[graham_nash, Musician('Allan Clarke'), Musician('Tony Hicks')], start=date(1962, 12, 1))
+    print([(b.name, round(s, 2)) for b, s in index.similar(the_hollies)], round(index.jaccard(the_hollies, csn), 2))
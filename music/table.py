@@ -0,0 +1,380 @@
+"""Columnar (NumPy-based) containers for large collections of musicians (and bands).
+
+Instead of one Python object per musician, a MusicianTable keeps one NumPy array per field:
+- names, as fixed-width (NAME_WIDTH bytes) UTF-8 byte strings
+- the band-member flag, as booleans
+- vocals and instrument, as role masks (<flag>.value, one bit per type of vocals/instrument; 0 if none)
+- the class of each musician, as its index in music.musician.MUSICIAN_KINDS
+  (a frozen musician, from music.frozen_musician, has the code of its mutable counterpart)
+Memory use is therefore predictable (a few bytes per row plus NAME_WIDTH),
+and queries are vectorized boolean expressions over whole columns.
+"""
+
+
+#%%
+# Setup / Data
+
+import mmap
+import pickle
+import struct
+from datetime import date
+
+import numpy as np
+
+from music.enums import Vocals, Instrument
+from music.interning import musician_key
+from music.musician import Musician, Singer, Songwriter, SingerSongwriter, MUSICIAN_KINDS
+from music.frozen_musician import FROZEN_KINDS
+from music.band import Band
+
+NONE_CODE = 0                           # role mask of a missing role (no vocals/no instrument), ordinal of no date
+KIND_CODES = {kind: code for kinds in (MUSICIAN_KINDS, FROZEN_KINDS) for code, kind in enumerate(kinds)}
+
+# The width of the names columns, in bytes (of UTF-8); fixed, so that the name columns of different tables
+# have the same dtype and can be concatenated or assigned to without truncating names. Longer names raise ValueError.
+NAME_WIDTH = 64
+
+OOB_MAGIC = b'MUSP'
+OOB_ALIGNMENT = 64                      # alignment of the out-of-band buffers in files written by dump()
+_oob_header = struct.Struct('<4sQI')    # magic, pickle stream size, number of buffers
+_oob_buffer = struct.Struct('<QQ')      # buffer offset, size
+
+
+#%%
+def has_all(masks, flag):
+    """Returns a boolean array that is True where a role mask (from an array of masks) includes all the roles
+    of flag, e.g. has_all(<instrument masks>, Instrument.BASS | Instrument.PIANO) - who plays bass and piano.
+    """
+
+    return (masks & flag.value) == flag.value
+
+
+def has_any(masks, flag):
+    """Returns a boolean array that is True where a role mask includes at least one of the roles of flag.
+    """
+
+    return (masks & flag.value) != 0
+
+
+#%%
+class MusicianTable:
+    """Columns of musician data (see the module docstring), with vectorized filtering.
+    Row i of the table corresponds to the Musician object that table[i] (or row(i)) materializes on demand.
+    Filtering and slicing produce new tables; the columns of a table are never copied unless NumPy has to.
+    """
+
+    def __init__(self, names, is_band_member, vocals, instrument, kinds):
+        """Wraps existing columns (array-likes of equal length); NumPy arrays of the right dtype are not copied.
+        """
+
+        self.names = _name_column(names)
+        self.is_band_member = np.asarray(is_band_member, dtype=np.bool_)
+        self.vocals = np.asarray(vocals, dtype=np.uint8)
+        self.instrument = np.asarray(instrument, dtype=np.uint8)
+        self.kinds = np.asarray(kinds, dtype=np.uint8)
+        if not (len(self.names) == len(self.is_band_member) == len(self.vocals) == len(self.instrument)
+                == len(self.kinds)):
+            raise ValueError('All columns of a MusicianTable must be of the same length')
+
+    @classmethod
+    def from_musicians(cls, musicians):
+        """Alternative constructor: builds a table from an iterable of Musician objects, in a single pass.
+        """
+
+        names, flags, vocals, instruments, kinds = [], [], [], [], []
+        for m in musicians:
+            v = getattr(m, 'vocals', None)
+            i = getattr(m, 'instrument', None)
+            names.append(m.name.encode('utf-8'))
+            flags.append(m.is_band_member)
+            vocals.append(v.value if v is not None else NONE_CODE)
+            instruments.append(i.value if i is not None else NONE_CODE)
+            kinds.append(KIND_CODES[m.__class__])
+        return cls(names, flags, vocals, instruments, kinds)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} ({len(self)} musicians, {self.nbytes} bytes)'
+
+    @property
+    def nbytes(self):
+        """The number of bytes taken by all columns."""
+
+        return (self.names.nbytes + self.is_band_member.nbytes + self.vocals.nbytes + self.instrument.nbytes
+                + self.kinds.nbytes)
+
+    def name(self, i):
+        """Returns the name of the musician in row i as a string."""
+
+        return self.names[i].decode('utf-8')
+
+    def row(self, i):
+        """Materializes and returns the Musician (Singer, Songwriter, SingerSongwriter) object from row i.
+        """
+
+        kwargs = {'name': self.name(i), 'is_band_member': bool(self.is_band_member[i])}
+        if self.vocals[i] != NONE_CODE:
+            kwargs['vocals'] = Vocals(int(self.vocals[i]))
+        if self.instrument[i] != NONE_CODE:
+            kwargs['instrument'] = Instrument(int(self.instrument[i]))
+        return MUSICIAN_KINDS[self.kinds[i]](**kwargs)
+
+    def __getitem__(self, item):
+        """table[i] returns the Musician object from row i;
+        table[<slice>], table[<boolean mask>] and table[<array of row indices>] return a new MusicianTable.
+        """
+
+        if isinstance(item, (int, np.integer)):
+            return self.row(item)
+        return MusicianTable(self.names[item], self.is_band_member[item], self.vocals[item], self.instrument[item],
+                             self.kinds[item])
+
+    def __iter__(self):
+        """Materializes Musician objects lazily, one row at a time."""
+
+        return (self.row(i) for i in range(len(self)))
+
+    def to_musicians(self):
+        """Returns the list of all Musician objects from the table."""
+
+        return list(self)
+
+    def mask(self, is_band_member=None, vocals=None, instrument=None, kind=None, sings=None, plays=None):
+        """Returns a boolean array that is True for the rows matching all of the given criteria
+        (None means 'any'). E.g., all solo lead-vocalist rhythm guitarists:
+            table.mask(is_band_member=False, vocals=Vocals.LEAD_VOCALS, instrument=Instrument.RHYTHM_GUITAR)
+        vocals and instrument must match exactly; sings and plays match musicians having (at least) all the roles
+        of a flag, e.g. plays=Instrument.BASS | Instrument.PIANO also matches those who play bass, piano and drums.
+        kind is a musician class from music.musician.MUSICIAN_KINDS (the exact class, subclasses do not match;
+        a frozen class matches the same rows as its mutable counterpart).
+        """
+
+        mask = np.ones(len(self), dtype=np.bool_)
+        if is_band_member is not None:
+            mask &= self.is_band_member == is_band_member
+        if vocals is not None:
+            mask &= self.vocals == vocals.value
+        if instrument is not None:
+            mask &= self.instrument == instrument.value
+        if kind is not None:
+            mask &= self.kinds == KIND_CODES[kind]
+        if sings is not None:
+            mask &= has_all(self.vocals, sings)
+        if plays is not None:
+            mask &= has_all(self.instrument, plays)
+        return mask
+
+    def where(self, **criteria):
+        """Returns the table of rows matching the criteria of mask()."""
+
+        return self[self.mask(**criteria)]
+
+
+#%%
+class BandTable:
+    """Columns of band data, in the same style as MusicianTable:
+    - names, as fixed-width UTF-8 byte strings
+    - start and end dates, as ordinals (date.toordinal(); 0 for None)
+    - members, as indices into a MusicianTable of the distinct musicians (member_refs),
+      with the members of band i in member_refs[member_offsets[i]:member_offsets[i + 1]]
+    Band objects are materialized on demand (table[i], iteration).
+    All columns are NumPy arrays, so that a table can be pickled with protocol 5 and out-of-band buffers
+    (see dump() and load()) without copying the column data into the pickle stream.
+    """
+
+    def __init__(self, names, starts, ends, member_offsets, member_refs, musicians):
+        """Wraps existing columns; NumPy arrays of the right dtype are not copied.
+        """
+
+        self.names = _name_column(names)
+        self.starts = np.asarray(starts, dtype=np.int32)
+        self.ends = np.asarray(ends, dtype=np.int32)
+        self.member_offsets = np.asarray(member_offsets, dtype=np.int64)
+        self.member_refs = np.asarray(member_refs, dtype=np.uint32)
+        self.musicians = musicians
+        if not len(self.names) == len(self.starts) == len(self.ends) == len(self.member_offsets) - 1:
+            raise ValueError('All columns of a BandTable must be of the same length')
+
+    @classmethod
+    def from_bands(cls, bands):
+        """Alternative constructor: builds a table from an iterable of Band objects, in a single pass.
+        """
+
+        names, starts, ends, member_offsets, member_refs = [], [], [], [0], []
+        musicians, index = [], {}                   # distinct musicians; musician_key(m) -> index in musicians
+        for band in bands:
+            for m in band.members:
+                key = musician_key(m)
+                j = index.get(key)
+                if j is None:
+                    j = index[key] = len(musicians)
+                    musicians.append(m)
+                member_refs.append(j)
+            names.append(band.name.encode('utf-8'))
+            starts.append(band.start.toordinal() if band.start else NONE_CODE)
+            ends.append(band.end.toordinal() if band.end else NONE_CODE)
+            member_offsets.append(len(member_refs))
+        return cls(names, starts, ends, member_offsets, member_refs,
+                   MusicianTable.from_musicians(musicians))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} ({len(self)} bands, {self.nbytes} bytes)'
+
+    @property
+    def nbytes(self):
+        """The number of bytes taken by all columns (including the musicians table)."""
+
+        return (self.names.nbytes + self.starts.nbytes + self.ends.nbytes + self.member_offsets.nbytes
+                + self.member_refs.nbytes + self.musicians.nbytes)
+
+    def members_of(self, i):
+        """The indices (into self.musicians) of the members of band i."""
+
+        return self.member_refs[self.member_offsets[i]:self.member_offsets[i + 1]]
+
+    def row(self, i):
+        """Materializes and returns the Band object from row i.
+        """
+
+        start, end = int(self.starts[i]), int(self.ends[i])
+        return Band(self.names[i].decode('utf-8'), *[self.musicians.row(j) for j in self.members_of(i)],
+                    start=date.fromordinal(start) if start != NONE_CODE else None,
+                    end=date.fromordinal(end) if end != NONE_CODE else None)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        """Materializes Band objects lazily, one row at a time."""
+
+        return (self.row(i) for i in range(len(self)))
+
+    def to_bands(self):
+        """Returns the list of all Band objects from the table."""
+
+        return list(self)
+
+
+#%%
+def dump(table, path):
+    """Writes a MusicianTable or a BandTable (or any object holding NumPy arrays) to a file at path
+    with pickle protocol 5: the pickle stream holds only the structure of the object, while the data of its arrays
+    is passed out of band (PickleBuffer) and written straight from the arrays' memory, with no intermediate copies.
+    The file consists of a header (magic bytes, the size of the pickle stream, the number of buffers),
+    the offset and size of each buffer, the pickle stream, and the buffers (each aligned to OOB_ALIGNMENT bytes).
+    """
+
+    buffers = []
+    data = pickle.dumps(table, protocol=5, buffer_callback=buffers.append)
+    raws = [b.raw() for b in buffers]
+    offset = _oob_header.size + len(raws) * _oob_buffer.size + len(data)
+    layout = []
+    for raw in raws:
+        offset += -offset % OOB_ALIGNMENT
+        layout.append((offset, raw.nbytes))
+        offset += raw.nbytes
+    with open(path, 'wb') as f:
+        f.write(_oob_header.pack(OOB_MAGIC, len(data), len(raws)))
+        f.write(b''.join(_oob_buffer.pack(*entry) for entry in layout))
+        f.write(data)
+        for raw, (offset, size) in zip(raws, layout):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(raw)
+
+
+def load(path):
+    """Loads an object written by dump(). The file is memory-mapped, and the arrays of the loaded object
+    are read-only views of the mapped buffers (no copies; the pages are loaded from disk only when accessed,
+    and are shared with other processes that load the same file).
+    """
+
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    magic, size, n = _oob_header.unpack_from(mapped)
+    if magic != OOB_MAGIC:
+        raise ValueError(f'{path} was not written by music.table.dump()')
+    start = _oob_header.size + n * _oob_buffer.size
+    layout = [_oob_buffer.unpack_from(mapped, _oob_header.size + i * _oob_buffer.size) for i in range(n)]
+    return pickle.loads(view[start:start + size], buffers=[view[offset:offset + size] for offset, size in layout])
+
+
+#%%
+# Helpers
+
+def _name_column(names):
+    """Returns names (an array-like of UTF-8 byte strings) as an array of NAME_WIDTH-byte strings
+    (not a copy, if it already is one); raises ValueError if a name is longer, instead of truncating it.
+    """
+
+    column = np.asarray(names, dtype=np.bytes_)
+    if column.dtype.itemsize > NAME_WIDTH and len(column):
+        too_long = np.char.str_len(column) > NAME_WIDTH
+        if too_long.any():
+            name = column[too_long][0].decode('utf-8', 'replace')
+            raise ValueError(f'{name!r} is longer than the {NAME_WIDTH} bytes of a name in a table')
+    return column.astype(f'S{NAME_WIDTH}', copy=False)
+
+
+#%%
+# Demonstrate MusicianTable
+if __name__ == '__main__':
+    table = MusicianTable.from_musicians([
+        Musician('Neil Young'),
+        Singer(name='Graham Nash', vocals=Vocals.BACKGROUND_VOCALS),
+        Songwriter(name='Stephen Stills', instrument=Instrument.LEAD_GUITAR),
+        Songwriter(name='Neil Young', instrument=Instrument.LEAD_GUITAR | Instrument.PIANO),
+        SingerSongwriter(name='Paul McCartney', vocals=Vocals.LEAD_VOCALS,
+                         instrument=Instrument.BASS | Instrument.PIANO | Instrument.DRUMS),
+        SingerSongwriter(name='Bob Dylan', is_band_member=False,
+                         vocals=Vocals.LEAD_VOCALS, instrument=Instrument.RHYTHM_GUITAR),
+    ])
+    print(table)
+    for m in table.where(is_band_member=False, vocals=Vocals.LEAD_VOCALS, instrument=Instrument.RHYTHM_GUITAR):
+        print(m)
+
+#%%
+# Who plays bass and piano (a multi-instrumentalist query over the role masks, without per-object loops)
+if __name__ == '__main__':
+    for m in table.where(plays=Instrument.BASS | Instrument.PIANO):
+        print(m)
+
+#%%
+# Frozen musicians have the kind codes of the mutable classes; names have the same width in all tables
+if __name__ == '__main__':
+    from music.frozen_musician import FrozenMusician, FrozenSinger
+
+    frozen = MusicianTable.from_musicians([FrozenMusician('Neil Young'),
+                                           FrozenSinger(name='Graham Nash', vocals=Vocals.BACKGROUND_VOCALS)])
+    print(frozen.kinds, frozen.where(kind=Singer).to_musicians() == frozen.where(kind=FrozenSinger).to_musicians())
+    names = np.concatenate([frozen.names, table.names])
+    print(names.dtype, names[3] == table.names[1] == b'Graham Nash')
+    try:
+        MusicianTable.from_musicians([Musician('Sir Ramsay Hunt and the Extraordinarily Long Named Orchestra Players',
+                                               is_band_member=False)])
+    except ValueError as e:
+        print(f'{type(e).__name__}: {e.args[0]}')
+
+#%%
+# Demonstrate BandTable, and dump()/load() with out-of-band buffers
+if __name__ == '__main__':
+    from testdata.musicians import *
+    from util.utility import get_data_dir
+
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+
+    band_table = BandTable.from_bands([the_beatles, buffalo_springfield])
+    file = get_data_dir() / 'band.table'
+    dump(band_table, file)
+    loaded = load(file)
+    print(loaded, loaded.starts.flags.writeable)
+    for band in loaded:
+        print(band)
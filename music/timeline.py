@@ -0,0 +1,181 @@
+"""Timeline analytics over bands: how many bands and how many distinct musicians were active in each year/month,
+and the max number of bands each musician played in at the same time.
+
+Instead of nested loops over bands, periods and members, each band contributes two events (start, end)
+and each membership one interval; the histograms are then computed with a single vectorized sweep
+(a counting sort of the events by period, followed by a cumulative sum), using NumPy datetime64 arrays.
+Bands can be added one at a time from a streamed source (e.g., a file reader): a Timeline keeps only compact
+integer arrays of the events, not the Band objects.
+"""
+
+
+#%%
+# Setup / Data
+
+from array import array
+from datetime import date
+
+import numpy as np
+
+from music.interning import musician_key
+from music.band import Band
+
+
+#%%
+class Timeline:
+    """Collects the events of bands (see the module docstring) and computes the histograms.
+    Bands with no start date are skipped (and counted in skipped); bands with no end date are active until `until`.
+    """
+
+    def __init__(self, bands=(), until=None):
+        self.until = until or date.today()
+        self.skipped = 0
+        self.musicians = []                     # musician keys (music.interning.musician_key()), by musician code
+        self.__codes = {}                       # musician key -> musician code
+        self.__starts = array('q')              # band start days (days since 1970-01-01, like datetime64[D])
+        self.__ends = array('q')                # band end days
+        self.__member_codes = array('q')        # one entry per membership: musician code...
+        self.__member_bands = array('q')        # ...and the band index
+        self.add_all(bands)
+
+    def add(self, band):
+        """Adds the events of a band.
+        """
+
+        if not isinstance(band, Band):
+            raise TypeError(f'Only Band objects can be added, not {type(band).__name__}')
+        if band.start is None:
+            self.skipped += 1
+            return
+        b = len(self.__starts)
+        self.__starts.append(_day(band.start))
+        self.__ends.append(_day(band.end or self.until))
+        for m in band.members:
+            key = musician_key(m)
+            code = self.__codes.get(key)
+            if code is None:
+                code = self.__codes[key] = len(self.musicians)
+                self.musicians.append(key)
+            self.__member_codes.append(code)
+            self.__member_bands.append(b)
+
+    def add_all(self, bands):
+        """Adds the events of all bands from an iterable (consumed lazily, one band at a time).
+        """
+
+        for band in bands:
+            self.add(band)
+
+    def __len__(self):
+        return len(self.__starts)
+
+    def starts(self):
+        return np.frombuffer(self.__starts, dtype=np.int64).astype('datetime64[D]')
+
+    def ends(self):
+        return np.frombuffer(self.__ends, dtype=np.int64).astype('datetime64[D]')
+
+    def bands_active(self, unit='Y'):
+        """Returns (periods, counts): an array of periods (datetime64 of the given unit, 'Y' or 'M'),
+        from the first period with an active band to the last one, and the number of bands active in each period.
+        """
+
+        return _histogram(_periods(self.starts(), unit), _periods(self.ends(), unit), unit)
+
+    def musicians_active(self, unit='Y'):
+        """Returns (periods, counts) as bands_active(), with the numbers of distinct musicians active in each period
+        (i.e., musicians playing in at least one active band).
+        The periods of all bands of a musician are merged first, so that a musician is counted once per period.
+        """
+
+        codes = np.frombuffer(self.__member_codes, dtype=np.int64)
+        bands = np.frombuffer(self.__member_bands, dtype=np.int64)
+        starts = _periods(self.starts(), unit)[bands]
+        ends = _periods(self.ends(), unit)[bands]
+        if len(codes) == 0:
+            return _histogram(starts, ends, unit)
+
+        # Shift each musician's periods into a range of their own, so that one sorted sweep handles all musicians
+        lo = starts.min()
+        span = ends.max() - lo + 2
+        s = starts - lo + codes * span
+        e = ends - lo + codes * span
+        order = np.argsort(s, kind='stable')
+        s, e = s[order], e[order]
+        reach = np.maximum.accumulate(e)                        # the last period covered so far
+        new_run = np.ones(len(s), dtype=np.bool_)
+        new_run[1:] = s[1:] > reach[:-1]                        # not overlapping with the previous intervals
+        run_starts = np.flatnonzero(new_run)
+        run_codes = codes[order][run_starts]
+        merged_starts = s[run_starts] - run_codes * span + lo
+        merged_ends = np.maximum.reduceat(e, run_starts) - run_codes * span + lo
+        return _histogram(merged_starts, merged_ends, unit)
+
+    def concurrent_bands(self):
+        """Returns an array with the max number of bands that each musician played in on the same day,
+        aligned with self.musicians (the musician with code i is self.musicians[i]).
+        """
+
+        codes = np.frombuffer(self.__member_codes, dtype=np.int64)
+        bands = np.frombuffer(self.__member_bands, dtype=np.int64)
+        result = np.zeros(len(self.musicians), dtype=np.int64)
+        if len(codes) == 0:
+            return result
+
+        # Events: +1 on a band's start day, -1 on the day after its end; ends before starts on the same day
+        days = np.concatenate((np.frombuffer(self.__starts, dtype=np.int64)[bands],
+                               np.frombuffer(self.__ends, dtype=np.int64)[bands] + 1))
+        deltas = np.concatenate((np.ones(len(codes), dtype=np.int64), -np.ones(len(codes), dtype=np.int64)))
+        owners = np.concatenate((codes, codes))
+        order = np.lexsort((deltas, days, owners))
+        running = np.cumsum(deltas[order])          # the events of each musician add up to 0, so no reset is needed
+        owners = owners[order]
+        group_starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+        result[owners[group_starts]] = np.maximum.reduceat(running, group_starts)
+        return result
+
+
+#%%
+# Helpers
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _day(d):
+    return d.toordinal() - _EPOCH
+
+
+def _periods(days, unit):
+    """Converts datetime64[D] days to integer period numbers of the given unit ('Y' or 'M')."""
+
+    return days.astype(f'datetime64[{unit}]').astype(np.int64)
+
+
+def _histogram(starts, ends, unit):
+    """Sweep over the +1 (start) and -1 (the period after the end) events of the intervals starts..ends."""
+
+    if len(starts) == 0:
+        return np.empty(0, dtype=f'datetime64[{unit}]'), np.empty(0, dtype=np.int64)
+    lo, hi = starts.min(), ends.max()
+    n = hi - lo + 1
+    events = np.bincount(starts - lo, minlength=n + 1) - np.bincount(ends - lo + 1, minlength=n + 1)
+    counts = np.cumsum(events)[:n]
+    return np.arange(lo, hi + 1).astype(f'datetime64[{unit}]'), counts
+
+
+#%%
+# Demonstrate Timeline
+if __name__ == '__main__':
+    from testdata.musicians import *
+
+    the_beatles = Band('The Beatles', *[johnLennon, paulMcCartney, georgeHarrison, ringoStarr],
+                       start=date(1957, 7, 6), end=date(1970, 4, 10))
+    buffalo_springfield = Band('Buffalo Springfield', *[neilYoung, stephenStills, richieFurray, brucePalmer, deweyMartin],
+                               start=date(1966, 4, 11), end=date(1968, 5, 5))
+    csny = Band('Crosby, Stills, Nash & Young', *[Musician('David Crosby'), stephenStills, Musician('Graham Nash'), neilYoung],
+                start=date(1968, 3, 1), end=date(1970, 7, 9))
+
+    timeline = Timeline([the_beatles, buffalo_springfield, csny])
+    for period, bands, musicians in zip(*timeline.bands_active(), timeline.musicians_active()[1]):
+        print(period, bands, musicians)
+    print([(key[1], int(n)) for key, n in zip(timeline.musicians, timeline.concurrent_bands()) if n > 1])
@@ -0,0 +1,163 @@
+"""Vectorized bulk validation of band data (names, start and end dates), for large imports.
+
+Band.__init__() and Band.is_date_valid() check one band at a time, and the first bad record raises BandNameError.
+Here, whole columns of names and dates are checked at once with NumPy comparisons, against the same rules
+(Band.min_name_length, Band.earliest_date..today), and all violations are collected in a compact report
+(one byte of error flags per row), so that only the valid rows are turned into Band objects.
+"""
+
+
+#%%
+# Setup / Data
+
+from datetime import date
+
+import numpy as np
+
+from music.band import Band
+
+# Error flags (bits of ValidationReport.errors)
+NAME_ERROR = 1                  # not a string (or UTF-8 bytes), or shorter than Band.min_name_length
+START_ERROR = 2                 # start date before Band.earliest_date or after today
+END_ERROR = 4                   # end date before Band.earliest_date or after today
+ORDER_ERROR = 8                 # end date before start date
+
+ERROR_NAMES = {NAME_ERROR: 'name', START_ERROR: 'start', END_ERROR: 'end', ORDER_ERROR: 'end before start'}
+
+
+#%%
+class ValidationReport:
+    """The result of validate_bands(): errors is an array of error flags (uint8), one per row (0 - a valid row).
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __str__(self):
+        counts = ', '.join(f'{name}: {self.count(flag)}' for flag, name in ERROR_NAMES.items() if self.count(flag))
+        return f'{len(self) - len(self.invalid_rows)} of {len(self)} rows valid' + (f' ({counts})' if counts else '')
+
+    @property
+    def valid(self):
+        """Boolean mask of the valid rows."""
+
+        return self.errors == 0
+
+    @property
+    def invalid_rows(self):
+        """Indices of the invalid rows."""
+
+        return np.flatnonzero(self.errors)
+
+    def count(self, flag):
+        """The number of rows with the given error flag."""
+
+        return int(np.count_nonzero(self.errors & flag))
+
+    def describe(self, row):
+        """Returns the names of the errors in a row (an empty list for a valid row)."""
+
+        return [name for flag, name in ERROR_NAMES.items() if self.errors[row] & flag]
+
+
+#%%
+def validate_bands(names, starts, ends, today=None):
+    """Checks columns (array-likes of equal length) of band names (strings, or UTF-8 encoded bytes)
+    and start/end dates (date objects, or anything convertible to datetime64[D], e.g. ISO date strings;
+    None/NaT for missing dates, which are not checked) and returns a ValidationReport.
+    """
+
+    return _validate(*_columns(names, starts, ends), today)
+
+
+#%%
+def valid_bands(names, starts, ends, members, report=None):
+    """Generator of Band objects for the valid rows only (members is a sequence of member tuples/lists, one per row).
+    The columns are the same as in validate_bands(); uses report (from validate_bands()) if it is already available.
+    """
+
+    lengths, start_days, end_days = _columns(names, starts, ends)
+    report = report or _validate(lengths, start_days, end_days)
+    for i in np.flatnonzero(report.valid):
+        yield Band(_name(names[i]), *members[i], start=_date(start_days[i]), end=_date(end_days[i]))
+
+
+#%%
+# Helpers
+
+def _columns(names, starts, ends):
+    """Converts the columns of validate_bands() to (name lengths, start datetime64[D] array, end datetime64[D] array);
+    the length of a name that is not a string (or UTF-8 bytes) is -1.
+    """
+
+    if isinstance(names, np.ndarray) and names.dtype.kind == 'U':
+        lengths = np.char.str_len(names)
+    else:
+        lengths = np.fromiter((_name_length(n) for n in names), dtype=np.int64)
+    starts = np.asarray(starts, dtype='datetime64[D]')
+    ends = np.asarray(ends, dtype='datetime64[D]')
+    if not len(lengths) == len(starts) == len(ends):
+        raise ValueError('names, starts and ends must be of the same length')
+    return lengths, starts, ends
+
+
+def _validate(lengths, starts, ends, today=None):
+    today = np.datetime64(today or date.today(), 'D')
+    earliest = np.datetime64(Band.earliest_date, 'D')
+
+    # Comparisons with NaT are False, so missing dates are never flagged
+    errors = np.zeros(len(lengths), dtype=np.uint8)
+    errors[lengths < Band.min_name_length] |= NAME_ERROR
+    errors[(starts < earliest) | (starts > today)] |= START_ERROR
+    errors[(ends < earliest) | (ends > today)] |= END_ERROR
+    errors[ends < starts] |= ORDER_ERROR
+    return ValidationReport(errors)
+
+
+def _name(name):
+    """Decodes a name given as UTF-8 bytes (e.g., from a fixed-width 'S' column); other names are returned as they are.
+    """
+
+    return name.decode('utf-8') if isinstance(name, (bytes, np.bytes_)) else name
+
+
+def _name_length(name):
+    try:
+        name = _name(name)
+    except UnicodeDecodeError:
+        return -1
+    return len(name) if isinstance(name, str) else -1
+
+
+def _date(d):
+    """Converts a datetime64[D] (possibly NaT) to a date (or None)."""
+
+    return None if np.isnat(d) else d.item()
+
+
+#%%
+# Demonstrate bulk validation
+if __name__ == '__main__':
+    from testdata.musicians import *
+
+    names = ['Buffalo Springfield', 'B', 'The Beatles', 'The Quarrymen']
+    starts = [date(1966, 4, 11), date(1966, 4, 11), date(1960, 8, 17), date(1956, 11, 1)]
+    ends = [date(1968, 5, 5), None, date(1970, 4, 10), date(1954, 1, 1)]
+    members = [[neilYoung, stephenStills], [neilYoung], [johnLennon, paulMcCartney], [johnLennon]]
+
+    report = validate_bands(names, starts, ends)
+    print(report)
+    for row in report.invalid_rows:
+        print(row, names[row], report.describe(row))
+    for band in valid_bands(names, starts, ends, members, report):
+        print(band)
+
+    # String dates and bytes names (e.g., columns read from a CSV or a fixed-width file) are checked the same way
+    byte_names = np.array([name.encode() for name in names])
+    string_starts = [d.isoformat() for d in starts]
+    string_ends = [d.isoformat() if d else None for d in ends]
+    print(validate_bands(byte_names, string_starts, string_ends))
+    print([band.name for band in valid_bands(byte_names, string_starts, string_ends, members)])
@@ -0,0 +1,794 @@
+"""Web scraping and crawling.
+BeautifulSoup documentation: https://www.crummy.com/software/BeautifulSoup/bs4/doc/
+
+crawl() fetches the pages of a multi-page list one by one, and spends almost all its time waiting on the network.
+CrawlEngine fetches pages concurrently, with a pool of threads (acrawl() does the same with asyncio):
+at most max_workers requests at once, and at most per_host requests at once to any single host,
+yielding the results in page order or in completion order.
+Requests go through a SessionPool of requests.Session objects, whose keep-alive connections are reused
+from request to request (instead of opening a new TCP connection for each page, as requests.get() does).
+A ResponseCache keeps the pages (and what is parsed from them) on disk, so that re-running a crawl
+downloads and parses only the pages that have changed.
+The demos run against a local fixture server (testdata.fixture_server), so that no internet is needed;
+with start_url instead of server.url, the same calls crawl Ultimate Classic Rock. They run only when the module
+is run as a script, so that importing it (e.g., from the benchmarks) starts no servers and writes no files.
+"""
+
+
+#%%
+# Setup / Data
+
+import asyncio
+import hashlib
+import pickle
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from functools import partial
+from itertools import count, islice
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from testdata.fixture_server import FixtureServer
+from util.utility import get_data_dir
+
+# The Website to work with, i.e. to scrape info from and crawl over it - Ultimate Classic Rock.
+# The starting URL refers to articles about Crosby, Stills, Nash & Young.
+start_url = 'https://ultimateclassicrock.com/search/?s=crosby,%20stills,%20nash%20and%20young'
+
+
+#%%
+class SessionPool:
+    """A thread-safe pool of up to size requests.Session objects, created as needed.
+    A session (with its keep-alive connections, to up to hosts hosts) is used by one thread at a time:
+    a thread takes one from the pool, makes its requests, and returns it (a thread waits if all are in use).
+    The most recently returned session is taken first, since its connections are the most likely to be still open.
+    Requests get the default timeout (seconds, or a (connect, read) tuple) unless they specify their own.
+    close() closes the idle sessions right away, and the sessions in use when they are returned to the pool
+    (a later request creates a new session).
+    """
+
+    def __init__(self, size=8, timeout=(5, 30), hosts=10, retries=0):
+        self.size = size
+        self.timeout = timeout
+        self.hosts = hosts
+        self.retries = retries
+        self.created = 0
+        self.__sessions = queue.LifoQueue()         # idle sessions, and None for each slot freed by close()
+        self.__lock = threading.Lock()
+        self.__closes = 0                           # the number of close() calls
+
+    def __new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.hosts, pool_maxsize=1, max_retries=self.retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @contextmanager
+    def session(self):
+        """Context manager that takes a session from the pool, and returns it to the pool on exit."""
+
+        closes = self.__closes
+        try:
+            session = self.__sessions.get_nowait()
+        except queue.Empty:
+            with self.__lock:
+                create = self.created < self.size
+                self.created += create
+            session = self.__new_session() if create else self.__sessions.get()
+        if session is None:
+            session = self.__new_session()
+        try:
+            yield session
+        finally:
+            with self.__lock:
+                closed = closes != self.__closes            # the pool was closed while the session was in use
+                self.__sessions.put(None if closed else session)
+            if closed:
+                session.close()
+
+    def get(self, url, **kwargs):
+        """Sends a GET request (requests.Session.get(url, **kwargs)) with a session from the pool."""
+
+        kwargs.setdefault('timeout', self.timeout)
+        with self.session() as session:
+            return session.get(url, **kwargs)
+
+    def close(self):
+        """Closes the sessions (and their connections): the idle ones now, and those in use when they are returned.
+        """
+
+        sessions = []
+        with self.__lock:
+            self.__closes += 1
+            while True:
+                try:
+                    sessions.append(self.__sessions.get_nowait())
+                except queue.Empty:
+                    break
+            self.created -= len(sessions)
+        for session in sessions:
+            if session is not None:
+                session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+#%%
+# The session pool used by get_soup() by default (can be replaced, e.g. with a bigger one, or configured)
+session_pool = SessionPool()
+
+
+#%%
+class ResponseCache:
+    """A persistent cache of HTTP responses (of GET requests, by URL) in an SQLite database at path
+    (by default, http_cache.db in the data directory), so that re-running a crawl does not download
+    the pages that have not changed.
+    Bodies are stored compressed (zlib, at the given level), with their ETag and Last-Modified validators.
+    A response is fresh for the max-age of its Cache-Control header (or for max_age seconds, 5 minutes
+    by default, if it has none; with max_age=0, such responses are only revalidated, never served without a request);
+    a fresh response is returned without sending a request, and a stale one is revalidated with a conditional
+    request (If-None-Match, If-Modified-Since): 304 Not Modified means that the cached body is still good,
+    and makes it fresh again. Only 200 responses are cached (and not those with Cache-Control: no-store).
+    When the bodies take up more than max_size bytes, the least recently used responses are evicted.
+    parsed() also caches what is parsed from a response (e.g., the articles of a page), with the digest
+    of the body it was parsed from, so that a cache hit skips the HTML parse as well as the network.
+    Thread-safe; use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path=None, max_size=64 << 20, max_age=300, level=6):
+        self.path = path or get_data_dir() / 'http_cache.db'
+        self.max_size = max_size
+        self.max_age = max_age
+        self.level = level
+        self.hits = self.revalidated = self.misses = 0
+        self.parse_hits = self.parse_misses = self.evictions = 0
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode = WAL')
+        self.__connection.execute('PRAGMA synchronous = NORMAL')
+        self.__connection.execute('PRAGMA foreign_keys = ON')
+        self.__connection.executescript(CACHE_SCHEMA)
+        self.__size, accessed = self.__connection.execute(
+            'SELECT coalesce(sum(size), 0), coalesce(max(accessed), 0) FROM responses').fetchone()
+        self.__clock = count(accessed + 1)          # LRU clock: responses.accessed of the latest use
+        with self.__transaction() as connection:            # max_size may be smaller than when the cache was filled
+            self.__evict(connection)
+
+    def close(self):
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def size(self):
+        """The total size of the cached (compressed) bodies, in bytes."""
+
+        return self.__size
+
+    def __len__(self):
+        with self.__lock:
+            return self.__connection.execute('SELECT count(*) FROM responses').fetchone()[0]
+
+    @contextmanager
+    def __transaction(self):
+        """Locks the cache and runs a write transaction (BEGIN IMMEDIATE ... COMMIT, ROLLBACK on an exception)."""
+
+        with self.__lock:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.__connection
+            except BaseException:
+                self.__connection.execute('ROLLBACK')
+                raise
+            self.__connection.execute('COMMIT')
+
+    def get(self, url, pool=None):
+        """Returns the text of the response to GET url, from the cache if it is fresh, and otherwise by sending
+        a request (conditional, if the response is cached) with a session from pool (session_pool by default).
+        """
+
+        return self.__get(url, pool, self.__lookup(url))[0]
+
+    def parsed(self, url, name, parse, pool=None):
+        """Returns parse(<the text of the response to GET url>) (see get()), cached under name
+        (e.g., the name of the parse function), until the body of the response changes.
+        The result must be picklable.
+        """
+
+        entry = self.__lookup(url)
+        if entry is not None and entry[2] > time.time():
+            with self.__lock:
+                value = self.__parsed_value(url, name, entry[3])
+            if value is not None:
+                self.__count('hits')
+                self.__count('parse_hits')
+                return pickle.loads(value)
+        text, digest = self.__get(url, pool, entry)
+        if digest is not None:
+            with self.__lock:
+                value = self.__parsed_value(url, name, digest)
+            if value is not None:
+                self.__count('parse_hits')
+                return pickle.loads(value)
+        self.__count('parse_misses')
+        result = parse(text)
+        if digest is not None:
+            with self.__transaction() as connection:
+                # The response may have been replaced (or evicted) meanwhile; then the result is not stored
+                connection.execute('INSERT OR REPLACE INTO parsed (url, name, digest, value) '
+                                   'SELECT url, ?, digest, ? FROM responses WHERE url = ? AND digest = ?',
+                                   (name, pickle.dumps(result, pickle.HIGHEST_PROTOCOL), url, digest))
+        return result
+
+    def __lookup(self, url):
+        """(etag, last_modified, expires, digest) of the cached response to GET url (None if there is none),
+        which becomes the most recently used one.
+        """
+
+        with self.__transaction() as connection:
+            entry = connection.execute('SELECT etag, last_modified, expires, digest FROM responses WHERE url = ?',
+                                       (url,)).fetchone()
+            if entry is not None:
+                connection.execute('UPDATE responses SET accessed = ? WHERE url = ?', (next(self.__clock), url))
+        return entry
+
+    def __parsed_value(self, url, name, digest):
+        row = self.__connection.execute('SELECT value FROM parsed WHERE url = ? AND name = ? AND digest = ?',
+                                        (url, name, digest)).fetchone()
+        return row and row[0]
+
+    def __get(self, url, pool, entry):
+        """(text, digest) of the response to GET url, given its cached entry (from __lookup());
+        digest is None if the response is not cached.
+        """
+
+        if entry is not None and entry[2] > time.time():
+            text = self.__body(url)
+            if text is not None:
+                self.__count('hits')
+                return text, entry[3]
+            entry = None                            # evicted meanwhile
+        headers = {}
+        if entry is not None and entry[0]:
+            headers['If-None-Match'] = entry[0]
+        if entry is not None and entry[1]:
+            headers['If-Modified-Since'] = entry[1]
+        response = (pool or session_pool).get(url, allow_redirects=False, headers=headers)
+        fresh_for = _max_age(response.headers.get('Cache-Control', ''), self.max_age)
+        if response.status_code == 304 and entry is not None:
+            with self.__transaction() as connection:
+                connection.execute('UPDATE responses SET etag = coalesce(?, etag), '
+                                   'last_modified = coalesce(?, last_modified), expires = ? WHERE url = ?',
+                                   (response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                    time.time() + (fresh_for or 0), url))
+            text = self.__body(url)
+            if text is None:                        # evicted meanwhile: downloaded again, and counted as a miss
+                return self.__get(url, pool, None)
+            self.__count('revalidated')
+            return text, entry[3]
+        self.__count('misses')
+        if response.status_code != 200 or fresh_for is None:
+            return response.text, None
+        body = zlib.compress(response.content, self.level)
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        with self.__transaction() as connection:
+            old = connection.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            connection.execute('INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (url) DO UPDATE '
+                               'SET etag = excluded.etag, last_modified = excluded.last_modified, '
+                               'expires = excluded.expires, encoding = excluded.encoding, digest = excluded.digest, '
+                               'body = excluded.body, size = excluded.size, accessed = excluded.accessed',
+                               (url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                time.time() + fresh_for, response.encoding or 'utf-8', digest, body, len(body),
+                                next(self.__clock)))
+            self.__size += len(body) - (old[0] if old else 0)
+            self.__evict(connection)
+        return response.text, digest
+
+    def __body(self, url):
+        """The text of the cached response to GET url (None if it is not cached, e.g. evicted by another thread)."""
+
+        with self.__lock:
+            row = self.__connection.execute('SELECT body, encoding FROM responses WHERE url = ?', (url,)).fetchone()
+        return zlib.decompress(row[0]).decode(row[1], errors='replace') if row else None
+
+    def __count(self, counter):
+        with self.__lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def __evict(self, connection):
+        """Deletes the least recently used responses (and what is parsed from them) until size <= max_size."""
+
+        while self.__size > self.max_size:
+            victims = connection.execute('SELECT url, size FROM responses ORDER BY accessed LIMIT 64').fetchall()
+            for url, size in victims:
+                if self.__size <= self.max_size:
+                    break
+                connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self.__size -= size
+                self.evictions += 1                 # under the lock (of the transaction)
+
+    def stats(self):
+        """Cache statistics: the numbers of fresh hits, revalidated (304) responses, misses, parse hits/misses,
+        and evictions, and the hit rate (the share of the requests answered from the cache, fresh or revalidated).
+        """
+
+        lookups = self.hits + self.revalidated + self.misses
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses,
+                'parse_hits': self.parse_hits, 'parse_misses': self.parse_misses, 'evictions': self.evictions,
+                'size': self.__size, 'hit_rate': (self.hits + self.revalidated) / lookups if lookups else 0.0}
+
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    expires REAL NOT NULL,
+    encoding TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE TABLE IF NOT EXISTS parsed (
+    url TEXT NOT NULL REFERENCES responses (url) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (url, name)
+) WITHOUT ROWID;
+"""
+
+
+def _max_age(cache_control, default):
+    """The number of seconds a response is fresh for, by its Cache-Control header (default if it has no max-age),
+    or None if it must not be stored (no-store).
+    """
+
+    directives = {}
+    for directive in cache_control.lower().split(','):
+        key, _, value = directive.strip().partition('=')
+        directives[key] = value.strip('"')
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0
+    try:
+        return max(int(directives['max-age']), 0)
+    except (KeyError, ValueError):
+        return default
+
+
+#%%
+def get_soup(url: str, pool=None, cache=None) -> BeautifulSoup:
+    """Returns BeautifulSoup object from the corresponding URL, passed as a string.
+    Creates Response object from HTTP GET request, using <session>.get(<url string>, allow_redirects=False)
+    with a session from pool (session_pool by default), instead of requests.get(<url string>, allow_redirects=False),
+    and then uses the text field of the Response object and the 'html.parser' to create the BeautifulSoup object.
+    With a ResponseCache, the text comes from cache.get(url, pool) instead.
+    """
+
+    if cache is not None:
+        return BeautifulSoup(cache.get(url, pool), features='html.parser')
+    response = (pool or session_pool).get(url, allow_redirects=False)
+    return BeautifulSoup(response.text, features='html.parser')
+
+
+#%%
+def get_soup_selenium(url: str) -> BeautifulSoup:
+    """Returns BeautifulSoup object from the corresponding URL, passed as a string.
+    Makes an HTTP GET request, using a headless webdriver.Firefox() from the selenium package and its driver.get(url).
+    Then uses the page_source field of the driver object and the 'html.parser' to create and return the BeautifulSoup o.
+    """
+
+    from selenium import webdriver                  # needed only here, so selenium is imported only if used
+    from selenium.webdriver.firefox.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    driver = webdriver.Firefox(options=options)
+    try:
+        driver.get(url)
+        return BeautifulSoup(driver.page_source, 'html.parser')
+    finally:
+        driver.quit()
+
+
+#%%
+def get_specific_page(url: str, page=1) -> str:
+    """Returns the URL of a specific page from a Website where long lists of items are split in multiple pages.
+    Page 1 is url itself; page n of <path>?<query> is <path>/page/<n>/?<query> (as in WordPress-based sites).
+    """
+
+    if page == 1:
+        return url
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    return urlunsplit((scheme, netloc, f'{path.rstrip("/")}/page/{page}/', query, fragment))
+
+
+#%%
+def get_next_soup(url: str, page=1, pool=None):
+    """Returns the BeautifulSoup object corresponding to a specific page
+    in case there are multiple pages that list objects of interest.
+    Parameters:
+    - url: the starting page/url of a multi-page list of objects
+    - page: the page number of a specific page of a multi-page list of objects
+    - pool: the SessionPool to send the request with (session_pool by default)
+    Essentially, get_next_soup() just returns get_soup(get_specific_page(start_url, page)),
+    i.e. converts the result of the call to get_specific_page(start_url, page), which is a string,
+    into a BeautifulSoup object.
+    """
+
+    return get_soup(get_specific_page(url, page), pool)
+
+
+#%%
+def get_next_soup_selenium(url: str, page=1):
+    """Returns the BeautifulSoup object corresponding to a specific page
+    in case there are multiple pages that list objects of interest, using selenium instead of requests.
+    Parameters:
+    - url: the starting page/url of a multi-page list of objects
+    - page: the page number of a specific page of a multi-page list of objects
+    Essentially, get_next_soup() just returns get_soup_selenium(get_specific_page(url, page)),
+    i.e. converts the result of the call to get_specific_page(url, page), which is a string,
+    into a BeautifulSoup object.
+    """
+
+    return get_soup_selenium(get_specific_page(url, page))
+
+
+#%%
+def crawl(url: str, max_pages=1, pool=None):
+    """Web crawler that collects info about specific articles from Ultimate Classic Rock,
+    implemented as a Python generator that yields BeautifulSoup objects (get_next_soup() or get_next_soup_selenium())
+    from multi-page article lists.
+    Parameters: the url of the starting page and the max number of pages to crawl in case of multipage lists
+    (and the SessionPool to send the requests with, session_pool by default).
+    The pages are fetched one by one; see CrawlEngine.crawl() and acrawl() for the concurrent versions.
+    """
+
+    for page in range(1, max_pages + 1):
+        yield get_next_soup(url, page, pool)
+
+
+#%%
+class CrawlEngine:
+    """Concurrent crawl engine: fetches pages with a pool of max_workers threads, with at most per_host requests
+    to any single host (the netloc of the URL) at once. fetch is the function that fetches and parses a page
+    (by default, get_soup() with a SessionPool of max_workers sessions, unless a pool is given).
+    In page order, at most window pages are fetched or buffered ahead of the next page to be yielded,
+    so that a slow page does not make the engine buffer the whole crawl.
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, max_workers=8, per_host=4, fetch=None, window=None, pool=None):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.window = window or 4 * max_workers
+        self.__own_pool = pool is None and fetch is None
+        self.pool = SessionPool(max_workers) if self.__own_pool else pool
+        self.fetch = fetch or partial(get_soup, pool=self.pool)
+        self.__pool = ThreadPoolExecutor(max_workers, thread_name_prefix='crawl')
+
+    def close(self):
+        self.__pool.shutdown(cancel_futures=True)
+        if self.__own_pool:
+            self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def map(self, urls, ordered=True, fetch=None):
+        """Generator of (url, fetch(url)) for the URLs from an iterable (consumed lazily, so it can be a generator),
+        in the order of the URLs if ordered is True, or as soon as the pages are fetched otherwise.
+        fetch overrides the engine's fetch function for this call.
+        If a fetch raises an exception, it is re-raised here, and the requests that have not started are cancelled
+        (as they are if the generator is closed early).
+        URLs are read ahead at most 2 * max_workers at a time, so with per-host limits, many URLs of one host
+        in a row can hold back the URLs of other hosts that follow them.
+        """
+
+        fetch = fetch or self.fetch
+        urls = iter(urls)
+        waiting = deque()                       # (index, url, host), not submitted yet because of the limits
+        in_flight = {}                          # future -> (index, url, host)
+        host_counts = {}                        # host -> the number of its requests in flight
+        done = {}                               # index -> (url, result), fetched but not yielded yet (in page order)
+        n_read = n_yielded = 0
+        exhausted = False
+        try:
+            while True:
+                while (not exhausted and len(waiting) + len(in_flight) < 2 * self.max_workers
+                       and (not ordered or n_read - n_yielded < self.window)):
+                    try:
+                        url = next(urls)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    waiting.append((n_read, url, urlsplit(url).netloc))
+                    n_read += 1
+                for _ in range(len(waiting)):
+                    if len(in_flight) == self.max_workers:
+                        break
+                    item = waiting.popleft()
+                    if host_counts.get(item[2], 0) < self.per_host:
+                        host_counts[item[2]] = host_counts.get(item[2], 0) + 1
+                        in_flight[self.__pool.submit(fetch, item[1])] = item
+                    else:
+                        waiting.append(item)
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i, url, host = in_flight.pop(future)
+                    host_counts[host] -= 1
+                    done[i] = (url, future.result())
+                if ordered:
+                    while n_yielded in done:
+                        yield done.pop(n_yielded)
+                        n_yielded += 1
+                else:
+                    for i in list(done):
+                        yield done.pop(i)
+                        n_yielded += 1
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def crawl(self, url: str, max_pages=1, ordered=True):
+        """Concurrent version of crawl(): generator of the BeautifulSoup objects of pages 1 to max_pages
+        of a multi-page list, in page order (if ordered is True) or in the order in which they are fetched.
+        """
+
+        for _, soup in self.map((get_specific_page(url, page) for page in range(1, max_pages + 1)), ordered):
+            yield soup
+
+
+#%%
+async def acrawl(url: str, max_pages=1, max_workers=8, per_host=4, ordered=True, fetch=None, window=None, pool=None):
+    """asyncio version of CrawlEngine.crawl(): async generator of the BeautifulSoup objects of pages 1 to max_pages
+    of a multi-page list, in page order or in the order in which they are fetched.
+    fetch runs in a pool of max_workers threads (requests is blocking); at most per_host requests run at once
+    (all pages are from the host of url), and at most window pages are fetched or buffered ahead.
+    By default, fetch is get_soup() with a SessionPool of max_workers sessions, unless a pool is given.
+    """
+
+    own_pool = pool is None and fetch is None
+    pool = SessionPool(max_workers) if own_pool else pool
+    fetch = fetch or partial(get_soup, pool=pool)
+    loop = asyncio.get_running_loop()
+    host_limit = asyncio.Semaphore(per_host)
+    pages = iter(range(1, max_pages + 1))
+    pending = deque()                                   # tasks, in page order
+
+    async def fetch_page(page):
+        async with host_limit:
+            return await loop.run_in_executor(executor, fetch, get_specific_page(url, page))
+
+    def schedule(n):
+        for page in islice(pages, n):
+            pending.append(asyncio.create_task(fetch_page(page)))
+
+    executor = ThreadPoolExecutor(max_workers, thread_name_prefix='acrawl')
+    try:
+        schedule(window or 4 * max_workers)
+        while pending:
+            if ordered:
+                finished = [pending.popleft()]
+                await finished[0]
+            else:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    pending.remove(task)
+            schedule(len(finished))
+            for task in finished:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if own_pool:
+            pool.close()
+
+
+#%%
+def get_article_info(article: Tag):
+    """
+    Returns structured information about an article related to The Beatles,
+    extracted from a multi-page article list.
+    :param article: a bs4.element.Tag representing the entire article
+    :return: a 4-tuple of info-items about the article, including:
+    - article_title - the title of the article
+    - article_author - the author of the article
+    - article_date - the date when the article has been published
+    - featured_image_url - the URL of the featured image of the article
+    Missing items are None (e.g., the date, which is filled in with JavaScript on some sites; see get_soup_selenium()).
+    """
+
+    title = article.find('h2', {'class': 'title'})
+    author = article.find('span', {'class': 'author'})
+    published = article.find('time')
+    image = article.find('img')
+
+    article_title = title.text.strip() if title else None
+    article_author = author.text.strip().removeprefix('By ') if author else None
+    article_date = (published.get('datetime') or published.text.strip()) if published else None
+    featured_image_url = image.get('src') if image else None
+    return article_title, article_author, article_date, featured_image_url
+
+
+#%%
+def parse_article_info_list(text: str):
+    """Returns the list of article_info 4-tuples (see get_article_info()) of the articles on a page,
+    from the HTML text of the page. Articles with no title (e.g., ads in 'article' tags) are skipped.
+    """
+
+    return _soup_article_info_list(BeautifulSoup(text, features='html.parser'))
+
+
+#%%
+def get_article_info_list(url: str, max_pages=1, engine=None, cache=None):
+    """
+    Returns structured information about articles related to The Beatles from a multi-page article list.
+    :param url: the url of the starting page of a multi-page article list
+    :param max_pages: the max number of pages to crawl
+    :param engine: a CrawlEngine to fetch the pages concurrently (by default, they are fetched one by one)
+    :param cache: a ResponseCache to fetch the pages through; the article info of each page is cached as well,
+    so the pages that have not changed since the last run are neither downloaded nor parsed again
+    :return: a list of 4-tuples of info-items about the articles from a multi-page article list
+    Calls get_article_info() in a loop to collect the list of tuples, each tuple containing the following data:
+    - article_title - the title of an article
+    - article_author - the author of an article
+    - article_date - the date when an article has been published
+    - featured_image_url - the URL of the featured image of an article
+    The other relevant data items:
+    - article_info_list - the list of article_info 4-tuples for all articles on the site
+    Articles with no title (e.g., ads in 'article' tags) are skipped.
+    """
+
+    if cache is None:
+        soups = crawl(url, max_pages) if engine is None else engine.crawl(url, max_pages)
+        return [article_info for soup in soups for article_info in _soup_article_info_list(soup)]
+
+    pages = (get_specific_page(url, page) for page in range(1, max_pages + 1))
+    fetch = partial(cache.parsed, name='article_info_list', parse=parse_article_info_list,
+                    pool=None if engine is None else engine.pool)
+    pages_info = map(fetch, pages) if engine is None else (info for _, info in engine.map(pages, fetch=fetch))
+    return [article_info for page_info in pages_info for article_info in page_info]
+
+
+def _soup_article_info_list(soup):
+    article_info_list = []
+    for article in soup.find_all('article'):
+        article_info = get_article_info(article)
+        if article_info[0]:
+            article_info_list.append(article_info)
+    return article_info_list
+
+
+#%%
+# Demonstrate crawl() and CrawlEngine against a local fixture server with 20 pages, 50ms per response
+if __name__ == '__main__':
+    server = FixtureServer(n_pages=20, latency=0.05)
+    print(get_specific_page(server.url, 3))
+    print(get_next_soup(server.url, 2).find('article').find('h2').text)
+
+#%%
+# SessionPool: the requests reuse keep-alive connections (requests.get() opens a new connection for each request)
+if __name__ == '__main__':
+    with SessionPool(size=2, timeout=5) as pool:
+        connections = server.connections
+        for page in range(1, 11):
+            get_next_soup(server.url, page, pool)
+        print(f'10 pages, {server.connections - connections} new connection(s), {pool.created} session(s)')
+    connections = server.connections
+    for page in range(1, 11):
+        requests.get(get_specific_page(server.url, page), allow_redirects=False)
+    print(f'requests.get(): 10 pages, {server.connections - connections} new connections')
+    pool = SessionPool(size=1)
+    with pool.session() as session:
+        session.get(server.url)
+        pool.close()                                # the session is in use: it is closed when it is returned
+    print(len(session.get_adapter(server.url).poolmanager.pools), 'open connection pool(s) after close()')
+
+#%%
+# Page order vs. completion order
+if __name__ == '__main__':
+    with CrawlEngine(max_workers=8, per_host=4) as engine:
+        print([soup.title.text for soup in engine.crawl(server.url, max_pages=8)])
+        print([soup.title.text for soup in engine.crawl(server.url, max_pages=8, ordered=False)])
+    print(server.max_concurrent)
+
+#%%
+# Per-host limits: 127.0.0.1 and localhost are two hosts (of the same server)
+if __name__ == '__main__':
+    server.max_concurrent.clear()
+    urls = [get_specific_page(u, page) for page in range(1, 11)
+            for u in (server.url, server.url.replace('127.0.0.1', 'localhost'))]
+    with CrawlEngine(max_workers=6, per_host=2) as engine:
+        print(sum(1 for _ in engine.map(urls, ordered=False)), server.max_concurrent)
+
+#%%
+# get_article_info_list(), with pages fetched one by one and concurrently
+if __name__ == '__main__':
+    with CrawlEngine() as engine:
+        article_info_list = get_article_info_list(server.url, max_pages=3, engine=engine)
+    print(len(article_info_list), article_info_list[0])
+    print(article_info_list == get_article_info_list(server.url, max_pages=3))
+
+#%%
+# ResponseCache: re-running get_article_info_list() with a cache (in a temporary directory); the pages are fresh for 1s
+if __name__ == '__main__':
+    cache_server = FixtureServer(n_pages=20, latency=0.05, cache_control='max-age=1')
+    cache_directory = tempfile.TemporaryDirectory()
+
+    def cached_run(label, cache, engine):
+        requests_before, not_modified = cache_server.requests, cache_server.not_modified
+        article_info_list = get_article_info_list(cache_server.url, max_pages=10, engine=engine, cache=cache)
+        print(f'{label}: {len(article_info_list)} articles, {cache_server.requests - requests_before} requests '
+              f'({cache_server.not_modified - not_modified} Not Modified)')
+        return article_info_list
+
+    with ResponseCache(Path(cache_directory.name) / 'http_cache.db') as cache, CrawlEngine() as engine:
+        article_info_list = cached_run('first run', cache, engine)                  # downloaded and parsed
+        print(article_info_list == cached_run('second run', cache, engine))         # fresh: no requests, no parsing
+        time.sleep(1)
+        print(article_info_list == cached_run('stale', cache, engine))              # revalidated, not parsed again
+        cache_server.version += 1
+        time.sleep(1)
+        print(article_info_list == cached_run('stale, changed', cache, engine))     # downloaded and parsed again
+        print(get_soup(cache_server.url, cache=cache).find('meta', {'name': 'version'}))
+        print(cache.stats())
+
+    # LRU eviction: room for about 2 compressed pages
+    max_size = len(zlib.compress(cache_server.page(1).encode())) * 5 // 2
+    with ResponseCache(Path(cache_directory.name) / 'lru_cache.db', max_size=max_size) as cache:
+        for page in (11, 12, 11, 13, 11):
+            cache.get(get_specific_page(cache_server.url, page))
+        print(f'{len(cache)} cached responses, {cache.size} bytes', cache.stats())
+    cache_server.close()
+    cache_directory.cleanup()
+
+#%%
+# acrawl()
+if __name__ == '__main__':
+    async def titles(url, max_pages):
+        return [soup.title.text async for soup in acrawl(url, max_pages, per_host=8, ordered=False)]
+
+    print(asyncio.run(titles(server.url, 10)))
+    server.close()
+
+#%%
+# Put everything in a csv file
+
+# import pandas as pd
+
+# Create a dataframe of articles as <pd.df> = pd.DataFrame(<list>, columns=['<Column 1>', '<Column 2>', ...])
+
+# Save the dataframe as a .csv file using <pd.df>.to_csv('../data/...', index=False)
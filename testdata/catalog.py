@@ -0,0 +1,71 @@
+"""Synthetic catalog data (large numbers of musicians and bands) for benchmarks.
+"""
+
+import random
+from datetime import date
+
+from music.enums import Vocals, Instrument
+from music.musician import Musician, Singer, Songwriter, SingerSongwriter
+
+
+FIRST_NAMES = ['Neil', 'Stephen', 'David', 'Graham', 'Richie', 'Bruce', 'Dewey', 'John', 'Paul', 'George',
+               'Ringo', 'Mick', 'Keith', 'Charlie', 'Ron', 'Jim', 'Chris', 'Jeff', 'Syd', 'Roger',
+               'Nick', 'Rick', 'Bob', 'Taylor', 'Elliott', 'Joni', 'Emmylou', 'Gram', 'Linda', 'Jackson']
+LAST_NAMES = ['Young', 'Stills', 'Crosby', 'Nash', 'Furay', 'Palmer', 'Martin', 'Lennon', 'McCartney',
+              'Harrison', 'Starr', 'Jagger', 'Richards', 'Watts', 'Wood', 'McCarty', 'Dreja', 'Beck',
+              'Barrett', 'Waters', 'Gilmour', 'Mason', 'Wright', 'Dylan', 'Swift', 'Smith', 'Mitchell',
+              'Harris', 'Parsons', 'Ronstadt', 'Browne', 'Cave']
+
+
+def synthetic_musician_name(i):
+    """Returns a unique, realistic-looking musician name for the index i."""
+
+    first = FIRST_NAMES[i % len(FIRST_NAMES)]
+    last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    n = i // (len(FIRST_NAMES) * len(LAST_NAMES))
+    return f'{first} {last}' if n == 0 else f'{first} {last} {n + 1}'
+
+
+def synthetic_musicians(n, seed=0):
+    """Returns a list of n distinct Musician, Singer, Songwriter and SingerSongwriter objects."""
+
+    rnd = random.Random(seed)
+    vocals = list(Vocals)
+    instruments = list(Instrument)
+    musicians = []
+    for i in range(n):
+        name = synthetic_musician_name(i)
+        is_band_member = rnd.random() < 0.8
+        kind = rnd.randrange(4)
+        if kind == 0:
+            musicians.append(Musician(name, is_band_member))
+        elif kind == 1:
+            musicians.append(Singer(name=name, is_band_member=is_band_member, vocals=rnd.choice(vocals)))
+        elif kind == 2:
+            musicians.append(Songwriter(name=name, is_band_member=is_band_member,
+                                        instrument=rnd.choice(instruments)))
+        else:
+            musicians.append(SingerSongwriter(name=name, is_band_member=is_band_member,
+                                              vocals=rnd.choice(vocals), instrument=rnd.choice(instruments)))
+    return musicians
+
+
+def synthetic_bands(n_bands, n_musicians=None, members=(2, 6), seed=0):
+    """Returns a list of n_bands Band objects, with members drawn from a pool of n_musicians synthetic musicians
+    (by default, about three times fewer musicians than band memberships, so musicians play in several bands).
+    """
+
+    from music.band import Band
+
+    rnd = random.Random(seed)
+    n_musicians = n_musicians or max(1, n_bands * sum(members) // 6)
+    pool = synthetic_musicians(n_musicians, seed)
+    first, last = date(1955, 1, 1).toordinal(), date(2020, 12, 31).toordinal()
+    bands = []
+    for i in range(n_bands):
+        start = rnd.randint(first, last)
+        end = min(start + int(rnd.expovariate(1 / 3000)), date.today().toordinal())
+        bands.append(Band(f'The {synthetic_musician_name(i).split()[-1]} Band {i}',
+                          *rnd.sample(pool, rnd.randint(*members)),
+                          start=date.fromordinal(start), end=date.fromordinal(end) if rnd.random() < 0.7 else None))
+    return bands
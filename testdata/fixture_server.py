@@ -0,0 +1,176 @@
+"""A local HTTP server with a synthetic multi-page article list, for demonstrating and benchmarking the crawler
+(python.crawl) without the internet.
+
+The pages look like the search results of Ultimate Classic Rock: page 1 is /search/?s=<query>, and page n is
+/search/page/<n>/?s=<query>; each page lists articles_per_page <article> tags (title, author, date, featured image).
+Pages after the last one are 404 Not Found. Every response can be delayed by latency seconds (like a remote server).
+Pages have an ETag and a Last-Modified date, which change whenever version is incremented (e.g., server.version += 1
+makes all pages change); conditional requests (If-None-Match, If-Modified-Since) for unchanged pages get
+304 Not Modified, with no body. Responses include Cache-Control: <cache_control>, if it is given.
+The server counts the requests, the connections (fewer than the requests if clients keep them alive),
+and the max number of requests served at once for each Host header
+(e.g., 127.0.0.1 and localhost are two hosts, served by the same server).
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+from testdata.catalog import synthetic_musician_name
+
+
+class FixtureServer:
+    """Serves the synthetic pages from a background thread; use as a context manager (or call close()).
+    url is the URL of page 1 (e.g., http://127.0.0.1:<port>/search/?s=buffalo%20springfield).
+    """
+
+    def __init__(self, n_pages=10, articles_per_page=10, latency=0.0, host='127.0.0.1', port=0, cache_control=None):
+        self.n_pages = n_pages
+        self.articles_per_page = articles_per_page
+        self.latency = latency
+        self.cache_control = cache_control
+        self.version = 0
+        self.requests = 0
+        self.connections = 0
+        self.not_modified = 0                       # the number of 304 Not Modified responses
+        self.max_concurrent = {}                    # Host header -> max number of requests served at once
+        self.__concurrent = {}
+        self.__lock = threading.Lock()
+        self.__server = ThreadingHTTPServer((host, port), _Handler)
+        self.__server.daemon_threads = True
+        self.__server.fixture = self
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name='fixture server', daemon=True)
+        self.__thread.start()
+
+    @property
+    def port(self):
+        return self.__server.server_address[1]
+
+    @property
+    def url(self):
+        return f'http://{self.__server.server_address[0]}:{self.port}/search/?s=buffalo%20springfield'
+
+    def close(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def page(self, n):
+        """The HTML text of page n (None if there is no such page)."""
+
+        if not 1 <= n <= self.n_pages:
+            return None
+        articles = ''.join(_article(n, i) for i in range(self.articles_per_page))
+        return (f'<!DOCTYPE html><html><head><title>Search results - page {n}</title>'
+                f'<meta name="version" content="{self.version}"></head>'
+                f'<body><main>{articles}</main></body></html>')
+
+    def validators(self, n):
+        """The ETag and the Last-Modified date (a datetime) of page n."""
+
+        return f'"{n}-{self.version}"', _EPOCH + timedelta(days=self.version)
+
+    def count(self, counter):
+        """Increments a counter (connections, not_modified); called by the request handler."""
+
+        with self.__lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def track(self, host, delta):
+        """Counts a request to host that starts (delta=1) or ends (delta=-1); called by the request handler."""
+
+        with self.__lock:
+            self.__concurrent[host] = self.__concurrent.get(host, 0) + delta
+            if delta > 0:
+                self.requests += 1
+                self.max_concurrent[host] = max(self.max_concurrent.get(host, 0), self.__concurrent[host])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'                   # keep-alive
+    disable_nagle_algorithm = True                  # headers and body are sent separately; don't wait for ACKs
+
+    def setup(self):
+        super().setup()
+        self.server.fixture.count('connections')
+
+    def do_GET(self):
+        fixture = self.server.fixture
+        host = self.headers.get('Host', '').rsplit(':', 1)[0]
+        fixture.track(host, 1)
+        try:
+            time.sleep(fixture.latency)
+            n = _page_number(urlsplit(self.path).path)
+            text = fixture.page(n)
+            if text is not None and self.__not_modified(*fixture.validators(n)):
+                fixture.count('not_modified')
+                self.send_response(304)
+                self.__send_cache_headers(n)
+                self.end_headers()
+                return
+            body = (text or '<html><body>Not Found</body></html>').encode('utf-8')
+            self.send_response(200 if text else 404)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if text is not None:
+                self.__send_cache_headers(n)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            fixture.track(host, -1)
+
+    def __not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            try:
+                return last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def __send_cache_headers(self, n):
+        etag, last_modified = self.server.fixture.validators(n)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', format_datetime(last_modified, usegmt=True))
+        if self.server.fixture.cache_control:
+            self.send_header('Cache-Control', self.server.fixture.cache_control)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _page_number(path):
+    """1 for /search/, n for /search/page/<n>/, 0 (no such page) otherwise."""
+
+    parts = [part for part in path.split('/') if part]
+    if parts == ['search']:
+        return 1
+    if len(parts) == 3 and parts[:2] == ['search', 'page'] and parts[2].isdigit():
+        return int(parts[2])
+    return 0
+
+
+def _article(page, i):
+    k = (page - 1) * 1000 + i
+    published = date(2026, 10, 1) - timedelta(days=k)
+    return (f'<article class="blogroll-inner">'
+            f'<a class="theframe" href="/article-{page}-{i}/">'
+            f'<img class="featured-image" src="https://example.com/images/{page}-{i}.jpg" alt=""></a>'
+            f'<h2 class="title"><a href="/article-{page}-{i}/">Buffalo Springfield, part {page}.{i}</a></h2>'
+            f'<span class="author">By {synthetic_musician_name(k)}</span>'
+            f'<time datetime="{published.isoformat()}">{published.strftime("%B %d, %Y")}</time>'
+            f'</article>')
@@ -5,6 +5,10 @@
 #%%
 # Setup / Data
 
+import bz2
+import gzip
+import io
+import lzma
 from datetime import date
 from pathlib import Path
 
@@ -32,12 +36,13 @@ def format_date(a_date):
 # - absolute path: <path>.absolute(), e.g. Path().absolute(), or Path('.').absolute()
 # - parent dir: <path>.parent
 
-print(Path.home())
-print(Path.cwd())
-print(Path().absolute())
-print(Path('.').absolute())
-print(Path.absolute(Path.cwd()))
-print(Path('.').absolute().parent)
+if __name__ == '__main__':
+    print(Path.home())
+    print(Path.cwd())
+    print(Path().absolute())
+    print(Path('.').absolute())
+    print(Path.absolute(Path.cwd()))
+    print(Path('.').absolute().parent)
 
 #%%
 # Demonstrate creating and removing directories
@@ -46,11 +51,12 @@ print(Path('.').absolute().parent)
 # - remove dir: <dir>.rmdir()                                           # requires the <dir> to be empty
 # - project dir: settings.PROJECT_DIR
 
-new_dir = Path.cwd().parent / 'new_dir'
-# print(new_dir)
-new_dir.mkdir(parents=True, exist_ok=True)
-print(new_dir)
-new_dir.rmdir()
+if __name__ == '__main__':
+    new_dir = Path.cwd().parent / 'new_dir'
+    # print(new_dir)
+    new_dir.mkdir(parents=True, exist_ok=True)
+    print(new_dir)
+    new_dir.rmdir()
 
 
 #%%
@@ -80,4 +86,47 @@ def get_data_dir():
 #%%
 # Demonstrate get_data_dir()
 
-# print(get_data_dir())
\ No newline at end of file
+# print(get_data_dir())
+
+#%%
+# Compression of exported files (see open_compressed())
+COMPRESSIONS = {'gzip': gzip, 'bz2': bz2, 'lzma': lzma}
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'lzma', '.lzma': 'lzma'}
+
+
+def open_compressed(path, mode='rb', compression=None, level=None, encoding=None, buffer_size=1 << 20):
+    """Opens a file like open(), but compressing what is written and decompressing what is read, incrementally
+    (so that streaming writers and readers use the same, small amount of memory as with an uncompressed file).
+    compression is 'gzip', 'bz2', 'lzma' (one of COMPRESSIONS) or None, which means 'infer it from the suffix
+    of path' (one of COMPRESSION_SUFFIXES; no compression for any other suffix).
+    level is the compression level (compresslevel of gzip and bz2, preset of lzma; None - the module's default).
+    The compressed stream is wrapped in a buffer of buffer_size bytes, so that many small writes/reads
+    (e.g., one per record) reach the compressor/decompressor as a few large ones.
+    In text mode ('t' in mode), encoding defaults to 'utf-8'.
+    """
+
+    if compression is None:
+        compression = COMPRESSION_SUFFIXES.get(Path(path).suffix)
+    text = 't' in mode
+    if text:
+        encoding = encoding or 'utf-8'
+    if compression is None:
+        return open(path, mode, buffering=buffer_size, encoding=encoding)
+    if compression not in COMPRESSIONS:
+        raise ValueError(f'Unknown compression {compression!r} (expected one of {", ".join(COMPRESSIONS)})')
+
+    binary_mode = mode.replace('t', '').replace('b', '') + 'b'
+    kwargs = {}
+    if level is not None and binary_mode[0] != 'r':
+        kwargs['preset' if compression == 'lzma' else 'compresslevel'] = level
+    f = COMPRESSIONS[compression].open(path, binary_mode, **kwargs)
+    f = io.BufferedReader(f, buffer_size) if binary_mode[0] == 'r' else io.BufferedWriter(f, buffer_size)
+    return io.TextIOWrapper(f, encoding=encoding) if text else f
+
+
+#%%
+# Demonstrate open_compressed()
+# with open_compressed(get_data_dir() / 'test.txt.gz', 'wt', level=6) as f:
+#     f.write('Hello, compressed world')
+# with open_compressed(get_data_dir() / 'test.txt.gz', 'rt') as f:
+#     print(f.read())